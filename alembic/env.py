@@ -7,6 +7,8 @@ from sqlalchemy import engine_from_config, pool
 from src.app.core.config import settings
 from src.app.core.database import Base
 from src.app.models.script import Script  # noqa: F401
+from src.app.models.script_blob import ScriptBlob  # noqa: F401
+from src.app.models.script_version import ScriptVersion  # noqa: F401
 from src.app.models.user import User  # noqa: F401
 
 load_dotenv()
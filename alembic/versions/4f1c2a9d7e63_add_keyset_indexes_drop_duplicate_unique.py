@@ -0,0 +1,64 @@
+"""add keyset indexes, drop duplicate unique constraints on primary keys
+
+Revision ID: 4f1c2a9d7e63
+Revises: bc893dcaf0b6
+Create Date: 2025-08-04 12:10:41.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f1c2a9d7e63"
+down_revision: Union[str, Sequence[str], None] = "bc893dcaf0b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FK может опираться на users_id_key, поэтому пересоздаём его
+    # после удаления дублирующего уникального индекса (останется PK).
+    op.drop_constraint("scripts_user_id_fkey", "scripts", type_="foreignkey")
+    op.drop_constraint("scripts_id_key", "scripts", type_="unique")
+    op.drop_constraint("users_id_key", "users", type_="unique")
+    op.create_foreign_key(
+        "scripts_user_id_fkey",
+        "scripts",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scripts_user_id_created_at_id",
+            "scripts",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            ["created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_scripts_user_id_created_at_id",
+            table_name="scripts",
+            postgresql_concurrently=True,
+        )
+    op.create_unique_constraint("users_id_key", "users", ["id"])
+    op.create_unique_constraint("scripts_id_key", "scripts", ["id"])
@@ -0,0 +1,46 @@
+"""add generated search_vector column and GIN index on scripts
+
+Revision ID: 8a3d5e1f2b40
+Revises: 4f1c2a9d7e63
+Create Date: 2025-08-05 10:24:17.306114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a3d5e1f2b40"
+down_revision: Union[str, Sequence[str], None] = "4f1c2a9d7e63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE scripts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+        ") STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scripts_search_vector",
+            "scripts",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_scripts_search_vector",
+            table_name="scripts",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("scripts", "search_vector")
@@ -0,0 +1,43 @@
+"""create script_versions table
+
+Revision ID: c71e9b04d5a2
+Revises: 8a3d5e1f2b40
+Create Date: 2025-08-06 15:02:53.871420
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c71e9b04d5a2"
+down_revision: Union[str, Sequence[str], None] = "8a3d5e1f2b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "script_versions",
+        sa.Column("script_id", sa.UUID(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=True),
+        sa.Column("delta", sa.JSON(), nullable=True),
+        sa.Column("content_length", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["script_id"], ["scripts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("script_id", "version"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("script_versions")
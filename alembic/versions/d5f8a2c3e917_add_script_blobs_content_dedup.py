@@ -0,0 +1,68 @@
+"""add script_blobs for content-addressed script bodies
+
+Revision ID: d5f8a2c3e917
+Revises: c71e9b04d5a2
+Create Date: 2025-08-07 11:38:06.592174
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5f8a2c3e917"
+down_revision: Union[str, Sequence[str], None] = "c71e9b04d5a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "script_blobs",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.add_column(
+        "scripts", sa.Column("content_hash", sa.String(length=64), nullable=True)
+    )
+    op.create_foreign_key(
+        "scripts_content_hash_fkey",
+        "scripts",
+        "script_blobs",
+        ["content_hash"],
+        ["hash"],
+    )
+    op.alter_column("scripts", "content", existing_type=sa.String(), nullable=True)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scripts_content_hash",
+            "scripts",
+            ["content_hash"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Возвращаем тексты из script_blobs в строки скриптов.
+    op.execute(
+        "UPDATE scripts SET content = script_blobs.content "
+        "FROM script_blobs WHERE script_blobs.hash = scripts.content_hash"
+    )
+    op.alter_column("scripts", "content", existing_type=sa.String(), nullable=False)
+    op.drop_index("ix_scripts_content_hash", table_name="scripts")
+    op.drop_constraint("scripts_content_hash_fkey", "scripts", type_="foreignkey")
+    op.drop_column("scripts", "content_hash")
+    op.drop_table("script_blobs")
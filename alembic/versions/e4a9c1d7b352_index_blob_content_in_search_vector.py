@@ -0,0 +1,79 @@
+"""fill scripts.search_vector by trigger to index script_blobs content
+
+Revision ID: e4a9c1d7b352
+Revises: d5f8a2c3e917
+Create Date: 2025-08-08 09:12:44.718203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a9c1d7b352"
+down_revision: Union[str, Sequence[str], None] = "d5f8a2c3e917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_CONTENT_SQL = (
+    "coalesce({row}.content, "
+    "(SELECT content FROM script_blobs WHERE hash = {row}.content_hash))"
+)
+
+
+def search_vector_sql(row: str) -> str:
+    return (
+        f"setweight(to_tsvector('simple', coalesce({row}.name, '')), 'A') || "
+        "setweight(to_tsvector('simple', "
+        f"coalesce({SEARCH_CONTENT_SQL.format(row=row)}, '')), 'B')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Сгенерированная колонка не может читать script_blobs: делаем её
+    # обычной (значения и GIN-индекс сохраняются) и заполняем триггером.
+    op.execute("ALTER TABLE scripts ALTER COLUMN search_vector DROP EXPRESSION")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION scripts_search_vector_update() "
+        "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        f"NEW.search_vector := {search_vector_sql('NEW')}; RETURN NEW; END $$"
+    )
+    op.execute(
+        "CREATE TRIGGER scripts_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF name, content, content_hash ON scripts "
+        "FOR EACH ROW EXECUTE FUNCTION scripts_search_vector_update()"
+    )
+    # Тексты из script_blobs до сих пор не индексировались
+    op.execute(
+        f"UPDATE scripts SET search_vector = {search_vector_sql('scripts')} "
+        "WHERE content_hash IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER scripts_search_vector_update ON scripts")
+    op.execute("DROP FUNCTION scripts_search_vector_update()")
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_scripts_search_vector",
+            table_name="scripts",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("scripts", "search_vector")
+    op.execute(
+        "ALTER TABLE scripts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+        ") STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scripts_search_vector",
+            "scripts",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
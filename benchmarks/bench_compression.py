@@ -0,0 +1,106 @@
+"""
+Бенчмарк сжатия ответов: объём передаваемых данных и задержка эндпоинтов
+скриптов (страница списка и потоковый экспорт) по кодировкам.
+
+Запуск:
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench \
+        python -m benchmarks.bench_compression
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.app.api.script import router as script_router
+from src.app.core.compression import ENCODERS, CompressionMiddleware
+from src.app.core.database import Base, get_db
+from src.app.depends.auth import get_current_user_id
+from src.app.models.script import Script
+from src.app.models.user import User
+
+SCRIPTS = 2000
+LINES = 40
+REQUESTS = 20
+ENDPOINTS = (
+    ("/scripts/?limit=100", "list, 100 items"),
+    ("/scripts/export?format=ndjson", f"export ndjson, {SCRIPTS} items"),
+    ("/scripts/export?format=csv", f"export csv, {SCRIPTS} items"),
+)
+
+
+async def seed(session_factory) -> uuid.UUID:
+    user = User(
+        id=uuid.uuid4(), username="bench", email="b@ex.com", hashed_password="x"
+    )
+    async with session_factory() as db:
+        db.add(user)
+        db.add_all(
+            Script(
+                name=f"Скрипт {i}",
+                content="".join(
+                    f"Шаг {j}: оператор уточняет детали заказа {i}.\n"
+                    for j in range(LINES)
+                ),
+                user_id=user.id,
+            )
+            for i in range(SCRIPTS)
+        )
+        await db.commit()
+    return user.id
+
+
+async def measure(client: AsyncClient, url: str, encoding: str) -> tuple[int, float]:
+    timings, size = [], 0
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = await client.get(url, headers={"Accept-Encoding": encoding})
+        timings.append(time.perf_counter() - start)
+        size = response.num_bytes_downloaded
+    return size, statistics.median(timings) * 1000
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        user_id = await seed(session_factory)
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(script_router)
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user_id] = lambda: user_id
+
+        print(
+            f"{'endpoint':<28}{'encoding':>10}{'bytes':>11}{'ratio':>8}{'p50, ms':>10}"
+        )
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            for url, title in ENDPOINTS:
+                plain, _ = await measure(client, url, "identity")
+                for encoding in ("identity", *ENCODERS):
+                    size, latency = await measure(client, url, encoding)
+                    print(
+                        f"{title:<28}{encoding:>10}{size:>11}"
+                        f"{plain / size:>8.1f}{latency:>10.1f}"
+                    )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""
+Бенчмарк логина под нагрузкой: p99 логина и p99 постороннего эндпоинта
+при bcrypt в event loop ("before") и в пуле хеширования ("after").
+
+Запуск:
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench \
+        python -m benchmarks.bench_password_hashing
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.app.api.user import router as user_router
+from src.app.core.database import Base, get_db
+from src.app.core.security import PasswordHasher, password_hasher
+
+LOGINS = 24
+PING_INTERVAL = 0.01
+
+USER = {
+    "username": "benchuser",
+    "password": "Bench123321@",
+    "email": "bench@ex.com",
+    "full_name": "Bench User",
+}
+
+
+async def _inline_run(self, func, *args):
+    # Поведение до изменений: bcrypt прямо в event loop.
+    return func(*args)
+
+
+def p99(values: list[float]) -> float:
+    return statistics.quantiles(values, n=100)[98] * 1000
+
+
+async def build_app(db_path: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(user_router)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+async def run(mode: str, db_path: str) -> tuple[float, float]:
+    app = await build_app(db_path)
+    login_times: list[float] = []
+    ping_times: list[float] = []
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as ac:
+        await ac.post("/users/register", json=USER)
+        login = {"email": USER["email"], "password": USER["password"]}
+        done = asyncio.Event()
+
+        async def do_login():
+            start = time.perf_counter()
+            response = await ac.post("/users/login", json=login)
+            login_times.append(time.perf_counter() - start)
+            assert response.status_code in (200, 503), response.text
+
+        async def do_pings():
+            # Задержка считается от запланированного момента запроса, чтобы
+            # учитывать время, когда event loop был заблокирован.
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await ac.get("/ping")
+                ping_times.append(time.perf_counter() - scheduled)
+                scheduled += PING_INTERVAL
+
+        pinger = asyncio.create_task(do_pings())
+        await asyncio.gather(*(do_login() for _ in range(LOGINS)))
+        done.set()
+        await pinger
+    return p99(login_times), p99(ping_times)
+
+
+async def main():
+    original_run = PasswordHasher._run
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        PasswordHasher._run = _inline_run
+        before = await run("before", db_path)
+        PasswordHasher._run = original_run
+        after = await run("after", db_path)
+    password_hasher.shutdown()
+
+    print(f"{LOGINS} concurrent logins, {password_hasher.workers} workers")
+    print(f"{'mode':<8}{'login p99, ms':>16}{'ping p99, ms':>16}")
+    for name, (login_p99, ping_p99) in (("before", before), ("after", after)):
+        print(f"{name:<8}{login_p99:>16.1f}{ping_p99:>16.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Бенчмарк движков /regexp/validate_pattern: время одного fullmatch
+стандартного re и автомата линейного времени (LinearPattern)
+на обычных и патологических входах.
+
+Автомат берётся уже построенным, как из кэша compile_linear_pattern:
+первый прогон по тексту строит переходы ДКА, следующие идут по кэшу.
+Время построения автомата выводится отдельно, как и сопоставление
+пачки текстов с набором выражений (POST /regexp/batch): по парам и
+общим автоматом LinearPatternSet.
+
+Запуск:
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench \
+        python -m benchmarks.bench_regexp
+"""
+
+import re
+import time
+
+from src.app.utils.linear_regexp import LinearPattern, LinearPatternSet
+
+DURATION = 0.5
+SCRIPT = "Оператор уточняет детали заказа.\n" * 40
+
+NORMAL = (
+    ("ssn", r"\d{3}-\d{2}-\d{4}", "123-45-6789"),
+    ("email", r"[\w.+-]+@[\w-]+\.[\w.-]+", "operator.ivanov+crm@example.com"),
+    ("script 1KB", r"(?:[^\n]*\n)*[^\n]*заказ[^\n]*\n?", SCRIPT),
+    ("script 100KB", r"(?:[^\n]*\n)*[^\n]*заказ[^\n]*\n?", SCRIPT * 100),
+    ("variables", r"(?:[^{]|\{\{\w+\}\}|\{)*", SCRIPT.replace("заказа", "{{order}}")),
+)
+# (a+)+$ на a…ab: re перебирает 2^n разбиений, автомат — n шагов
+PATHOLOGICAL = r"(a+)+$"
+PATHOLOGICAL_SIZES = (16, 18, 20, 22)
+LINEAR_ONLY_SIZES = (1_000, 100_000)
+BATCH_TEXTS = [f"Здравствуйте, {{{{name}}}}! Ваш заказ №{i} готов." for i in range(200)]
+BATCH_PATTERNS = [
+    r".*заказ.*",
+    r".*\{\{\w+\}\}.*",
+    r"[^0-9]*",
+    r".*№\d{2}\D.*",
+    r"Здравствуйте.*",
+    r".*отмен.*",
+    r"\w+",
+    r".*(готов|выдан)\.",
+]
+
+
+def per_call(func, text: str) -> float:
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        func(text)
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def once(func, text: str) -> float:
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+
+def report(title: str, size: int, re_time: float | None, linear_time: float):
+    re_cell = f"{re_time * 1e6:>14.1f}" if re_time is not None else f"{'—':>14}"
+    print(f"{title:<22}{size:>9}{re_cell}{linear_time * 1e6:>14.1f}")
+
+
+def main():
+    print(f"{'pattern':<22}{'chars':>9}{'re, µs':>14}{'linear, µs':>14}")
+    for title, pattern, text in NORMAL:
+        compiled = re.compile(pattern)
+        linear = LinearPattern(pattern, 10000)
+        assert linear.fullmatch(text) == bool(compiled.fullmatch(text))
+        report(
+            title,
+            len(text),
+            per_call(compiled.fullmatch, text),
+            per_call(linear.fullmatch, text),
+        )
+
+    compiled = re.compile(PATHOLOGICAL)
+    linear = LinearPattern(PATHOLOGICAL, 10000)
+    for size in PATHOLOGICAL_SIZES:
+        text = "a" * size + "b"
+        report(
+            f"{PATHOLOGICAL} a^{size}b",
+            len(text),
+            once(compiled.fullmatch, text),
+            per_call(linear.fullmatch, text),
+        )
+    for size in LINEAR_ONLY_SIZES:
+        text = "a" * size + "b"
+        report(
+            f"{PATHOLOGICAL} a^{size}b", len(text), None, once(linear.fullmatch, text)
+        )
+
+    print()
+    print(f"{'pattern':<22}{'re.compile, µs':>18}{'LinearPattern, µs':>20}")
+    for title, pattern, _ in NORMAL[:3]:
+        # re.compile кэширует выражения — сбрасываем кэш перед каждой компиляцией
+        compile_re = per_call(lambda p: (re.purge(), re.compile(p)), pattern)
+        compile_linear = per_call(lambda p: LinearPattern(p, 10000), pattern)
+        print(f"{title:<22}{compile_re * 1e6:>18.1f}{compile_linear * 1e6:>20.1f}")
+
+    print()
+    texts, patterns = BATCH_TEXTS, BATCH_PATTERNS
+    compiled = [re.compile(pattern) for pattern in patterns]
+    linear = [LinearPattern(pattern, 10000) for pattern in patterns]
+    combined = LinearPatternSet(patterns, 10000 * len(patterns))
+    methods = (
+        ("re, по парам", lambda: [[c.fullmatch(t) for c in compiled] for t in texts]),
+        ("linear, по парам", lambda: [[p.fullmatch(t) for p in linear] for t in texts]),
+        ("linear, общий автомат", lambda: [combined.matches(t) for t in texts]),
+    )
+    print(f"{len(texts)} текстов × {len(patterns)} выражений")
+    for title, func in methods:
+        print(f"{title:<26}{per_call(lambda _: func(), '') * 1e3:>10.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Бенчмарк истории версий скриптов: байт на правку и задержка восстановления
+версии в зависимости от числа версий и периода снимков.
+
+Период 1 соответствует хранению полной копии на каждую правку.
+
+Запуск:
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench \
+        python -m benchmarks.bench_script_versions
+"""
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.app.core.config import settings
+from src.app.core.database import Base
+from src.app.models.script import Script
+from src.app.models.script_version import ScriptVersion
+from src.app.models.user import User
+from src.app.schemas.script import ScriptUpdate
+from src.app.service.script import ScriptService
+from src.app.service.script_version import ScriptVersionService
+
+LINES = 200
+VERSION_COUNTS = (10, 100, 500)
+SNAPSHOT_INTERVALS = (1, 10, 20, 50)
+READS = 50
+
+
+async def run(db_path: str, interval: int, edits: int) -> tuple[float, float, float]:
+    settings.SCRIPT_VERSION_SNAPSHOT_INTERVAL = interval
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(42)
+    lines = [f"Строка скрипта номер {i}: {'текст ' * 8}\n" for i in range(LINES)]
+    async with session_factory() as db:
+        user = User(
+            id=uuid.uuid4(), username="bench", email="b@ex.com", hashed_password="x"
+        )
+        script = Script(name="bench", content="".join(lines), user_id=user.id)
+        db.add_all([user, script])
+        await db.commit()
+
+        # Правка — замена одной-двух строк, как при типичном редактировании.
+        full_bytes = 0
+        for _ in range(edits):
+            for _ in range(rng.randint(1, 2)):
+                lines[rng.randrange(LINES)] = f"Правка {rng.random()}\n"
+            content = "".join(lines)
+            full_bytes += len(content)
+            await ScriptService.update_script(
+                script.id, ScriptUpdate(content=content), db
+            )
+
+        result = await db.execute(
+            select(ScriptVersion.content, ScriptVersion.delta).where(
+                ScriptVersion.version > 1
+            )
+        )
+        stored = sum(
+            len(content) if content is not None else len(json.dumps(delta))
+            for content, delta in result.all()
+        )
+
+        timings = []
+        for _ in range(READS):
+            version = rng.randint(1, edits + 1)
+            start = time.perf_counter()
+            await ScriptVersionService.get_version(script.id, version, db)
+            timings.append(time.perf_counter() - start)
+    await engine.dispose()
+    return stored / edits, full_bytes / edits, statistics.median(timings) * 1000
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        print(f"script of {LINES} lines, 1-2 changed lines per edit")
+        print(
+            f"{'versions':>9}{'interval':>10}{'bytes/edit':>12}"
+            f"{'full copy':>11}{'read p50, ms':>14}"
+        )
+        for edits in VERSION_COUNTS:
+            for interval in SNAPSHOT_INTERVALS:
+                per_edit, full, read_ms = await run(db_path, interval, edits)
+                print(
+                    f"{edits:>9}{interval:>10}{per_edit:>12.0f}"
+                    f"{full:>11.0f}{read_ms:>14.2f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Бенчмарк сериализации ответов: объектов в секунду для страниц
+GET /users/ и GET /scripts/ при разных способах построения ответа.
+
+- fastapi+json: штатный путь (валидация response_model, jsonable_encoder,
+  json.dumps);
+- fastapi+orjson: тот же путь с ORJSONResponse;
+- dump_json: одна валидация и TypeAdapter.dump_json;
+- dump_response: одна валидация, dump_python(mode="json") и
+  DefaultJSONResponse (orjson по умолчанию).
+
+Запуск:
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench \
+        python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from src.app.models.user import User
+from src.app.schemas.pagination import Page
+from src.app.schemas.script import ScriptRead
+from src.app.schemas.user import UserRead
+from src.app.utils.responses import dump_response
+
+PAGE_SIZES = (50, 500)
+DURATION = 1.0
+
+
+def make_users(count: int) -> list[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=uuid.uuid4(),
+            username=f"user{i}",
+            email=f"user{i}@ex.com",
+            full_name=f"Пользователь {i}",
+            hashed_password="x",
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def make_scripts(count: int) -> list[SimpleNamespace]:
+    # Script.content — column_property, у несохранённых объектов его нет
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            name=f"Скрипт {i}",
+            content="Оператор уточняет детали заказа.\n" * 40,
+            user_id=user_id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def throughput(render, items: int) -> float:
+    rendered, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        await render()
+        rendered += items
+    return rendered / (time.perf_counter() - start)
+
+
+async def main():
+    endpoints = (
+        ("GET /users/", UserRead, make_users),
+        ("GET /scripts/", ScriptRead, make_scripts),
+    )
+    print(f"{'endpoint':<15}{'page':>6}{'method':>20}{'items/s':>12}")
+    for title, schema, factory in endpoints:
+        field = create_model_field("Response", Page[schema], mode="serialization")
+        adapter = TypeAdapter(Page[schema])
+        for size in PAGE_SIZES:
+            page = {"items": factory(size), "next_cursor": None}
+
+            def fastapi_path(response_class):
+                async def render():
+                    content = await serialize_response(
+                        field=field, response_content=page
+                    )
+                    return response_class(content).body
+
+                return render
+
+            async def dump_json():
+                data = adapter.validate_python(page, from_attributes=True)
+                return adapter.dump_json(data)
+
+            async def dump_response_path():
+                return dump_response(adapter, page).body
+
+            methods = (
+                ("fastapi+json", fastapi_path(JSONResponse)),
+                ("fastapi+orjson", fastapi_path(ORJSONResponse)),
+                ("dump_json", dump_json),
+                ("dump_response", dump_response_path),
+            )
+            for method, render in methods:
+                rate = await throughput(render, size)
+                print(f"{title:<15}{size:>6}{method:>20}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
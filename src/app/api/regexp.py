@@ -1,10 +1,34 @@
-from fastapi import APIRouter
-from src.app.schemas.regexp import RegexpPatternRequest, RegexpTextRequest
+import re
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from src.app.core.config import settings
+from src.app.core.sandbox import SandboxTimeout
+from src.app.schemas.regexp import (
+    RegexpBatchRequest,
+    RegexpPatternRequest,
+    RegexpTextRequest,
+)
 from src.app.service.regexp import ScriptTextAnalyzer
+from src.app.utils.linear_regexp import UnsupportedPattern
+from src.app.utils.streaming import to_ndjson
 
 router = APIRouter(prefix="/regexp", tags=["regexp"])
 
 
+def _pattern_error(e: Exception, prefix: str = "") -> HTTPException:
+    """422 для некорректного или не поддерживаемого выражения."""
+    reason = (
+        "Выражение не поддерживается"
+        if isinstance(e, UnsupportedPattern)
+        else "Некорректное регулярное выражение"
+    )
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"{prefix}{reason}: {e}",
+    )
+
+
 @router.post("/extract_emails")
 async def extract_emails(data: RegexpTextRequest):
     """
@@ -27,6 +51,71 @@ async def extract_variables(data: RegexpTextRequest):
 async def validate_pattern(data: RegexpPatternRequest):
     """
     Проверить, соответствует ли текст скрипта заданному регулярному выражению.
+
+    Некорректное или не поддерживаемое движком REGEXP_ENGINE выражение —
+    422, не уложившееся в REGEXP_TIMEOUT (движок re) — 408.
     """
-    is_valid = ScriptTextAnalyzer.validate_script_pattern(data.text, data.pattern)
+    try:
+        is_valid = await ScriptTextAnalyzer.validate_script_pattern(
+            data.text, data.pattern
+        )
+    except (re.error, UnsupportedPattern) as e:
+        raise _pattern_error(e)
+    except SandboxTimeout as e:
+        raise HTTPException(status_code=status.HTTP_408_REQUEST_TIMEOUT, detail=str(e))
     return {"is_valid": is_valid}
+
+
+@router.post("/batch")
+async def match_batch(data: RegexpBatchRequest):
+    """
+    Сопоставить много текстов со многими выражениями.
+
+    Ответ — поток NDJSON, по строке на текст в порядке запроса:
+    {"index": i, "matches": [совпадение с каждым выражением]} или
+    {"index": i, "error": "..."}, если пачка текстов не уложилась в
+    REGEXP_TIMEOUT. Выражения проверяются до начала ответа: некорректное
+    или не поддерживаемое движком REGEXP_ENGINE — 422.
+
+    Args:
+        data (RegexpBatchRequest): Тексты (до REGEXP_BATCH_MAX_TEXTS)
+            и выражения (до REGEXP_BATCH_MAX_PATTERNS).
+
+    Returns:
+        StreamingResponse: Поток строк матрицы совпадений.
+
+    Raises:
+        HTTPException: Если текстов или выражений слишком много
+            или выражение некорректно.
+    """
+    if len(data.texts) > settings.REGEXP_BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Можно передать не больше {settings.REGEXP_BATCH_MAX_TEXTS} текстов",
+        )
+    if len(data.patterns) > settings.REGEXP_BATCH_MAX_PATTERNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Можно передать не больше {settings.REGEXP_BATCH_MAX_PATTERNS} "
+                "выражений"
+            ),
+        )
+    for index, pattern in enumerate(data.patterns):
+        try:
+            ScriptTextAnalyzer.check_pattern(pattern)
+        except (re.error, UnsupportedPattern) as e:
+            raise _pattern_error(e, f"Выражение {index}: ")
+
+    async def body():
+        async for rows in ScriptTextAnalyzer.match_patterns(data.texts, data.patterns):
+            yield to_ndjson(
+                (
+                    {"index": index, "matches": matches}
+                    if error is None
+                    else {"index": index, "error": error}
+                )
+                for index, matches, error in rows
+            )
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
@@ -1,14 +1,64 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.app.core.database import get_db
+from src.app.core.config import settings
+from src.app.core.database import get_db, get_read_db
 from src.app.depends.auth import get_current_user_id
-from src.app.schemas.script import ScriptCreate, ScriptRead, ScriptUpdate
+from src.app.depends.fields import sparse_fields
+from src.app.schemas.pagination import Page
+from src.app.schemas.script import (
+    ScriptBatch,
+    ScriptBatchRequest,
+    ScriptBulkResult,
+    ScriptCreate,
+    ScriptDedupStats,
+    ScriptRead,
+    ScriptSearchHit,
+    ScriptSummary,
+    ScriptUpdate,
+    ScriptVersionContent,
+    ScriptVersionDiff,
+    ScriptVersionRead,
+)
 from src.app.service.script import ScriptService
+from src.app.service.script_blob import ScriptBlobService
+from src.app.service.script_version import ScriptVersionService
+from src.app.utils.etag import etag_matches, make_etag
+from src.app.utils.fields import pick_fields
+from src.app.utils.pagination import (
+    DEFAULT_PAGE_LIMIT,
+    MAX_PAGE_LIMIT,
+    InvalidCursorError,
+)
+from src.app.utils.responses import DefaultJSONResponse, dump_response
+from src.app.utils.streaming import (
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+    to_csv,
+    to_ndjson,
+)
 
 router = APIRouter(prefix="/scripts", tags=["scripts"])
 
+SCRIPT_READ = TypeAdapter(ScriptRead)
+SCRIPT_PAGE = TypeAdapter(Page[ScriptRead])
+SCRIPT_BATCH = TypeAdapter(ScriptBatch)
+
 
 @router.post("/", response_model=ScriptRead, status_code=status.HTTP_201_CREATED)
 async def create_script(
@@ -30,25 +80,426 @@ async def create_script(
     return script
 
 
+@router.post("/bulk", response_model=ScriptBulkResult)
+async def bulk_create_scripts(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] | None = Query(None, alias="format"),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Массово импортировать скрипты из потокового тела запроса.
+
+    Тело читается и разбирается построчно, скрипты вставляются пачками
+    по SCRIPT_IMPORT_BATCH_SIZE. Формат — NDJSON (по объекту
+    {"name", "content"} в строке) или CSV с заголовком name,content;
+    определяется параметром format или Content-Type.
+
+    Строка (или запись CSV) длиннее SCRIPT_IMPORT_MAX_LINE_LENGTH
+    прерывает импорт: скрипты до неё сохраняются, а в errors последней
+    идёт ошибка с номером этой строки.
+
+    Args:
+        request (Request): Запрос с телом NDJSON/CSV.
+        fmt (str | None): Формат тела: ndjson или csv.
+        user_id (UUID): Идентификатор пользователя.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        ScriptBulkResult: Количество добавленных скриптов и ошибки по строкам.
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    lines = iter_lines(request.stream(), settings.SCRIPT_IMPORT_MAX_LINE_LENGTH)
+    if fmt == "csv":
+        records = iter_csv_records(
+            lines, settings.SCRIPT_IMPORT_MAX_LINE_LENGTH, required=("name", "content")
+        )
+    else:
+        records = iter_ndjson_records(lines)
+    inserted, failed, errors = await ScriptService.bulk_create_scripts(
+        records,
+        user_id,
+        db,
+        settings.SCRIPT_IMPORT_BATCH_SIZE,
+        settings.SCRIPT_IMPORT_MAX_ERRORS,
+    )
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+
+EXPORT_COLUMNS = ("id", "name", "content", "user_id", "created_at", "updated_at")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def _scripts_batch(
+    ids: list[UUID], fields: list[str] | None, user_id: UUID, db: AsyncSession
+):
+    """Ответ GET /scripts/?ids= и POST /scripts/batch."""
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Не передано ни одного id"
+        )
+    if len(ids) > settings.SCRIPT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Можно запросить не больше {settings.SCRIPT_BATCH_MAX_IDS} id",
+        )
+    scripts, missing = await ScriptService.get_scripts_by_ids(ids, user_id, db, fields)
+    if fields:
+        return DefaultJSONResponse(
+            {
+                "items": pick_fields(scripts, fields),
+                "missing": [str(i) for i in missing],
+            }
+        )
+    return dump_response(SCRIPT_BATCH, {"items": scripts, "missing": missing})
+
+
+@router.post("/batch", response_model=ScriptBatch)
+async def get_scripts_batch(
+    batch: ScriptBatchRequest,
+    fields: list[str] | None = Depends(sparse_fields(ScriptRead)),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Получить скрипты текущего пользователя по списку id одним запросом.
+
+    Вариант GET /scripts/?ids= для длинных списков. Скрипты возвращаются
+    в порядке запроса (повторы id отбрасываются); id, которых нет среди
+    скриптов пользователя, перечислены в missing.
+
+    Args:
+        batch (ScriptBatchRequest): Список id (до SCRIPT_BATCH_MAX_IDS).
+        fields (list[str] | None): Вернуть только эти поля.
+        user_id (UUID): Идентификатор пользователя.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        ScriptBatch: Найденные скрипты и отсутствующие id.
+
+    Raises:
+        HTTPException: Если id слишком много или список полей некорректен.
+    """
+    return await _scripts_batch(batch.ids, fields, user_id, db)
+
+
+@router.get("/export")
+async def export_scripts(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Выгрузить все скрипты текущего пользователя потоком NDJSON или CSV.
+
+    Скрипты читаются серверным курсором пачками по SCRIPT_EXPORT_BATCH_SIZE
+    и отдаются клиенту по мере чтения.
+
+    Args:
+        fmt (str): Формат выгрузки: ndjson или csv.
+        user_id (UUID): Идентификатор пользователя.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        StreamingResponse: Поток с выгрузкой скриптов.
+    """
+    # Зависимость закрывает сессию до отправки тела ответа,
+    # поэтому курсор открывается в собственной сессии на том же движке.
+    bind = db.bind
+
+    async def body():
+        if fmt == "csv":
+            yield to_csv([EXPORT_COLUMNS])
+        async with AsyncSession(bind) as session:
+            async for batch in ScriptService.stream_scripts(
+                user_id, session, settings.SCRIPT_EXPORT_BATCH_SIZE
+            ):
+                rows = [
+                    ScriptRead.model_validate(script).model_dump(mode="json")
+                    for script in batch
+                ]
+                if fmt == "csv":
+                    yield to_csv([row[c] for c in EXPORT_COLUMNS] for row in rows)
+                else:
+                    yield to_ndjson(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="scripts.{fmt}"'},
+    )
+
+
+@router.get("/summary", response_model=Page[ScriptSummary])
+async def list_script_summaries(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Получить страницу кратких описаний скриптов текущего пользователя
+    (без текста скрипта).
+
+    Args:
+        limit (int): Размер страницы.
+        cursor (str | None): Курсор из next_cursor предыдущей страницы.
+        user_id (UUID): Идентификатор пользователя.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        Page[ScriptSummary]: Краткие описания скриптов и курсор следующей
+            страницы.
+
+    Raises:
+        HTTPException: Если курсор некорректен.
+    """
+    try:
+        items, next_cursor = await ScriptService.list_script_summaries(
+            user_id, db, limit, cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor, "estimated_total": None}
+
+
+@router.get("/search", response_model=Page[ScriptSearchHit])
+async def search_scripts(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Полнотекстовый поиск по скриптам текущего пользователя.
+
+    Args:
+        q (str): Поисковый запрос.
+        limit (int): Размер страницы.
+        cursor (str | None): Курсор из next_cursor предыдущей страницы.
+        user_id (UUID): Идентификатор пользователя.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        Page[ScriptSearchHit]: Найденные скрипты по убыванию релевантности
+            и курсор следующей страницы.
+
+    Raises:
+        HTTPException: Если курсор некорректен (400) или СУБД
+            не поддерживает поиск (501).
+    """
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор"
+        )
+    try:
+        hits, next_offset = await ScriptService.search_scripts(
+            user_id, q, db, limit, int(cursor or 0)
+        )
+    except NotImplementedError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    return {
+        "items": hits,
+        "next_cursor": None if next_offset is None else str(next_offset),
+        "estimated_total": None,
+    }
+
+
+@router.get("/dedup/stats", response_model=ScriptDedupStats)
+async def script_dedup_stats(db: AsyncSession = Depends(get_read_db)):
+    """
+    Получить статистику дедупликации текстов скриптов.
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        ScriptDedupStats: Число текстов и ссылок, объёмы и коэффициент.
+    """
+    return await ScriptBlobService.stats(db)
+
+
+@router.get("/", response_model=Page[ScriptRead] | ScriptBatch)
+async def list_scripts(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    include_total: bool = False,
+    ids: str | None = Query(
+        None, description="id через запятую: вернуть эти скрипты одним запросом"
+    ),
+    fields: list[str] | None = Depends(sparse_fields(ScriptRead)),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Получить страницу скриптов текущего пользователя.
+
+    С параметром ids вместо страницы возвращаются скрипты с этими id
+    (см. POST /scripts/batch).
+
+    Args:
+        limit (int): Размер страницы.
+        cursor (str | None): Курсор из next_cursor предыдущей страницы.
+        include_total (bool): Добавить оценку общего числа скриптов.
+        ids (str | None): id скриптов через запятую.
+        fields (list[str] | None): Вернуть только эти поля.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        Page[ScriptRead] | ScriptBatch: Скрипты страницы и курсор следующей
+            либо скрипты по ids.
+
+    Raises:
+        HTTPException: Если курсор, список id или список полей некорректен.
+    """
+    if ids is not None:
+        try:
+            script_ids = [UUID(item) for item in ids.split(",") if item.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ids должен содержать UUID через запятую",
+            )
+        return await _scripts_batch(script_ids, fields, user_id, db)
+    try:
+        scripts, next_cursor, estimated_total = await ScriptService.list_scripts(
+            user_id, db, limit, cursor, include_total, fields
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page = {"next_cursor": next_cursor, "estimated_total": estimated_total}
+    if fields:
+        return DefaultJSONResponse({"items": pick_fields(scripts, fields), **page})
+    return dump_response(SCRIPT_PAGE, {"items": scripts, **page})
+
+
 @router.get("/{script_id}", response_model=ScriptRead)
-async def get_script(script_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_script(
+    script_id: UUID,
+    fields: list[str] | None = Depends(sparse_fields(ScriptRead)),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Получить скрипт по id.
 
+    Ответ содержит слабый ETag; при совпадении If-None-Match
+    возвращается 304 после запроса одного updated_at.
+
     Args:
         script_id (str): Идентификатор скрипта.
+        fields (list[str] | None): Вернуть только эти поля.
+        if_none_match (str | None): ETag, сохранённый клиентом.
         db (AsyncSession): Асинхронная сессия БД.
 
     Returns:
         ScriptRead: Данные скрипта.
 
     Raises:
-        HTTPException: Если скрипт не найден.
+        HTTPException: Если скрипт не найден или список полей некорректен.
     """
-    script = await ScriptService.get_script(script_id, db)
+    if if_none_match is not None:
+        updated_at = await ScriptService.get_script_updated_at(script_id, db)
+        if updated_at is not None:
+            etag = make_etag(script_id, updated_at, fields)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+    script = await ScriptService.get_script(
+        script_id, db, fields and [*fields, "updated_at", "created_at"]
+    )
     if not script:
         raise HTTPException(status_code=404, detail="Скрипт не найден")
-    return script
+    # Как в get_script_updated_at: иначе 304 не сработает для строк без updated_at
+    etag = make_etag(script_id, script.updated_at or script.created_at, fields)
+    if fields:
+        return DefaultJSONResponse(
+            pick_fields([script], fields)[0], headers={"ETag": etag}
+        )
+    return dump_response(SCRIPT_READ, script, headers={"ETag": etag})
+
+
+@router.get("/{script_id}/versions", response_model=list[ScriptVersionRead])
+async def list_script_versions(
+    script_id: UUID, db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Получить список версий скрипта.
+
+    Args:
+        script_id (UUID): Идентификатор скрипта.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        list[ScriptVersionRead]: Версии по возрастанию номера.
+
+    Raises:
+        HTTPException: Если скрипт не найден.
+    """
+    versions = await ScriptVersionService.list_versions(script_id, db)
+    if versions is None:
+        raise HTTPException(status_code=404, detail="Скрипт не найден")
+    return versions
+
+
+@router.get("/{script_id}/versions/diff", response_model=ScriptVersionDiff)
+async def diff_script_versions(
+    script_id: UUID,
+    from_version: int = Query(alias="from", ge=1),
+    to_version: int = Query(alias="to", ge=1),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Сравнить две версии скрипта.
+
+    Args:
+        script_id (UUID): Идентификатор скрипта.
+        from_version (int): Исходная версия.
+        to_version (int): Целевая версия.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        ScriptVersionDiff: Unified diff между версиями.
+
+    Raises:
+        HTTPException: Если скрипт или версия не найдены.
+    """
+    diff = await ScriptVersionService.diff_versions(
+        script_id, from_version, to_version, db
+    )
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Версия не найдена")
+    return {"from_version": from_version, "to_version": to_version, "diff": diff}
+
+
+@router.get("/{script_id}/versions/{version}", response_model=ScriptVersionContent)
+async def get_script_version(
+    script_id: UUID,
+    version: int = Path(ge=1),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Получить текст версии скрипта.
+
+    Args:
+        script_id (UUID): Идентификатор скрипта.
+        version (int): Номер версии.
+        db (AsyncSession): Асинхронная сессия БД.
+
+    Returns:
+        ScriptVersionContent: Текст версии.
+
+    Raises:
+        HTTPException: Если скрипт или версия не найдены.
+    """
+    script_version = await ScriptVersionService.get_version(script_id, version, db)
+    if script_version is None:
+        raise HTTPException(status_code=404, detail="Версия не найдена")
+    return script_version
 
 
 @router.patch("/{script_id}", response_model=ScriptRead)
@@ -1,21 +1,35 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from passlib.context import CryptContext
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.app.core.database import get_db
+from src.app.core.database import get_db, get_read_db
 from src.app.core.jwt import (
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
 )
+from src.app.core.security import password_hasher
+from src.app.depends.fields import sparse_fields
 from src.app.models.user import User
+from src.app.schemas.pagination import Page
 from src.app.schemas.user import UserCreate, UserLogin, UserRead, UserUpdate
 from src.app.service.user import UserService
+from src.app.utils.etag import etag_matches, make_etag
+from src.app.utils.fields import columns_for, pick_fields
+from src.app.utils.pagination import (
+    DEFAULT_PAGE_LIMIT,
+    MAX_PAGE_LIMIT,
+    InvalidCursorError,
+)
+from src.app.utils.responses import DefaultJSONResponse, dump_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+USER_READ = TypeAdapter(UserRead)
+USER_PAGE = TypeAdapter(Page[UserRead])
+
 
 @router.post("/register", response_model=UserRead, status_code=201)
 async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -105,45 +119,93 @@ async def refresh_token_endpoints(refresh_token: str):
 
 
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_user(
+    user_id: UUID,
+    fields: list[str] | None = Depends(sparse_fields(UserRead)),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Получить пользователя по id.
 
+    Ответ содержит слабый ETag; при совпадении If-None-Match
+    возвращается 304 после запроса одного updated_at.
+
     Args:
         user_id (str): UUID пользователя.
+        fields (list[str] | None): Вернуть только эти поля.
+        if_none_match (str | None): ETag, сохранённый клиентом.
         db (AsyncSession): Асинхронная сессия БД.
 
     Returns:
         UserRead: Данные пользователя.
 
     Raises:
-        HTTPException: Если пользователь не найден.
+        HTTPException: Если пользователь не найден или список полей
+            некорректен.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    if user := result.scalar_one_or_none():
-        return user
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден."
+    changed_at = func.coalesce(User.updated_at, User.created_at)
+    if if_none_match is not None:
+        result = await db.execute(select(changed_at).where(User.id == user_id))
+        if (updated_at := result.scalar_one_or_none()) is not None:
+            etag = make_etag(user_id, updated_at, fields)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+    if fields:
+        result = await db.execute(
+            select(*columns_for(User, fields), changed_at.label("changed_at")).where(
+                User.id == user_id
+            )
         )
-
-
-@router.get("/", response_model=list[UserRead])
+        if row := result.one_or_none():
+            return DefaultJSONResponse(
+                pick_fields([row], fields)[0],
+                headers={"ETag": make_etag(user_id, row.changed_at, fields)},
+            )
+    elif user := await UserService.get_user(user_id, db):
+        etag = make_etag(user_id, user.updated_at or user.created_at)
+        return dump_response(USER_READ, user, headers={"ETag": etag})
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден."
+    )
+
+
+@router.get("/", response_model=Page[UserRead])
 async def list_users(
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    include_total: bool = False,
+    fields: list[str] | None = Depends(sparse_fields(UserRead)),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Получить список всех пользователей.
+    Получить страницу пользователей.
 
     Args:
+        limit (int): Размер страницы.
+        cursor (str | None): Курсор из next_cursor предыдущей страницы.
+        include_total (bool): Добавить оценку общего числа пользователей.
+        fields (list[str] | None): Вернуть только эти поля.
         db (AsyncSession): Асинхронная сессия БД.
 
     Returns:
-        list[UserRead]: Список пользователей.
+        Page[UserRead]: Пользователи страницы и курсор следующей.
+
+    Raises:
+        HTTPException: Если курсор или список полей некорректен.
     """
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+    try:
+        users, next_cursor, estimated_total = await UserService.list_users(
+            db, limit, cursor, include_total, fields
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page = {"next_cursor": next_cursor, "estimated_total": estimated_total}
+    if fields:
+        return DefaultJSONResponse({"items": pick_fields(users, fields), **page})
+    return dump_response(USER_PAGE, {"items": users, **page})
 
 
 @router.patch("/{user_id}", response_model=UserRead)
@@ -164,27 +226,30 @@ async def update_user(
     Raises:
         HTTPException: Если пользователь не найден.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
+    update_data = user_data.dict(exclude_unset=True)
+    if password := update_data.pop("password", None):
+        update_data["hashed_password"] = await password_hasher.hash(password)
+    if update_data:
+        stmt = (
+            update(User).where(User.id == user_id).values(**update_data).returning(User)
+        )
+    else:
+        stmt = select(User).where(User.id == user_id)
+    result = await db.execute(stmt)
     user = result.scalar_one_or_none()
+    await db.commit()
+    UserService.invalidate_user(user_id, db.bind)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден"
         )
-    update_data = user_data.dict(exclude_unset=True)
-    if "password" in update_data and update_data["password"]:
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        setattr(user, "hashed_password", pwd_context.hash(update_data.pop("password")))
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    await db.commit()
-    await db.refresh(user)
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
     """
-    Удалить пользователя по id.
+    Удалить пользователя по id вместе с его скриптами.
     Args:
         user_id (str): UUID пользователя.
         db (AsyncSession): Асинхронная сессия БД.
@@ -193,13 +258,9 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
     Raises:
         HTTPException: Если пользователь не найден.
     """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    if not await UserService.delete_user(user_id, db):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пользователь не найден",
         )
-    await db.delete(user)
-    await db.commit()
-    return None, "Пользователь удален."
+    return None
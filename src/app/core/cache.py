@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+REDIS_POOL_SIZE = 10
+REDIS_TIMEOUT = 1.0
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Потокобезопасный LRU-кэш в памяти процесса с ограничением размера
+    и временем жизни для каждой записи.
+
+    Атрибуты:
+        maxsize (int): Максимальное число записей (0 — кэш отключён).
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов.
+        evictions (int): Количество вытеснений по LRU.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """
+        Получить значение по ключу.
+
+        Args:
+            key (K): Ключ записи.
+
+        Returns:
+            V | None: Значение, если запись есть и не истекла, иначе None.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        """
+        Сохранить значение в кэше.
+
+        Args:
+            key (K): Ключ записи.
+            value (V): Значение.
+            expires_at (float | None): Unix-время истечения записи
+                (None — без ограничения по времени).
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """
+        Удалить запись из кэша, если она есть.
+
+        Args:
+            key (K): Ключ записи.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Очистить кэш и сбросить счётчики.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Получить статистику кэша.
+
+        Returns:
+            dict[str, Any]: Размер, лимит, попадания, промахи и вытеснения.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище для VersionedCache: байтовые значения с временем жизни.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Получить значение или None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Сохранить значение, только если ключа нет. True — сохранено."""
+
+    async def stats(self) -> dict[str, Any]:
+        """Статистика хранилища."""
+        return {}
+
+    async def close(self) -> None:
+        """Освободить ресурсы."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Хранилище в памяти процесса (LRU + TTL).
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.cache: LRUCache[str, bytes] = LRUCache(maxsize)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.cache.set(key, value, time.time() + ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        # Event loop однопоточный: между get и set другая корутина не вклинится.
+        if self.cache.get(key) is not None:
+            return False
+        self.cache.set(key, value, time.time() + ttl)
+        return True
+
+    async def stats(self) -> dict[str, Any]:
+        stats = self.cache.stats()
+        return {
+            "backend": "memory",
+            "size": stats["size"],
+            "maxsize": stats["maxsize"],
+            "evictions": stats["evictions"],
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Хранилище в Redis. Сбои Redis не ломают запросы: чтение считается
+    промахом, запись пропускается, ошибки считаются в статистике.
+    """
+
+    def __init__(self, client: redis.Redis) -> None:
+        self.client = client
+        self.errors = 0
+
+    def _failed(self, e: Exception) -> None:
+        self.errors += 1
+        logger.warning("Ошибка Redis-кэша: %s", e)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.client.get(key)
+        except RedisError as e:
+            self._failed(e)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self.client.set(key, value, px=int(ttl * 1000))
+        except RedisError as e:
+            self._failed(e)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        try:
+            stored = await self.client.set(key, value, px=int(ttl * 1000), nx=True)
+        except RedisError as e:
+            self._failed(e)
+            return False
+        return bool(stored)
+
+    async def stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {"backend": "redis", "errors": self.errors}
+        try:
+            info = await self.client.info("stats")
+        except RedisError as e:
+            self._failed(e)
+            return stats
+        if "evicted_keys" in info:
+            stats["evictions"] = int(info["evicted_keys"])
+        return stats
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class VersionedCache:
+    """
+    Read-through кэш с поколениями ключей.
+
+    У каждого ключа есть штамп поколения; значение хранится под
+    «ключ + штамп». Инвалидация записывает новый штамп, поэтому
+    читатель, начавший загрузку из БД до изменения, сохранит результат
+    под старым штампом, и его уже никто не прочитает. Пропавший штамп
+    (TTL, вытеснение) заменяется новым уникальным, а не сбрасывается,
+    так что старые записи не оживают.
+
+    Атрибуты:
+        backend (CacheBackend): Хранилище.
+        namespace (str): Префикс ключей.
+        ttl (float): Время жизни записей в секундах.
+        hits (int): Попадания.
+        misses (int): Промахи.
+        invalidations (int): Инвалидации.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: float) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _stamp_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}:stamp"
+
+    @staticmethod
+    def _new_stamp() -> bytes:
+        return str(time.time_ns()).encode()
+
+    async def lookup(self, key: str) -> tuple[bytes | None, bytes]:
+        """
+        Найти значение в кэше.
+
+        Args:
+            key (str): Ключ.
+
+        Returns:
+            tuple[bytes | None, bytes]: Значение (None — промах) и штамп
+                поколения, который нужно передать в store при промахе.
+        """
+        stamp_key = self._stamp_key(key)
+        stamp = await self.backend.get(stamp_key)
+        if stamp is None:
+            stamp = self._new_stamp()
+            # Штамп живёт дольше записей, чтобы промахи из-за его
+            # истечения были редкими.
+            if not await self.backend.add(stamp_key, stamp, self.ttl * 2):
+                stamp = await self.backend.get(stamp_key) or stamp
+        value = await self.backend.get(f"{self.namespace}:{key}:{stamp.decode()}")
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, stamp
+
+    async def store(self, key: str, stamp: bytes, value: bytes) -> None:
+        """
+        Сохранить значение, загруженное после промаха.
+
+        Args:
+            key (str): Ключ.
+            stamp (bytes): Штамп поколения из lookup.
+            value (bytes): Значение.
+        """
+        await self.backend.set(
+            f"{self.namespace}:{key}:{stamp.decode()}", value, self.ttl
+        )
+
+    async def invalidate(self, key: str) -> None:
+        """
+        Сделать закэшированное значение недоступным (после commit).
+
+        Args:
+            key (str): Ключ.
+        """
+        self.invalidations += 1
+        await self.backend.set(self._stamp_key(key), self._new_stamp(), self.ttl * 2)
+
+    async def stats(self) -> dict[str, Any]:
+        """
+        Статистика кэша: попадания, промахи, доля попаданий,
+        инвалидации и статистика хранилища.
+
+        Returns:
+            dict[str, Any]: Счётчики кэша.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            **await self.backend.stats(),
+        }
+
+    async def close(self) -> None:
+        """
+        Закрыть хранилище.
+        """
+        await self.backend.close()
+
+
+def create_cache_backend(
+    kind: str, maxsize: int, redis_url: str
+) -> CacheBackend | None:
+    """
+    Создать хранилище кэша по настройкам.
+
+    Args:
+        kind (str): memory, redis или none.
+        maxsize (int): Лимит записей для memory.
+        redis_url (str): URL Redis для redis.
+
+    Returns:
+        CacheBackend | None: Хранилище или None, если кэш отключён.
+
+    Raises:
+        ValueError: Если тип хранилища неизвестен.
+    """
+    if kind in ("", "none"):
+        return None
+    if kind == "memory":
+        return MemoryCacheBackend(maxsize)
+    if kind == "redis":
+        # Блокирующий пул: при нехватке соединений команда ждёт свободное,
+        # а не падает сразу; сетевые сбои укладываются в таймауты.
+        # RESP2 явно: кэшу хватает, и HELLO не нужен (Redis < 6 его не знает).
+        pool = redis.BlockingConnectionPool.from_url(
+            redis_url,
+            protocol=2,
+            max_connections=REDIS_POOL_SIZE,
+            timeout=REDIS_TIMEOUT,
+            socket_timeout=REDIS_TIMEOUT,
+            socket_connect_timeout=REDIS_TIMEOUT,
+        )
+        return RedisCacheBackend(redis.Redis.from_pool(pool))
+    raise ValueError(f"Неизвестный тип кэша: {kind}")
@@ -0,0 +1,240 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+# Потоки событий должны доходить до клиента сразу, сжимать их нельзя.
+EXCLUDED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class Encoder(ABC):
+    """
+    Потоковый компрессор: сжатие кусками, сброс накопленного и завершение.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Сжать очередной кусок (результат может быть пустым)."""
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """Выдать всё сжатое на данный момент, не завершая поток."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """Завершить поток."""
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int):
+        # wbits=31 — формат gzip (заголовок и CRC32)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS: dict[str, Callable[[int], Encoder]] = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def select_encoding(accept_encoding: str, preference: list[str]) -> str | None:
+    """
+    Выбрать кодировку по Accept-Encoding с учётом q-значений.
+
+    При равных q побеждает более ранняя кодировка из preference.
+
+    Args:
+        accept_encoding (str): Значение заголовка Accept-Encoding.
+        preference (list[str]): Доступные кодировки в порядке приоритета.
+
+    Returns:
+        str | None: Выбранная кодировка или None (без сжатия).
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        param, _, value = params.partition("=")
+        if param.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in preference:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware сжатия ответов (gzip, а также br/zstd при наличии
+    пакетов brotli/zstandard).
+
+    Ответы целиком сжимаются только от minimum_size байт. Потоковые
+    ответы (StreamingResponse) сжимаются по мере поступления кусков без
+    буферизации всего тела: сжатое выдаётся клиенту не реже, чем через
+    каждые minimum_size байт исходных данных.
+
+    Args:
+        app (ASGIApp): Оборачиваемое приложение.
+        minimum_size (int): Минимальный размер тела для сжатия.
+        encodings (list[str] | None): Кодировки в порядке приоритета;
+            недоступные в окружении пропускаются.
+        levels (dict[str, int] | None): Уровни сжатия по кодировкам.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: list[str] | None = None,
+        levels: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [
+            name for name in encodings or ["zstd", "br", "gzip"] if name in ENCODERS
+        ]
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(
+            send, encoding, self.levels[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Состояние сжатия одного ответа."""
+
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._level = level
+        self._minimum_size = minimum_size
+        self._start: Message | None = None
+        self._encoder: Encoder | None = None
+        self._passthrough = False
+        self._pending = 0
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            if "content-encoding" in headers or media_type in EXCLUDED_MEDIA_TYPES:
+                self._passthrough = True
+                await self._send(message)
+            else:
+                # Ждём первый кусок тела: по нему решаем, сжимать ли ответ
+                self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._encoder is None:
+            if not more_body and len(body) < self._minimum_size:
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            self._encoder = ENCODERS[self._encoding](self._level)
+            headers = MutableHeaders(raw=self._start["headers"])
+            headers["Content-Encoding"] = self._encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self._encoder.compress(body) + self._encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(self._start)
+
+        compressed = self._encoder.compress(body)
+        self._pending += len(body)
+        if not more_body:
+            compressed += self._encoder.finish()
+        elif self._pending >= self._minimum_size:
+            compressed += self._encoder.flush()
+            self._pending = 0
+        if compressed or not more_body:
+            await self._send(
+                {
+                    "type": "http.response.body",
+                    "body": compressed,
+                    "more_body": more_body,
+                }
+            )
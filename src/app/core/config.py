@@ -11,12 +11,91 @@ class Settings:
     DB_USER: str = os.getenv("DB_USER", "postgres")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
     DB_NAME: str = os.getenv("DB_NAME", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_READ_REPLICA_URLS: list[str] = [
+        url.strip()
+        for url in os.getenv("DB_READ_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(
+        os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5)
+    )
+    DB_REPLICA_HEALTHCHECK_INTERVAL: float = float(
+        os.getenv("DB_REPLICA_HEALTHCHECK_INTERVAL", 5)
+    )
     SECRET_KEY: str = os.getenv("SECRET_KEY", "")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     REFRESH_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 1440)
     )
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    ACCESS_TOKEN_CACHE_SIZE: int = int(os.getenv("ACCESS_TOKEN_CACHE_SIZE", 10000))
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_IN_FLIGHT: int = int(os.getenv("PASSWORD_HASH_MAX_IN_FLIGHT", 32))
+    # 0 — подобрать стоимость bcrypt при старте под PASSWORD_HASH_TARGET_MS
+    PASSWORD_HASH_ROUNDS: int = int(os.getenv("PASSWORD_HASH_ROUNDS", 0))
+    PASSWORD_HASH_TARGET_MS: float = float(os.getenv("PASSWORD_HASH_TARGET_MS", 250))
+    PASSWORD_HASH_MIN_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", 10))
+    PASSWORD_HASH_MAX_ROUNDS: int = int(os.getenv("PASSWORD_HASH_MAX_ROUNDS", 16))
+    REGEXP_SANDBOX_WORKERS: int = int(os.getenv("REGEXP_SANDBOX_WORKERS", 2))
+    REGEXP_SANDBOX_MAX_IN_FLIGHT: int = int(
+        os.getenv("REGEXP_SANDBOX_MAX_IN_FLIGHT", 64)
+    )
+    # Срок одного сопоставления в секундах; по истечении воркер перезапускается
+    REGEXP_TIMEOUT: float = float(os.getenv("REGEXP_TIMEOUT", 1.0))
+    REGEXP_PATTERN_CACHE_SIZE: int = int(os.getenv("REGEXP_PATTERN_CACHE_SIZE", 256))
+    # linear — автомат линейного времени (только поддерживаемое подмножество),
+    # re — стандартный re в песочнице
+    REGEXP_ENGINE: str = os.getenv("REGEXP_ENGINE", "linear")
+    REGEXP_LINEAR_MAX_STATES: int = int(os.getenv("REGEXP_LINEAR_MAX_STATES", 10000))
+    REGEXP_BATCH_MAX_TEXTS: int = int(os.getenv("REGEXP_BATCH_MAX_TEXTS", 10000))
+    REGEXP_BATCH_MAX_PATTERNS: int = int(os.getenv("REGEXP_BATCH_MAX_PATTERNS", 100))
+    REGEXP_BATCH_CHUNK_SIZE: int = int(os.getenv("REGEXP_BATCH_CHUNK_SIZE", 100))
+    BREACHED_PASSWORDS_INDEX: str = os.getenv("BREACHED_PASSWORDS_INDEX", "")
+    SCRIPT_IMPORT_BATCH_SIZE: int = int(os.getenv("SCRIPT_IMPORT_BATCH_SIZE", 1000))
+    SCRIPT_IMPORT_MAX_ERRORS: int = int(os.getenv("SCRIPT_IMPORT_MAX_ERRORS", 1000))
+    SCRIPT_IMPORT_MAX_LINE_LENGTH: int = int(
+        os.getenv("SCRIPT_IMPORT_MAX_LINE_LENGTH", 10 * 1024 * 1024)
+    )
+    SCRIPT_EXPORT_BATCH_SIZE: int = int(os.getenv("SCRIPT_EXPORT_BATCH_SIZE", 1000))
+    SCRIPT_BATCH_MAX_IDS: int = int(os.getenv("SCRIPT_BATCH_MAX_IDS", 500))
+    SCRIPT_VERSION_SNAPSHOT_INTERVAL: int = int(
+        os.getenv("SCRIPT_VERSION_SNAPSHOT_INTERVAL", 20)
+    )
+    SCRIPT_DEDUP_ENABLED: bool = (
+        os.getenv("SCRIPT_DEDUP_ENABLED", "false").lower() == "true"
+    )
+    SCRIPT_DEDUP_MIN_SIZE: int = int(os.getenv("SCRIPT_DEDUP_MIN_SIZE", 1024))
+    # Класс JSON-ответов по умолчанию: orjson или json (stdlib)
+    JSON_RESPONSE_CLASS: str = os.getenv("JSON_RESPONSE_CLASS", "orjson")
+    # memory (в процессе), redis или none
+    SCRIPT_CACHE_BACKEND: str = os.getenv("SCRIPT_CACHE_BACKEND", "memory")
+    SCRIPT_CACHE_TTL: float = float(os.getenv("SCRIPT_CACHE_TTL", 300))
+    SCRIPT_CACHE_MAXSIZE: int = int(os.getenv("SCRIPT_CACHE_MAXSIZE", 10000))
+    SCRIPT_CACHE_REDIS_URL: str = os.getenv(
+        "SCRIPT_CACHE_REDIS_URL", "redis://localhost:6379/0"
+    )
+    COMPRESSION_ENABLED: bool = (
+        os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    )
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    # В порядке приоритета; br и zstd требуют пакетов brotli и zstandard
+    COMPRESSION_ENCODINGS: list[str] = [
+        name.strip()
+        for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+        if name.strip()
+    ]
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "")
 
@@ -1,35 +1,361 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, AsyncGenerator
 
+from fastapi import Depends
+from sqlalchemy import exc, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (  # noqa: F501
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.app.core.config import settings
 
-DATABASE_URL = settings.DATABASE_URL
+Base = declarative_base()
 
+logger = logging.getLogger(__name__)
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL is not set in environment variables.")
+# Отставание реплики Postgres в секундах. Полностью догнавшая реплика
+# считается неотстающей, даже если на primary давно не было записей, —
+# но только пока работает WAL receiver: у реплики с остановленным
+# приёмом WAL receive и replay LSN тоже совпадают. Без receiver'а
+# отставание считается по времени последней применённой транзакции,
+# а если её не было — бесконечным.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE pid IS NOT NULL)
+            THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8,
+            'Infinity'::float8
+        )
+    END
+    """
+)
 
-if DATABASE_URL.startswith("postgresql+psycopg2://"):
-    ASYNC_DATABASE_URL = DATABASE_URL.replace(
-        "postgresql+psycopg2://", "postgresql+asyncpg://"
-    )
-else:
-    ASYNC_DATABASE_URL = DATABASE_URL
 
-engine = create_async_engine(ASYNC_DATABASE_URL, echo=True, future=True)
+def to_async_url(url: str) -> str:
+    """
+    Привести URL БД к асинхронному драйверу.
 
-AsyncSessionLocal = async_sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
-)
+    Args:
+        url (str): URL из настроек (допускается psycopg2).
+
+    Returns:
+        str: URL для create_async_engine.
+    """
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://")
+    return url
+
+
+class PoolMetrics:
+    """
+    Метрики пула соединений: ожидание checkout и насыщение.
+
+    Атрибуты:
+        checkouts (int): Количество выданных соединений.
+        wait_total (float): Суммарное время ожидания checkout, сек.
+        wait_max (float): Максимальное время ожидания checkout, сек.
+        timeouts (int): Количество таймаутов ожидания соединения.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def stats(self, pool: Any) -> dict[str, Any]:
+        """
+        Получить снимок метрик вместе с текущим состоянием пула.
+
+        Args:
+            pool (Pool): Пул соединений движка.
+
+        Returns:
+            dict[str, Any]: Размер пула, занятые соединения, насыщение
+                и статистика ожидания checkout.
+        """
+        result: dict[str, Any] = {
+            "checkouts": self.checkouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+            "timeouts": self.timeouts,
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            result.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                saturation=pool.checkedout() / capacity if capacity else 0.0,
+            )
+        return result
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время ожидания checkout.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.observe(time.perf_counter() - start)
+
+
+def create_engine_from_settings(url: str | None = None) -> AsyncEngine:
+    """
+    Создать асинхронный движок с параметрами пула из настроек.
+
+    Args:
+        url (str | None): URL БД (по умолчанию DATABASE_URL).
+
+    Returns:
+        AsyncEngine: Движок с инструментированным пулом соединений.
+
+    Raises:
+        ValueError: Если URL БД не задан.
+    """
+    url = url or settings.DATABASE_URL
+    if not url:
+        raise ValueError("DATABASE_URL is not set in environment variables.")
+    async_url = make_url(to_async_url(url))
+
+    kwargs: dict[str, Any] = {"echo": settings.DB_ECHO}
+    if async_url.database not in (None, "", ":memory:"):
+        # Отдельный подкласс на движок: метрики переживают pool.recreate().
+        poolclass = type(
+            "InstrumentedQueuePool",
+            (InstrumentedQueuePool,),
+            {"metrics": PoolMetrics()},
+        )
+        kwargs.update(
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    if async_url.drivername == "postgresql+asyncpg":
+        kwargs["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    return create_async_engine(async_url, **kwargs)
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Получить метрики пула соединений движка.
+
+    Args:
+        engine (AsyncEngine): Движок БД.
+
+    Returns:
+        dict[str, Any]: Метрики пула (пустой словарь, если пул
+            не инструментирован).
+    """
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.metrics.stats(pool)
+    return {}
 
-Base = declarative_base()
+
+class ReadReplica:
+    """
+    Реплика для чтения со своим движком и состоянием здоровья.
+
+    Атрибуты:
+        url (str): URL реплики.
+        healthy (bool): Доступна ли реплика для чтения.
+        lag (float | None): Последнее измеренное отставание, сек.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.engine = create_engine_from_settings(url)
+        self.sessionmaker = async_sessionmaker(
+            self.engine, expire_on_commit=False, class_=AsyncSession
+        )
+        self.healthy = True
+        self.lag: float | None = None
+
+    async def check(self, max_lag: float) -> bool:
+        """
+        Проверить доступность и отставание реплики.
+
+        Args:
+            max_lag (float): Допустимое отставание, сек.
+
+        Returns:
+            bool: True, если реплика пригодна для чтения.
+        """
+        try:
+            async with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    self.lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar())
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    self.lag = 0.0
+            self.healthy = self.lag <= max_lag
+        except Exception:
+            logger.warning("Реплика %s недоступна", self.engine.url, exc_info=True)
+            self.lag = None
+            self.healthy = False
+        return self.healthy
+
+
+class ReplicaRouter:
+    """
+    Балансировка чтения по репликам (round-robin) с проверкой здоровья.
+
+    Атрибуты:
+        replicas (list[ReadReplica]): Реплики для чтения.
+        max_lag (float): Допустимое отставание реплики, сек.
+    """
+
+    def __init__(self, urls: list[str], max_lag: float) -> None:
+        self.replicas = [ReadReplica(url) for url in urls]
+        self.max_lag = max_lag
+        self._counter = itertools.count()
+
+    def pick(self) -> ReadReplica | None:
+        """
+        Выбрать следующую здоровую реплику.
+
+        Returns:
+            ReadReplica | None: Реплика или None, если здоровых нет
+                (тогда чтение идёт в primary).
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self) -> None:
+        """
+        Проверить все реплики.
+        """
+        await asyncio.gather(
+            *(replica.check(self.max_lag) for replica in self.replicas)
+        )
+
+    async def run_health_checks(self, interval: float) -> None:
+        """
+        Периодически проверять реплики (фоновая задача lifespan).
+
+        Args:
+            interval (float): Интервал между проверками, сек.
+        """
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "pool": get_pool_stats(replica.engine),
+            }
+            for replica in self.replicas
+        ]
+
+
+engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+replica_router: ReplicaRouter | None = None
+
+
+def init_db() -> async_sessionmaker[AsyncSession]:
+    """
+    Создать движок и фабрику сессий (вызывается из lifespan приложения).
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика сессий основной БД.
+    """
+    global engine, AsyncSessionLocal, replica_router
+    if AsyncSessionLocal is None:
+        engine = create_engine_from_settings()
+        AsyncSessionLocal = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        if settings.DB_READ_REPLICA_URLS:
+            replica_router = ReplicaRouter(
+                settings.DB_READ_REPLICA_URLS, settings.DB_REPLICA_MAX_LAG_SECONDS
+            )
+    return AsyncSessionLocal
+
+
+async def dispose_db() -> None:
+    """
+    Закрыть соединения пула и сбросить движок.
+    """
+    global engine, AsyncSessionLocal, replica_router
+    if engine is not None:
+        await engine.dispose()
+    if replica_router is not None:
+        await replica_router.dispose()
+    engine = None
+    AsyncSessionLocal = None
+    replica_router = None
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+    async with init_db()() as session:
         yield session
+
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для read-only запросов: реплика, если есть здоровая,
+    иначе primary. Сессия primary не открывает соединение,
+    пока ей не воспользовались.
+
+    В session.info["primary"] сессии реплики лежит движок primary —
+    для чтений, которым отставание недопустимо (заполнение кэша).
+    """
+    replica = replica_router.pick() if replica_router else None
+    if replica is None:
+        yield db
+        return
+    async with replica.sessionmaker() as session:
+        session.info["primary"] = db.bind
+        try:
+            yield session
+        except (exc.OperationalError, exc.InterfaceError):
+            replica.healthy = False
+            raise
@@ -1,13 +1,22 @@
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from jose import JWTError, jwt
+from src.app.core.cache import LRUCache
 from src.app.core.config import settings
 
 ALGORITHM = settings.JWT_ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+# Кэш уже проверенных access-токенов: sha256(токен) -> payload.
+# Запись живёт до exp самого токена, поэтому повторная проверка подписи
+# для "горячих" клиентов не выполняется.
+access_token_cache: LRUCache[bytes, dict[str, Any]] = LRUCache(
+    settings.ACCESS_TOKEN_CACHE_SIZE
+)
+
 
 def create_access_token(
     data: dict[str, Any],
@@ -36,17 +45,24 @@ def create_access_token(
 def decode_access_token(token: str) -> dict[str, Any]:
     """
     Декодировать access JWT-токен.
+
+    Проверенные payload кэшируются по sha256 токена до момента его exp.
     Args:
         token (str): JWT access-токен.
     Returns:
         dict[str, Any]:
         Payload токена, если токен валиден, иначе пустой словарь.
     """
+    key = hashlib.sha256(token.encode()).digest()
+    if (cached := access_token_cache.get(key)) is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except Exception:
         return {}
+    if isinstance(exp := payload.get("exp"), (int, float)):
+        access_token_cache.set(key, dict(payload), expires_at=float(exp))
+    return payload
 
 
 def create_refresh_token(data: dict[str, Any], expires_delta: int | None = None) -> str:
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SandboxTimeout(Exception):
+    """
+    Вызов не уложился в отведённое время; воркер убит и заменён.
+    """
+
+
+class SandboxBusy(HTTPException):
+    """
+    Пул песочницы переполнен — клиенту отдаётся 503.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите попытку позже.",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _worker_main(conn: Connection) -> None:
+    while True:
+        try:
+            func, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, e)
+        conn.send(reply)
+
+
+class _Worker:
+    """Процесс-воркер и его конец канала."""
+
+    def __init__(self, context: multiprocessing.context.BaseContext) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessSandbox:
+    """
+    Пул процессов для недоверенных вычислений с жёстким сроком на вызов.
+
+    В отличие от ProcessPoolExecutor, воркер, не уложившийся в срок
+    (или чей вызов отменён), убивается и заменяется новым: зависшее
+    вычисление не занимает пул и не блокирует event loop.
+
+    Атрибуты:
+        workers (int): Количество процессов.
+        timeout (float): Срок одного вызова в секундах.
+        max_in_flight (int): Максимум одновременных вызовов
+            (выполняемые + ожидающие свободный воркер).
+        calls (int): Выполненных вызовов.
+        timeouts (int): Вызовов, прерванных по сроку.
+        restarts (int): Перезапущенных воркеров.
+        rejected (int): Вызовов, отклонённых из-за перегрузки.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        max_in_flight: int,
+        start_method: str = "forkserver",
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self.max_in_flight = max(max_in_flight, workers)
+        self.calls = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.rejected = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._in_flight = 0
+        self._idle: asyncio.Queue[_Worker] | None = None
+        self._all: set[_Worker] = set()
+        self._starting: set[asyncio.Task] = set()
+
+    def _ensure_started(self) -> asyncio.Queue[_Worker]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.workers):
+                self._spawn()
+        return self._idle
+
+    def _spawn(self) -> None:
+        # Запуск процесса — блокирующий вызов, поэтому в потоке.
+        task = asyncio.ensure_future(asyncio.to_thread(_Worker, self._context))
+        self._starting.add(task)
+        task.add_done_callback(self._started)
+
+    def _started(self, task: asyncio.Task) -> None:
+        self._starting.discard(task)
+        if task.cancelled():
+            return
+        if (error := task.exception()) is not None:
+            logger.error("Не удалось запустить воркер песочницы: %s", error)
+            return
+        worker = task.result()
+        if self._idle is None:
+            # Пул остановлен, пока воркер запускался
+            worker.kill()
+            return
+        self._all.add(worker)
+        self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        self._all.discard(worker)
+        worker.kill()
+        self.restarts += 1
+        self._spawn()
+
+    async def _execute(self, worker: _Worker, func: Callable, args: tuple) -> Any:
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            worker.conn.send((func, args))
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Выполнить func(*args) в воркере.
+
+        Args:
+            func (Callable[..., T]): Функция уровня модуля (передаётся pickle).
+            *args (Any): Аргументы.
+
+        Returns:
+            T: Результат func.
+
+        Raises:
+            SandboxTimeout: Если вызов не уложился в timeout.
+            SandboxBusy: Если пул перегружен.
+            Exception: Исключение, выброшенное func.
+        """
+        if self._in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise SandboxBusy()
+        self._in_flight += 1
+        try:
+            idle = self._ensure_started()
+            worker = await idle.get()
+            self.calls += 1
+            try:
+                ok, value = await asyncio.wait_for(
+                    self._execute(worker, func, args), self.timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._replace(worker)
+                raise SandboxTimeout(
+                    f"Вычисление не уложилось в {self.timeout:g} с"
+                ) from None
+            except BaseException:
+                # Отмена или сбой воркера: его состояние неизвестно
+                self._replace(worker)
+                raise
+            idle.put_nowait(worker)
+        finally:
+            self._in_flight -= 1
+        if not ok:
+            raise value
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Статистика пула.
+
+        Returns:
+            dict[str, Any]: Размер, нагрузка и счётчики пула.
+        """
+        return {
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "in_flight": self._in_flight,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Остановить все воркеры.
+        """
+        for task in self._starting:
+            task.cancel()
+        for worker in self._all:
+            worker.kill()
+        self._all.clear()
+        self._idle = None
@@ -0,0 +1,223 @@
+import asyncio
+import math
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from src.app.core.config import settings
+
+T = TypeVar("T")
+
+# Базовая стоимость bcrypt, от которой экстраполируется калибровка:
+# каждый следующий раунд удваивает время хеширования.
+CALIBRATION_PROBE_ROUNDS = 8
+
+
+@lru_cache(maxsize=8)
+def _context_for(rounds: int) -> CryptContext:
+    # min_rounds == max_rounds: любой хеш с другой стоимостью
+    # считается устаревшим и перехешируется при входе.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context_for(rounds).hash(password)
+
+
+def _verify(password: str, hashed_password: str, rounds: int) -> bool:
+    return _context_for(rounds).verify(password, hashed_password)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int, max_rounds: int, samples: int = 3
+) -> int:
+    """
+    Подобрать стоимость bcrypt под целевое время хеширования
+    на текущем железе.
+
+    Args:
+        target_ms (float): Целевое время одного хеширования в мс.
+        min_rounds (int): Нижняя граница стоимости.
+        max_rounds (int): Верхняя граница стоимости.
+        samples (int): Количество замеров (берётся минимальный).
+
+    Returns:
+        int: Подобранное количество раундов (log2 стоимости).
+    """
+    context = _context_for(CALIBRATION_PROBE_ROUNDS)
+    elapsed = math.inf
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        elapsed = min(elapsed, time.perf_counter() - start)
+    elapsed_ms = max(elapsed * 1000, 1e-3)
+    rounds = CALIBRATION_PROBE_ROUNDS + round(math.log2(target_ms / elapsed_ms))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+class PasswordHasherBusy(HTTPException):
+    """
+    Пул хеширования паролей переполнен — клиенту отдаётся 503.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите попытку позже.",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordHasher:
+    """
+    Выполняет bcrypt-хеширование и проверку паролей в отдельном пуле
+    потоков или процессов, не блокируя event loop.
+
+    Атрибуты:
+        executor_type (str): Тип пула: "thread" или "process".
+        workers (int): Количество воркеров пула.
+        rounds (int): Текущая стоимость bcrypt для новых хешей.
+        max_in_flight (int): Максимум одновременных операций
+            (выполняемые + ожидающие в очереди пула).
+        rejected (int): Количество операций, отклонённых из-за перегрузки.
+    """
+
+    def __init__(
+        self, executor_type: str, workers: int, max_in_flight: int, rounds: int = 12
+    ) -> None:
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Неизвестный тип пула: {executor_type}")
+        self.executor_type = executor_type
+        self.workers = workers
+        self.rounds = rounds
+        self.max_in_flight = max(max_in_flight, workers)
+        self.rejected = 0
+        self._in_flight = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Захешировать пароль.
+
+        Args:
+            password (str): Пароль в открытом виде.
+
+        Returns:
+            str: bcrypt-хеш пароля.
+
+        Raises:
+            PasswordHasherBusy: Если пул перегружен.
+        """
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Проверить пароль по хешу.
+
+        Args:
+            password (str): Пароль в открытом виде.
+            hashed_password (str): bcrypt-хеш из БД.
+
+        Returns:
+            bool: True, если пароль совпадает.
+
+        Raises:
+            PasswordHasherBusy: Если пул перегружен.
+        """
+        return await self._run(_verify, password, hashed_password, self.rounds)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Проверить, отличается ли стоимость хеша от текущей.
+
+        Проверка разбирает только заголовок хеша и не запускает bcrypt.
+
+        Args:
+            hashed_password (str): bcrypt-хеш из БД.
+
+        Returns:
+            bool: True, если хеш нужно пересчитать с текущей стоимостью.
+        """
+        return _context_for(self.rounds).needs_update(hashed_password)
+
+    async def calibrate(
+        self, target_ms: float, min_rounds: int, max_rounds: int
+    ) -> int:
+        """
+        Откалибровать стоимость bcrypt на воркерах пула
+        и использовать её для новых хешей.
+
+        Args:
+            target_ms (float): Целевое время одного хеширования в мс.
+            min_rounds (int): Нижняя граница стоимости.
+            max_rounds (int): Верхняя граница стоимости.
+
+        Returns:
+            int: Подобранное количество раундов.
+        """
+        self.rounds = await self._run(
+            calibrate_bcrypt_rounds, target_ms, min_rounds, max_rounds
+        )
+        return self.rounds
+
+    def shutdown(self) -> None:
+        """
+        Остановить пул воркеров.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Получить статистику пула хеширования.
+
+        Returns:
+            dict[str, Any]: Тип пула, воркеры, лимит, текущая нагрузка и отказы.
+        """
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_in_flight=settings.PASSWORD_HASH_MAX_IN_FLIGHT,
+    rounds=settings.PASSWORD_HASH_ROUNDS or 12,
+)
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Flight:
+    """Выполняющаяся загрузка и число ожидающих её вызовов."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Объединение одинаковых одновременных загрузок (singleflight).
+
+    Пока загрузка по ключу выполняется, остальные вызовы с тем же ключом
+    не запускают свою, а ждут её результат (или исключение).
+
+    Загрузка идёт отдельной задачей: отмена одного из ожидающих (например,
+    клиент закрыл соединение) её не прерывает. Задача отменяется, только
+    когда не осталось ни одного ожидающего. Поэтому загрузка не должна
+    зависеть от ресурсов вызвавшего её запроса: ей нужна своя сессия БД.
+
+    Атрибуты:
+        calls (int): Всего вызовов do.
+        coalesced (int): Вызовов, присоединившихся к чужой загрузке.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+        self._flights: dict[K, _Flight] = {}
+
+    async def do(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        """
+        Загрузить значение по ключу или дождаться уже идущей загрузки.
+
+        Args:
+            key (K): Ключ загрузки (например, id сущности).
+            load (Callable[[], Awaitable[V]]): Загрузка; вызывается, только
+                если по ключу сейчас ничего не загружается.
+
+        Returns:
+            V: Результат загрузки.
+        """
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(load()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Все ожидающие отменены — результат больше никому не нужен
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def forget(self, key: K) -> None:
+        """
+        Не присоединять новые вызовы к идущей загрузке по ключу.
+
+        Вызывается после commit записи: загрузка, начатая раньше, могла
+        прочитать старые данные. Уже ожидающие получат её результат,
+        а следующий вызов do запустит новую загрузку.
+
+        Args:
+            key (K): Ключ загрузки.
+        """
+        self._flights.pop(key, None)
+
+    def _forget(self, key: K, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Статистика объединения загрузок.
+
+        Returns:
+            dict[str, Any]: Вызовы, объединённые вызовы, выполненные
+                загрузки и загрузки в процессе.
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "loads": self.calls - self.coalesced,
+            "in_flight": len(self._flights),
+        }
@@ -1,10 +1,17 @@
+import hmac
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBearer,
+    OAuth2PasswordBearer,
+)
+from src.app.core.config import settings
 from src.app.core.jwt import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login", auto_error=True)
+metrics_scheme = HTTPBearer(auto_error=False)
 
 
 def get_current_user_id(token: str = Depends(oauth2_scheme)) -> UUID:
@@ -20,3 +27,22 @@ def get_current_user_id(token: str = Depends(oauth2_scheme)) -> UUID:
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось получить user_id из токена",
     )
+
+
+def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(metrics_scheme),
+) -> None:
+    """
+    Пропустить запрос к /metrics только с токеном METRICS_TOKEN.
+
+    Токены пользователей не подходят: регистрация открыта, а метрики
+    раскрывают внутреннее устройство сервиса (адреса реплик, пулы).
+    """
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неверный токен метрик",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,30 @@
+from typing import Callable
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from src.app.utils.fields import InvalidFieldsError, parse_fields
+
+
+def sparse_fields(schema: type[BaseModel]) -> Callable[..., list[str] | None]:
+    """
+    Зависимость для параметра fields: список полей ответа через запятую.
+
+    Args:
+        schema (type[BaseModel]): Схема ответа с допустимыми полями.
+
+    Returns:
+        Callable: Зависимость, возвращающая список полей или None.
+    """
+
+    def dependency(
+        fields: str | None = Query(
+            None,
+            description=f"Поля ответа через запятую: {', '.join(schema.model_fields)}",
+        ),
+    ) -> list[str] | None:
+        try:
+            return parse_fields(fields, schema)
+        except InvalidFieldsError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return dependency
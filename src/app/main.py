@@ -1,12 +1,55 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from src.app.api.integration import router as integration_router
 from src.app.api.regexp import router as regexp_router
 from src.app.api.script import router as script_router
 from src.app.api.user import router as user_router
+from src.app.core import database
+from src.app.core.compression import CompressionMiddleware
+from src.app.core.config import settings
+from src.app.core.jwt import access_token_cache
+from src.app.core.security import password_hasher
+from src.app.depends.auth import require_metrics_token
+from src.app.service.regexp import regexp_sandbox
+from src.app.service.script import script_cache, script_loads
+from src.app.service.user import user_loads
+from src.app.utils.responses import DefaultJSONResponse
 from src.app.utils.utils import custom_openapi
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.init_db()
+    health_checks = None
+    if database.replica_router is not None:
+        await database.replica_router.check()
+        health_checks = asyncio.create_task(
+            database.replica_router.run_health_checks(
+                settings.DB_REPLICA_HEALTHCHECK_INTERVAL
+            )
+        )
+    if not settings.PASSWORD_HASH_ROUNDS:
+        await password_hasher.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS,
+            settings.PASSWORD_HASH_MIN_ROUNDS,
+            settings.PASSWORD_HASH_MAX_ROUNDS,
+        )
+    yield
+    if health_checks is not None:
+        health_checks.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await health_checks
+    password_hasher.shutdown()
+    regexp_sandbox.shutdown()
+    if script_cache is not None:
+        await script_cache.close()
+    await database.dispose_db()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="FastAPI Robot Helper",
@@ -14,7 +57,20 @@ def create_app() -> FastAPI:
             "API для управления пользователями," "скриптами, интеграциями и regexp."
         ),
         version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=DefaultJSONResponse,
     )
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            encodings=settings.COMPRESSION_ENCODINGS,
+            levels={
+                "gzip": settings.COMPRESSION_GZIP_LEVEL,
+                "br": settings.COMPRESSION_BROTLI_QUALITY,
+                "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+            },
+        )
     app.include_router(user_router)
     app.include_router(script_router)
     app.include_router(integration_router)
@@ -26,6 +82,33 @@ def create_app() -> FastAPI:
     async def root():
         return {"status": "ok", "message": "FastAPI Robot Helper is running!"}
 
+    if settings.METRICS_TOKEN:
+        # Не в схеме OpenAPI и только с METRICS_TOKEN: метрики раскрывают
+        # адреса реплик и состояние пулов.
+        @app.get(
+            "/metrics",
+            tags=["health"],
+            dependencies=[Depends(require_metrics_token)],
+            include_in_schema=False,
+        )
+        async def metrics():
+            return {
+                "db_pool": (
+                    database.get_pool_stats(database.engine) if database.engine else {}
+                ),
+                "db_replicas": (
+                    database.replica_router.stats() if database.replica_router else []
+                ),
+                "access_token_cache": access_token_cache.stats(),
+                "password_hasher": password_hasher.stats(),
+                "regexp_sandbox": regexp_sandbox.stats(),
+                "script_cache": await script_cache.stats() if script_cache else {},
+                "singleflight": {
+                    "script": script_loads.stats(),
+                    "user": user_loads.stats(),
+                },
+            }
+
     return app
 
 
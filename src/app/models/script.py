@@ -1,9 +1,20 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    event,
+    select,
+)
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 from src.app.core.database import Base
+from src.app.models.script_blob import ScriptBlob
 
 
 class Script(Base):
@@ -13,22 +24,41 @@ class Script(Base):
     Атрибуты:
         id (UUID): Уникальный идентификатор скрипта.
         name (str): Название скрипта.
-        content (str): Текст/контент скрипта.
+        content (str): Текст/контент скрипта (только чтение: встроенный
+            текст или текст из script_blobs).
+        content_inline (str | None): Текст, хранящийся в самой строке.
+        content_hash (str | None): Хеш текста в script_blobs.
         user_id (UUID): Владелец скрипта (FK на пользователя).
         created_at (datetime): Дата и время создания скрипта.
         updated_at (datetime): Дата и время последнего обновления скрипта.
     """
 
     __tablename__ = "scripts"
+    __table_args__ = (
+        # Листинг скриптов пользователя с keyset-пагинацией
+        # и ON DELETE CASCADE при удалении пользователя.
+        Index("ix_scripts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         nullable=False,
     )
     name = Column(String(100), nullable=False)
-    content = Column(String, nullable=False)
+    content_inline = Column("content", String, nullable=True)
+    content_hash = Column(
+        String(64), ForeignKey("script_blobs.hash"), nullable=True, index=True
+    )
+    content = column_property(
+        func.coalesce(
+            content_inline,
+            select(ScriptBlob.content)
+            .where(ScriptBlob.hash == content_hash)
+            .correlate_except(ScriptBlob)
+            .scalar_subquery(),
+        )
+    )
     user_id = Column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
@@ -41,3 +71,67 @@ class Script(Base):
         onupdate=func.now(),
         nullable=True,
     )
+
+    def __init__(self, content: str | None = None, **kwargs):
+        # content — выражение только для чтения; текст, переданный
+        # в конструктор, хранится в строке скрипта.
+        if content is not None:
+            kwargs.setdefault("content_inline", content)
+        super().__init__(**kwargs)
+
+
+# Полнотекстовый поиск. В Postgres — колонка tsvector с GIN-индексом,
+# которую заполняет триггер (в маппинг не входит, читается только в запросах
+# поиска), в SQLite — FTS5-таблица со своей копией текста, синхронизируемая
+# триггерами. Текст берётся из строки скрипта или из script_blobs
+# (дедупликация): сгенерированная колонка и FTS5 с внешним содержимым
+# видят только саму строку. Текст блоба по хешу не меняется, поэтому
+# пересчитывать индекс нужно только при изменении строки скрипта.
+# Для существующих баз колонку, триггер и индекс создают миграции Alembic.
+SEARCH_TS_CONFIG = "simple"
+SEARCH_CONTENT_SQL = (
+    "coalesce({row}.content, "
+    "(SELECT content FROM script_blobs WHERE hash = {row}.content_hash))"
+)
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', coalesce(NEW.name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}', "
+    f"coalesce({SEARCH_CONTENT_SQL.format(row='NEW')}, '')), 'B')"
+)
+
+for statement in (
+    "ALTER TABLE scripts ADD COLUMN search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION scripts_search_vector_update() RETURNS trigger "
+    f"LANGUAGE plpgsql AS $$ BEGIN NEW.search_vector := {SEARCH_VECTOR_SQL}; "
+    "RETURN NEW; END $$",
+    "CREATE TRIGGER scripts_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF name, content, content_hash ON scripts "
+    "FOR EACH ROW EXECUTE FUNCTION scripts_search_vector_update()",
+    "CREATE INDEX ix_scripts_search_vector ON scripts USING gin (search_vector)",
+):
+    event.listen(
+        Script.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts USING fts5(name, content)",
+    "CREATE TRIGGER IF NOT EXISTS scripts_fts_ai AFTER INSERT ON scripts BEGIN "
+    "INSERT INTO scripts_fts(rowid, name, content) "
+    f"VALUES (new.rowid, new.name, {SEARCH_CONTENT_SQL.format(row='new')}); END",
+    "CREATE TRIGGER IF NOT EXISTS scripts_fts_ad AFTER DELETE ON scripts BEGIN "
+    "DELETE FROM scripts_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS scripts_fts_au AFTER UPDATE ON scripts BEGIN "
+    "DELETE FROM scripts_fts WHERE rowid = old.rowid; "
+    "INSERT INTO scripts_fts(rowid, name, content) "
+    f"VALUES (new.rowid, new.name, {SEARCH_CONTENT_SQL.format(row='new')}); END",
+):
+    event.listen(
+        Script.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Script.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS scripts_fts").execute_if(dialect="sqlite"),
+)
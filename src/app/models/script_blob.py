@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from src.app.core.database import Base
+
+
+class ScriptBlob(Base):
+    """
+    Текст скрипта в контентно-адресуемом хранилище.
+
+    Одинаковые тексты хранятся один раз, скрипты ссылаются на них
+    по хешу (Script.content_hash).
+
+    Атрибуты:
+        hash (str): SHA-256 текста (hex).
+        content (str): Текст.
+        size (int): Размер текста в байтах UTF-8.
+        ref_count (int): Число скриптов, ссылающихся на текст.
+        created_at (datetime): Дата и время первого сохранения.
+    """
+
+    __tablename__ = "script_blobs"
+    hash = Column(String(64), primary_key=True)
+    content = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from src.app.core.database import Base
+
+
+class ScriptVersion(Base):
+    """
+    Версия текста скрипта.
+
+    Хранится либо полный снимок текста (content), либо дельта
+    относительно предыдущей версии (delta). Снимок пишется каждые
+    SCRIPT_VERSION_SNAPSHOT_INTERVAL версий, поэтому для восстановления
+    любой версии достаточно применить ограниченное число дельт.
+
+    Атрибуты:
+        script_id (UUID): Скрипт (FK на scripts).
+        version (int): Номер версии, начиная с 1.
+        content (str | None): Полный текст, если версия — снимок.
+        delta (list | None): Дельта относительно предыдущей версии.
+        content_length (int): Длина текста версии.
+        created_at (datetime): Когда текст стал актуальным.
+    """
+
+    __tablename__ = "script_versions"
+    script_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("scripts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version = Column(Integer, primary_key=True)
+    content = Column(String, nullable=True)
+    delta = Column(JSON, nullable=True)
+    content_length = Column(Integer, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
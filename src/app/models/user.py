@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from src.app.core.database import Base
@@ -24,11 +24,14 @@ class User(Base):
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset-пагинация списка пользователей.
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         nullable=False,
     )
     username = Column(
@@ -45,7 +48,6 @@ class User(Base):
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
-        onupdate=func.now(),
         nullable=False,
     )
     updated_at = Column(
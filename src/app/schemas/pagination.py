@@ -0,0 +1,20 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Страница результатов с курсором на следующую страницу.
+    """
+
+    items: list[T]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы (None — конец списка)"
+    )
+    estimated_total: int | None = Field(
+        default=None,
+        description="Оценка общего числа записей по статистике Postgres",
+    )
@@ -1,3 +1,5 @@
+from typing import Annotated
+
 from pydantic import BaseModel, Field
 
 
@@ -7,4 +9,11 @@ class RegexpTextRequest(BaseModel):
 
 class RegexpPatternRequest(BaseModel):
     text: str = Field(..., description="Текст скрипта для проверки")
-    pattern: str = Field(..., description="Регулярное выражение")
+    pattern: str = Field(..., max_length=1000, description="Регулярное выражение")
+
+
+class RegexpBatchRequest(BaseModel):
+    texts: list[str] = Field(..., min_length=1, description="Тексты скриптов")
+    patterns: list[Annotated[str, Field(max_length=1000)]] = Field(
+        ..., min_length=1, description="Регулярные выражения"
+    )
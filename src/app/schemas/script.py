@@ -23,7 +23,53 @@ class ScriptRead(BaseModel):
     content: str
     user_id: UUID
     created_at: datetime
+    updated_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class ScriptBatchRequest(BaseModel):
+    """
+    Запрос пачки скриптов по id.
+    """
+
+    ids: list[UUID] = Field(min_length=1)
+
+
+class ScriptBatch(BaseModel):
+    """
+    Скрипты, запрошенные по id, в порядке запроса.
+    """
+
+    items: list[ScriptRead]
+    missing: list[UUID] = Field(
+        description="Запрошенные id, которых нет среди скриптов пользователя"
+    )
+
+
+class ScriptSummary(BaseModel):
+    """
+    Краткая схема скрипта для списков: без текста, только его длина.
+    """
+
+    id: UUID
+    name: str
     updated_at: datetime
+    content_length: int
+
+    model_config = {"from_attributes": True}
+
+
+class ScriptSearchHit(BaseModel):
+    """
+    Результат полнотекстового поиска по скриптам.
+    """
+
+    id: UUID
+    name: str
+    updated_at: datetime
+    relevance: float = Field(description="Релевантность: чем больше, тем выше")
+    snippet: str = Field(description="Фрагмент текста с совпадениями в <mark>")
 
     model_config = {"from_attributes": True}
 
@@ -35,3 +81,71 @@ class ScriptUpdate(BaseModel):
 
     name: str | None = Field(default=None, min_length=1, max_length=100)
     content: str | None = None
+
+
+class ScriptBulkError(BaseModel):
+    """
+    Ошибка в строке при массовом импорте скриптов.
+    """
+
+    line: int
+    error: str
+
+
+class ScriptBulkResult(BaseModel):
+    """
+    Результат массового импорта скриптов.
+    """
+
+    inserted: int = Field(description="Сколько скриптов добавлено")
+    failed: int = Field(description="Сколько строк отклонено")
+    errors: list[ScriptBulkError] = Field(
+        description=(
+            "Ошибки по строкам (не больше SCRIPT_IMPORT_MAX_ERRORS)"
+            " и ошибка, прервавшая импорт"
+        )
+    )
+
+
+class ScriptVersionRead(BaseModel):
+    """
+    Версия скрипта в списке версий.
+    """
+
+    version: int
+    is_snapshot: bool = Field(description="Хранится полным снимком, а не дельтой")
+    content_length: int
+    created_at: datetime
+
+
+class ScriptVersionContent(BaseModel):
+    """
+    Восстановленный текст версии скрипта.
+    """
+
+    version: int
+    content: str
+    created_at: datetime
+
+
+class ScriptVersionDiff(BaseModel):
+    """
+    Разница между двумя версиями скрипта (unified diff).
+    """
+
+    from_version: int
+    to_version: int
+    diff: str
+
+
+class ScriptDedupStats(BaseModel):
+    """
+    Статистика дедупликации текстов скриптов.
+    """
+
+    blobs: int = Field(description="Уникальных текстов в script_blobs")
+    references: int = Field(description="Скриптов, ссылающихся на них")
+    stored_bytes: int = Field(description="Сколько байт хранится")
+    logical_bytes: int = Field(description="Сколько байт заняли бы копии")
+    saved_bytes: int
+    dedup_ratio: float = Field(description="logical_bytes / stored_bytes")
@@ -3,6 +3,55 @@ from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
+from src.app.utils.breached_passwords import get_breached_index
+
+# Один проход по паролю вместо трёх отдельных поисков:
+# имя сработавшей группы показывает найденный класс символов.
+PASSWORD_CHAR_CLASSES = re.compile(
+    r"(?P<digit>\d)|(?P<letter>[A-Za-z])|(?P<special>[!@#$%^&*(),.?\\/:;{}|><\[\]])"
+)
+EASY_PASSWORDS = [
+    "password",
+    "123456",
+    "qwerty",
+    "admin",
+    "abc123",
+    "111111",
+    "123123",
+    "321321",
+]
+EASY_PASSWORDS_RE = re.compile("|".join(map(re.escape, EASY_PASSWORDS)))
+
+
+def validate_password_strength(v: str) -> str:
+    """
+    Проверить сложность пароля и его наличие в утечках.
+
+    Args:
+        v (str): Пароль.
+
+    Returns:
+        str: Пароль без изменений, если проверка пройдена.
+
+    Raises:
+        ValueError: Если пароль слишком простой или найден в утечках.
+    """
+    found: set[str | None] = set()
+    for match in PASSWORD_CHAR_CLASSES.finditer(v):
+        found.add(match.lastgroup)
+        if len(found) == 3:
+            break
+    if "digit" not in found:
+        raise ValueError("Пароль должен содержать одну цифру.")
+    if "letter" not in found:
+        raise ValueError("Пароль должен содержать одну букву.")
+    if "special" not in found:
+        raise ValueError("Пароль должен содержать один спецсимвол.")
+    if EASY_PASSWORDS_RE.search(v.lower()):
+        raise ValueError("Пароль слишком простой!")
+    if (index := get_breached_index()) is not None and v in index:
+        raise ValueError("Пароль найден в утечках, выберите другой.")
+    return v
 
 
 class UserCreate(BaseModel):
@@ -25,26 +74,7 @@ class UserCreate(BaseModel):
     @field_validator("password")
     @classmethod
     def validate_password(cls, v):
-        if not re.search(r"\d", v):
-            raise ValueError("Пароль должен содержать одну цифру.")
-        if not re.search(r"[A-Za-z]", v):
-            raise ValueError("Пароль должен содержать одну букву.")
-        if not re.search(r"[!@#$%^&*(),.?\\/:;{}|><\[\]]", v):
-            raise ValueError("Пароль должен содержать один спецсимвол.")
-        easy_password = [
-            "password",
-            "123456",
-            "qwerty",
-            "admin",
-            "abc123",
-            "111111",
-            "123123",
-            "321321",
-        ]
-        for easy in easy_password:
-            if easy in v.lower():
-                raise ValueError("Пароль слишком простой!")
-        return v
+        return validate_password_strength(v)
 
 
 class UserRead(BaseModel):
@@ -55,7 +85,9 @@ class UserRead(BaseModel):
     id: UUID
     username: str
     full_name: str
-    email: EmailStr
+    # Email проверен при регистрации; повторная проверка EmailStr на каждом
+    # чтении стоила бо́льшую часть времени сериализации списка пользователей.
+    email: str = Field(json_schema_extra={"format": "email"})
     is_active: bool
     is_superuser: bool
     created_at: datetime
@@ -79,23 +111,4 @@ class UserUpdate(BaseModel):
     def validate_password(cls, v):
         if v is None:
             return v
-        if not re.search(r"\d", v):
-            raise ValueError("Пароль должен содержать одну цифру.")
-        if not re.search(r"[A-Za-z]", v):
-            raise ValueError("Пароль должен содержать одну букву.")
-        if not re.search(r"[!@#$%^&*(),.?\\/:;{}|><\[\]]", v):
-            raise ValueError("Пароль должен содержать один спецсимвол.")
-        easy_password = [
-            "password",
-            "123456",
-            "qwerty",
-            "admin",
-            "abc123",
-            "111111",
-            "123123",
-            "321321",
-        ]
-        for easy in easy_password:
-            if easy in v.lower():
-                raise ValueError("Пароль слишком простой!")
-        return v
+        return validate_password_strength(v)
@@ -1,4 +1,102 @@
+import asyncio
 import re
+from collections import deque
+from functools import lru_cache
+from typing import AsyncIterator, Literal
+
+from src.app.core.config import settings
+from src.app.core.sandbox import ProcessSandbox, SandboxBusy, SandboxTimeout
+from src.app.utils.linear_regexp import LinearPattern, LinearPatternSet
+
+RegexpEngine = Literal["linear", "re"]
+REGEXP_ENGINES: tuple[RegexpEngine, ...] = ("linear", "re")
+
+# (индекс текста, совпадения по выражениям, ошибка)
+BatchRow = tuple[int, list[bool] | None, str | None]
+
+
+@lru_cache(maxsize=settings.REGEXP_PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Скомпилировать регулярное выражение с кэшированием (LRU).
+
+    Кэш свой в каждом процессе: в основном — для проверки синтаксиса,
+    в воркерах песочницы — для сопоставления.
+
+    Args:
+        pattern (str): Регулярное выражение.
+
+    Returns:
+        re.Pattern: Скомпилированное выражение.
+
+    Raises:
+        re.error: Если выражение некорректно.
+    """
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=settings.REGEXP_PATTERN_CACHE_SIZE)
+def compile_linear_pattern(pattern: str) -> LinearPattern:
+    """
+    Построить автомат линейного времени для выражения (с кэшированием).
+
+    Вместе с выражением кэшируется и его ленивый ДКА, так что повторные
+    проверки тем же выражением идут по уже построенным переходам.
+
+    Args:
+        pattern (str): Регулярное выражение (синтаксически корректное).
+
+    Returns:
+        LinearPattern: Автомат.
+
+    Raises:
+        UnsupportedPattern: Если выражение вне поддерживаемого подмножества.
+    """
+    return LinearPattern(pattern, settings.REGEXP_LINEAR_MAX_STATES)
+
+
+@lru_cache(maxsize=32)
+def compile_linear_set(patterns: tuple[str, ...]) -> LinearPatternSet:
+    """
+    Построить общий автомат для набора выражений (с кэшированием).
+
+    Args:
+        patterns (tuple[str, ...]): Выражения (уже проверенные).
+
+    Returns:
+        LinearPatternSet: Автомат.
+    """
+    return LinearPatternSet(patterns, settings.REGEXP_LINEAR_MAX_STATES * len(patterns))
+
+
+def _fullmatch(pattern: str, text: str) -> bool:
+    return compile_pattern(pattern).fullmatch(text) is not None
+
+
+def _match_chunk(
+    engine: RegexpEngine, patterns: tuple[str, ...], texts: list[str]
+) -> list[list[bool]]:
+    # Выполняется в воркере песочницы; автоматы кэшируются в процессе
+    if engine == "linear":
+        automaton = compile_linear_set(patterns)
+        indexes = range(len(patterns))
+        return [[i in hits for i in indexes] for hits in map(automaton.matches, texts)]
+    compiled = [compile_pattern(pattern) for pattern in patterns]
+    return [[c.fullmatch(text) is not None for c in compiled] for text in texts]
+
+
+def _resolve_engine(engine: RegexpEngine | None) -> RegexpEngine:
+    engine = engine or settings.REGEXP_ENGINE
+    if engine not in REGEXP_ENGINES:
+        raise ValueError(f"Неизвестный движок регулярных выражений: {engine}")
+    return engine
+
+
+regexp_sandbox = ProcessSandbox(
+    settings.REGEXP_SANDBOX_WORKERS,
+    settings.REGEXP_TIMEOUT,
+    settings.REGEXP_SANDBOX_MAX_IN_FLIGHT,
+)
 
 
 class ScriptTextAnalyzer:
@@ -24,19 +122,116 @@ class ScriptTextAnalyzer:
         )
 
     @staticmethod
-    def validate_script_pattern(text: str, pattern: str) -> bool:
+    def check_pattern(pattern: str, engine: RegexpEngine | None = None) -> None:
+        """
+        Проверить выражение, не выполняя его.
+
+        Args:
+            pattern (str): Регулярное выражение.
+            engine (RegexpEngine | None): Движок; по умолчанию REGEXP_ENGINE.
+
+        Raises:
+            re.error: Если выражение некорректно.
+            UnsupportedPattern: Если выражение не поддерживается движком linear.
+            ValueError: Если движок неизвестен.
+        """
+        compile_pattern(pattern)
+        if _resolve_engine(engine) == "linear":
+            compile_linear_pattern(pattern)
+
+    @staticmethod
+    async def validate_script_pattern(
+        text: str, pattern: str, engine: RegexpEngine | None = None
+    ) -> bool:
         """
         Проверить, соответствует ли текст
         скрипта заданному регулярному выражению.
 
+        Движок linear сопоставляет за линейное время и неуязвим к
+        катастрофическому бэктрекингу, но принимает только подмножество
+        синтаксиса re. Движок re поддерживает всё, но выражение может
+        выполняться сколь угодно долго, поэтому идёт в regexp_sandbox
+        со сроком REGEXP_TIMEOUT. Явно выбирать re стоит только для
+        доверенных выражений; HTTP-запросы используют REGEXP_ENGINE.
+
         Args:
             text (str): Текст скрипта.
             pattern (str): Регулярное выражение.
+            engine (RegexpEngine | None): Движок; по умолчанию REGEXP_ENGINE.
 
         Returns:
             bool: True, если текст соответствует паттерну, иначе False.
+
+        Raises:
+            re.error: Если выражение некорректно.
+            UnsupportedPattern: Если выражение не поддерживается движком linear.
+            SandboxTimeout: Если сопоставление re не уложилось в срок.
+            SandboxBusy: Если песочница перегружена.
+            ValueError: Если движок неизвестен.
         """
-        return bool(re.fullmatch(pattern, text))
+        engine = _resolve_engine(engine)
+        ScriptTextAnalyzer.check_pattern(pattern, engine)
+        if engine == "linear":
+            return compile_linear_pattern(pattern).fullmatch(text)
+        return await regexp_sandbox.run(_fullmatch, pattern, text)
+
+    @staticmethod
+    async def match_patterns(
+        texts: list[str], patterns: list[str], engine: RegexpEngine | None = None
+    ) -> AsyncIterator[list[BatchRow]]:
+        """
+        Сопоставить каждый текст с каждым выражением (матрица совпадений).
+
+        Тексты делятся на пачки по REGEXP_BATCH_CHUNK_SIZE и сопоставляются
+        в regexp_sandbox: одновременно выполняется не больше пачек, чем
+        воркеров, а результаты отдаются в порядке текстов. Движок linear
+        проходит каждый текст один раз общим автоматом всех выражений
+        (LinearPatternSet), re — проверяет выражения по очереди; выражения
+        компилируются один раз на воркер.
+
+        Выражения нужно заранее проверить через check_pattern.
+
+        Args:
+            texts (list[str]): Тексты скриптов.
+            patterns (list[str]): Регулярные выражения.
+            engine (RegexpEngine | None): Движок; по умолчанию REGEXP_ENGINE.
+
+        Yields:
+            list[BatchRow]: Строки пачки: (индекс текста, совпадения по
+                выражениям, None) или (индекс текста, None, ошибка), если
+                пачка не уложилась в REGEXP_TIMEOUT или пул перегружен.
+        """
+        engine = _resolve_engine(engine)
+        key = tuple(patterns)
+        size = settings.REGEXP_BATCH_CHUNK_SIZE
+        pending: deque[tuple[int, int, asyncio.Future]] = deque()
+
+        async def rows(start: int, count: int, task: asyncio.Future) -> list[BatchRow]:
+            try:
+                matrix = await task
+            except SandboxTimeout as e:
+                error = str(e)
+            except SandboxBusy as e:
+                error = e.detail
+            else:
+                return [(start + i, row, None) for i, row in enumerate(matrix)]
+            return [(start + i, None, error) for i in range(count)]
+
+        try:
+            for start in range(0, len(texts), size):
+                chunk = texts[start : start + size]
+                task = asyncio.ensure_future(
+                    regexp_sandbox.run(_match_chunk, engine, key, chunk)
+                )
+                pending.append((start, len(chunk), task))
+                if len(pending) >= regexp_sandbox.workers:
+                    yield await rows(*pending.popleft())
+            while pending:
+                yield await rows(*pending.popleft())
+        finally:
+            # Клиент отключился — незавершённые пачки не нужны
+            for _, _, task in pending:
+                task.cancel()
 
     @staticmethod
     def extract_variables(text: str) -> list[str]:
@@ -1,11 +1,122 @@
 import contextlib
 import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.app.models.script import Script
-from src.app.schemas.script import ScriptCreate, ScriptUpdate
+from pydantic import ValidationError
+from sqlalchemy import (
+    ARRAY,
+    Select,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from src.app.core.cache import VersionedCache, create_cache_backend
+from src.app.core.config import settings
+from src.app.core.singleflight import SingleFlight
+from src.app.models.script import SEARCH_TS_CONFIG, Script
+from src.app.models.script_version import ScriptVersion
+from src.app.schemas.script import (
+    ScriptBulkError,
+    ScriptCreate,
+    ScriptRead,
+    ScriptUpdate,
+)
+from src.app.service.script_blob import ScriptBlobService
+from src.app.service.script_version import ScriptVersionService
+from src.app.utils.fields import columns_for
+from src.app.utils.pagination import DEFAULT_PAGE_LIMIT, estimate_count, paginate
+from src.app.utils.streaming import LineTooLongError, Record
+
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+scripts_fts = table("scripts_fts", column("rowid"), column("name"), column("content"))
+
+
+def _search_postgresql(query: str) -> Select:
+    """
+    Поиск по генерируемой колонке search_vector (GIN-индекс).
+    """
+    ts_config = literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig")
+    ts_query = func.websearch_to_tsquery(ts_config, query)
+    search_vector = literal_column("scripts.search_vector")
+    relevance = func.ts_rank_cd(search_vector, ts_query).label("relevance")
+    snippet = func.ts_headline(
+        ts_config,
+        Script.content,
+        ts_query,
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+        "MaxFragments=2, MinWords=5, MaxWords=20",
+    ).label("snippet")
+    return (
+        select(Script.id, Script.name, Script.updated_at, relevance, snippet)
+        .where(search_vector.op("@@")(ts_query))
+        .order_by(relevance.desc(), Script.id)
+    )
+
+
+def _search_sqlite(query: str) -> Select:
+    """
+    Поиск по FTS5-таблице scripts_fts (локальная разработка и тесты).
+
+    Слова запроса берутся в кавычки и объединяются через AND, чтобы
+    пользовательский ввод не разбирался как синтаксис FTS5.
+    """
+    match = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+    fts = literal_column("scripts_fts")
+    # bm25 тем меньше, чем лучше совпадение; название весомее текста.
+    relevance = (-func.bm25(fts, 10.0, 1.0)).label("relevance")
+    snippet = func.snippet(fts, -1, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 16).label(
+        "snippet"
+    )
+    return (
+        select(Script.id, Script.name, Script.updated_at, relevance, snippet)
+        .select_from(scripts_fts)
+        .join(Script, literal_column("scripts.rowid") == scripts_fts.c.rowid)
+        .where(fts.op("MATCH")(match))
+        .order_by(relevance.desc(), Script.id)
+    )
+
+
+SEARCH_BUILDERS = {"postgresql": _search_postgresql, "sqlite": _search_sqlite}
+
+
+def _id_in(db: AsyncSession, id_column: Any, ids: list[UUID]) -> Any:
+    """
+    Условие id IN ids.
+
+    В Postgres — id = ANY(:ids) с одним параметром-массивом: текст запроса
+    не зависит от числа id и переиспользует подготовленный запрос.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return id_column == any_(bindparam("ids", ids, type_=ARRAY(id_column.type)))
+    return id_column.in_(ids)
+
+
+# Read-through кэш get_script; инвалидируется в ScriptService.invalidate_script.
+_script_cache_backend = create_cache_backend(
+    settings.SCRIPT_CACHE_BACKEND,
+    settings.SCRIPT_CACHE_MAXSIZE,
+    settings.SCRIPT_CACHE_REDIS_URL,
+)
+script_cache = (
+    VersionedCache(_script_cache_backend, "script", settings.SCRIPT_CACHE_TTL)
+    if _script_cache_backend is not None
+    else None
+)
+# Ключ загрузки: id, движок и штамп поколения кэша (None — кэш выключен).
+script_loads: SingleFlight[
+    tuple[UUID, AsyncEngine, bytes | None], ScriptRead | None
+] = SingleFlight()
 
 
 class ScriptService:
@@ -27,9 +138,10 @@ class ScriptService:
         Raises:
             ValueError: Если скрипт не был создан (неожиданная ошибка).
         """
-        script = Script(
-            name=script_data.name, content=script_data.content, user_id=user_id
-        )
+        storage = ScriptBlobService.storage_values(script_data.content)
+        if storage["content_hash"]:
+            await ScriptBlobService.acquire(db, [script_data.content])
+        script = Script(name=script_data.name, user_id=user_id, **storage)
         db.add(script)
         await db.commit()
         await db.refresh(script)
@@ -38,43 +150,370 @@ class ScriptService:
         return script
 
     @staticmethod
-    async def get_script(script_id: UUID, db: AsyncSession) -> Script | None:
+    async def bulk_create_scripts(
+        records: AsyncIterator[Record],
+        user_id: UUID,
+        db: AsyncSession,
+        batch_size: int,
+        max_errors: int,
+    ) -> tuple[int, int, list[ScriptBulkError]]:
+        """
+        Массово создать скрипты из потока записей.
+
+        Записи валидируются по одной и вставляются пачками по batch_size
+        одним executemany на пачку, поэтому память не зависит от размера
+        загрузки.
+
+        Слишком длинная строка (LineTooLongError) прерывает чтение: к этому
+        моменту предыдущие пачки уже закоммичены, поэтому сохраняются и
+        записи до неё, а сама ошибка добавляется в список последней
+        (даже сверх max_errors) — клиент видит, где импорт остановился.
+
+        Args:
+            records (AsyncIterator[Record]): Поток разобранных записей.
+            user_id (UUID): Идентификатор пользователя-владельца.
+            db (AsyncSession): Асинхронная сессия БД.
+            batch_size (int): Размер пачки вставки.
+            max_errors (int): Сколько ошибок возвращать в ответе.
+
+        Returns:
+            tuple[int, int, list[ScriptBulkError]]: Количество вставленных
+                скриптов, количество отклонённых строк и ошибки по строкам.
+        """
+        inserted = failed = 0
+        errors: list[ScriptBulkError] = []
+        batch: list[dict[str, Any]] = []
+        blob_contents: list[str] = []
+
+        async def flush() -> None:
+            nonlocal inserted
+            if batch:
+                await ScriptBlobService.acquire(db, blob_contents)
+                blob_contents.clear()
+                await db.execute(insert(Script), batch)
+                await db.commit()
+                inserted += len(batch)
+                batch.clear()
+
+        try:
+            async for line, data, error in records:
+                if error is None:
+                    try:
+                        script_data = ScriptCreate.model_validate(data)
+                    except ValidationError as e:
+                        first = e.errors()[0]
+                        location = ".".join(str(part) for part in first["loc"])
+                        error = (
+                            f"{location}: {first['msg']}" if location else first["msg"]
+                        )
+                    else:
+                        storage = ScriptBlobService.storage_values(script_data.content)
+                        if storage["content_hash"]:
+                            blob_contents.append(script_data.content)
+                        batch.append(
+                            {"name": script_data.name, "user_id": user_id, **storage}
+                        )
+                        if len(batch) >= batch_size:
+                            await flush()
+                        continue
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append(ScriptBulkError(line=line, error=error))
+        except LineTooLongError as e:
+            failed += 1
+            errors.append(ScriptBulkError(line=e.line, error=str(e)))
+        await flush()
+        return inserted, failed, errors
+
+    @staticmethod
+    async def get_script(
+        script_id: UUID, db: AsyncSession, fields: list[str] | None = None
+    ) -> Any | None:
         """
         Получить скрипт по его идентификатору.
 
+        Полный скрипт читается через script_cache (если кэш включён):
+        при попадании БД не используется. Одновременные промахи по одному
+        id объединяются в один SELECT (script_loads). Промах читается
+        из primary, даже если db — сессия реплики: иначе отстающая
+        реплика положила бы в кэш версию, которую инвалидация уже
+        вытеснила, и она жила бы до истечения TTL.
+
+        Загрузки разделяются по движку и штампу поколения: вызов после
+        commit изменения не присоединится к SELECT, начатому до него
+        (см. invalidate_script).
+
         Args:
-            script_id (UUID или str): Идентификатор скрипта.
+            script_id (UUID): Идентификатор скрипта.
             db (AsyncSession): Асинхронная сессия БД.
+            fields (list[str] | None): Выбрать только эти колонки.
 
         Returns:
-            Script | None: Скрипт, если найден, иначе None.
+            ScriptRead | Row | None: Скрипт (или строка с запрошенными
+                колонками), если найден, иначе None.
         """
         if isinstance(script_id, str):
             with contextlib.suppress(Exception):
                 script_id = uuid.UUID(script_id)
 
-        result = await db.execute(select(Script).where(Script.id == script_id))
+        if fields:
+            result = await db.execute(
+                select(*columns_for(Script, fields)).where(Script.id == script_id)
+            )
+            return result.one_or_none()
+        stamp = None
+        bind = db.bind
+        if script_cache is not None:
+            cached, stamp = await script_cache.lookup(str(script_id))
+            if cached is not None:
+                return ScriptRead.model_validate_json(cached)
+            bind = db.info.get("primary", bind)
+        return await script_loads.do(
+            (script_id, bind, stamp),
+            lambda: ScriptService._load_script(script_id, bind, stamp),
+        )
+
+    @staticmethod
+    async def invalidate_script(script_id: UUID, bind: AsyncEngine) -> None:
+        """
+        Сбросить закэшированный скрипт и идущую загрузку после commit.
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            bind (AsyncEngine): Движок primary, через который шла запись.
+        """
+        script_loads.forget((script_id, bind, None))
+        if script_cache is not None:
+            await script_cache.invalidate(str(script_id))
+
+    @staticmethod
+    async def _load_script(
+        script_id: UUID, bind: AsyncEngine, stamp: bytes | None
+    ) -> ScriptRead | None:
+        """
+        Прочитать скрипт своей сессией и положить его в script_cache.
+
+        Загрузку ждут несколько запросов (см. SingleFlight), поэтому
+        сессия вызвавшего запроса не используется.
+        """
+        async with AsyncSession(bind) as session:
+            result = await session.execute(select(Script).where(Script.id == script_id))
+            script = result.scalar_one_or_none()
+            if script is None:
+                return None
+            script = ScriptRead.model_validate(script)
+        if script_cache is not None:
+            await script_cache.store(
+                str(script_id), stamp, script.model_dump_json().encode()
+            )
+        return script
+
+    @staticmethod
+    async def get_script_updated_at(
+        script_id: UUID, db: AsyncSession
+    ) -> datetime | None:
+        """
+        Получить только время последнего изменения скрипта (для ETag).
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            datetime | None: Время изменения или None, если скрипт не найден.
+        """
+        result = await db.execute(
+            select(func.coalesce(Script.updated_at, Script.created_at)).where(
+                Script.id == script_id
+            )
+        )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_scripts_by_ids(
+        ids: list[UUID],
+        user_id: UUID,
+        db: AsyncSession,
+        fields: list[str] | None = None,
+    ) -> tuple[list[Any], list[UUID]]:
+        """
+        Получить скрипты пользователя по списку id одним запросом.
+
+        Args:
+            ids (list[UUID]): Идентификаторы; повторы отбрасываются.
+            user_id (UUID): Идентификатор владельца.
+            db (AsyncSession): Асинхронная сессия БД.
+            fields (list[str] | None): Выбрать только эти колонки (плюс id).
+
+        Returns:
+            tuple[list[Any], list[UUID]]: Найденные скрипты (или строки с
+                запрошенными колонками) в порядке ids и id, которых нет
+                среди скриптов пользователя.
+        """
+        ids = list(dict.fromkeys(ids))
+        if fields:
+            stmt = select(*columns_for(Script, fields, ("id",)))
+        else:
+            stmt = select(Script)
+        result = await db.execute(
+            stmt.where(Script.user_id == user_id, _id_in(db, Script.id, ids))
+        )
+        rows = result.all() if fields else result.scalars().all()
+        by_id = {row.id: row for row in rows}
+        return (
+            [by_id[script_id] for script_id in ids if script_id in by_id],
+            [script_id for script_id in ids if script_id not in by_id],
+        )
+
     @staticmethod
     async def list_scripts(
         user_id: UUID,
         db: AsyncSession,
-    ) -> list[Script]:
+        limit: int = DEFAULT_PAGE_LIMIT,
+        cursor: str | None = None,
+        include_total: bool = False,
+        fields: list[str] | None = None,
+    ) -> tuple[list[Any], str | None, int | None]:
         """
-        Получить все скрипты пользователя.
+        Получить страницу скриптов пользователя (keyset по created_at, id).
 
         Args:
             user_id (UUID): Идентификатор пользователя.
             db (AsyncSession): Асинхронная сессия БД.
+            limit (int): Размер страницы.
+            cursor (str | None): Курсор предыдущей страницы.
+            include_total (bool): Добавить оценку общего числа скриптов.
+            fields (list[str] | None): Выбрать только эти колонки
+                (плюс created_at и id для курсора).
 
         Returns:
-            list[Script]: Список скриптов пользователя.
+            tuple[list[Any], str | None, int | None]: Скрипты (или строки
+                с запрошенными колонками) страницы, курсор следующей
+                страницы и оценка общего числа скриптов.
+
+        Raises:
+            InvalidCursorError: Если курсор некорректен.
         """
-        result = await db.execute(
-            select(Script).where(Script.user_id == user_id),
+        if fields:
+            stmt = select(*columns_for(Script, fields, ("created_at", "id")))
+        else:
+            stmt = select(Script)
+        stmt = stmt.where(Script.user_id == user_id)
+        items, next_cursor = await paginate(
+            db, stmt, Script.created_at, Script.id, limit, cursor
         )
-        return list(result.scalars().all())
+        estimated_total = None
+        if include_total:
+            estimated_total = await estimate_count(
+                db, select(Script.id).where(Script.user_id == user_id)
+            )
+        return items, next_cursor, estimated_total
+
+    @staticmethod
+    async def list_script_summaries(
+        user_id: UUID,
+        db: AsyncSession,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        cursor: str | None = None,
+    ) -> tuple[list[Any], str | None]:
+        """
+        Получить страницу кратких описаний скриптов пользователя.
+
+        Текст скрипта не читается: длина считается в SQL.
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            db (AsyncSession): Асинхронная сессия БД.
+            limit (int): Размер страницы.
+            cursor (str | None): Курсор предыдущей страницы.
+
+        Returns:
+            tuple[list[Row], str | None]: Строки (id, name, updated_at,
+                content_length, created_at) и курсор следующей страницы.
+
+        Raises:
+            InvalidCursorError: Если курсор некорректен.
+        """
+        stmt = select(
+            Script.id,
+            Script.name,
+            Script.updated_at,
+            func.length(Script.content).label("content_length"),
+            Script.created_at,
+        ).where(Script.user_id == user_id)
+        return await paginate(db, stmt, Script.created_at, Script.id, limit, cursor)
+
+    @staticmethod
+    async def search_scripts(
+        user_id: UUID,
+        query: str,
+        db: AsyncSession,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        offset: int = 0,
+    ) -> tuple[list[Any], int | None]:
+        """
+        Полнотекстовый поиск по названию и тексту скриптов пользователя.
+
+        Результаты отсортированы по релевантности и содержат фрагмент
+        текста с подсвеченными совпадениями.
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            query (str): Поисковый запрос.
+            db (AsyncSession): Асинхронная сессия БД.
+            limit (int): Размер страницы.
+            offset (int): Сколько результатов пропустить.
+
+        Returns:
+            tuple[list[Row], int | None]: Строки (id, name, updated_at,
+                relevance, snippet) и смещение следующей страницы.
+
+        Raises:
+            NotImplementedError: Если СУБД не поддерживает поиск.
+        """
+        if not query.split():
+            return [], None
+        dialect = db.get_bind().dialect.name
+        if dialect not in SEARCH_BUILDERS:
+            raise NotImplementedError(f"Поиск не поддерживается для {dialect}")
+        stmt = (
+            SEARCH_BUILDERS[dialect](query)
+            .where(Script.user_id == user_id)
+            .limit(limit + 1)
+            .offset(offset)
+        )
+        rows = list((await db.execute(stmt)).all())
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], offset + limit
+
+    @staticmethod
+    async def stream_scripts(
+        user_id: UUID, db: AsyncSession, batch_size: int
+    ) -> AsyncIterator[list[Script]]:
+        """
+        Выгрузить все скрипты пользователя пачками через серверный курсор.
+
+        Строки читаются по batch_size (yield_per). Карта идентичности
+        сессии держит объекты по слабым ссылкам, так что обработанные
+        пачки освобождаются и память не растёт с числом скриптов.
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            db (AsyncSession): Асинхронная сессия БД.
+            batch_size (int): Размер пачки.
+
+        Yields:
+            list[Script]: Очередная пачка скриптов в порядке (created_at, id).
+        """
+        result = await db.stream_scalars(
+            select(Script)
+            .where(Script.user_id == user_id)
+            .order_by(Script.created_at, Script.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for batch in result.partitions():
+            yield batch
 
     @staticmethod
     async def update_script(
@@ -83,6 +522,10 @@ class ScriptService:
         """
         Обновить скрипт по идентификатору.
 
+        При смене текста в той же транзакции пишется новая версия
+        в script_versions (см. ScriptVersionService.build_versions)
+        и обновляются ссылки на script_blobs.
+
         Args:
             script_id (UUID): Идентификатор скрипта.
             script_data (ScriptUpdate): Данные для обновления скрипта.
@@ -95,15 +538,64 @@ class ScriptService:
             with contextlib.suppress(Exception):
                 script_id = uuid.UUID(script_id)
 
-        result = await db.execute(select(Script).where(Script.id == script_id))
-        script = result.scalar_one_or_none()
-        if not script:
-            return None
         update_data = script_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(script, field, value)
+        if not update_data:
+            return await ScriptService.get_script(script_id, db)
+        versions = []
+        old_hash = None
+        if isinstance(new_content := update_data.pop("content", None), str):
+            last_version = (
+                select(func.max(ScriptVersion.version))
+                .where(ScriptVersion.script_id == Script.id)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                select(
+                    Script.content,
+                    Script.content_hash,
+                    func.coalesce(Script.updated_at, Script.created_at),
+                    last_version,
+                )
+                .where(Script.id == script_id)
+                .with_for_update(of=Script)
+            )
+            if (row := result.one_or_none()) is None:
+                return None
+            old_content, old_hash, changed_at, version = row
+            if old_content != new_content:
+                versions = ScriptVersionService.build_versions(
+                    script_id,
+                    old_content,
+                    changed_at,
+                    new_content,
+                    version,
+                    settings.SCRIPT_VERSION_SNAPSHOT_INTERVAL,
+                )
+                update_data.update(ScriptBlobService.storage_values(new_content))
+                if update_data["content_hash"]:
+                    await ScriptBlobService.acquire(db, [new_content])
+        if not update_data:
+            # Текст не изменился, менять нечего
+            await db.commit()
+            return await ScriptService.get_script(script_id, db)
+        # Выражение content в RETURNING сущности не входит, поэтому
+        # возвращается отдельной колонкой того же запроса.
+        result = await db.execute(
+            update(Script)
+            .where(Script.id == script_id)
+            .values(**update_data)
+            .returning(Script, Script.content)
+        )
+        script = None
+        if row := result.one_or_none():
+            script, content = row
+            set_committed_value(script, "content", content)
+        if script is not None and versions:
+            await db.execute(insert(ScriptVersion), versions)
+            await ScriptBlobService.release(db, [old_hash])
         await db.commit()
-        await db.refresh(script)
+        if script is not None:
+            await ScriptService.invalidate_script(script_id, db.bind)
         return script
 
     @staticmethod
@@ -122,10 +614,16 @@ class ScriptService:
             with contextlib.suppress(Exception):
                 script_id = uuid.UUID(script_id)
 
-        result = await db.execute(select(Script).where(Script.id == script_id))
-        script = result.scalar_one_or_none()
-        if not script:
-            return False
-        await db.delete(script)
+        result = await db.execute(
+            delete(Script)
+            .where(Script.id == script_id)
+            .returning(Script.id, Script.content_hash)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            await ScriptBlobService.release(db, [row.content_hash])
         await db.commit()
-        return True
+        deleted = row is not None
+        if deleted:
+            await ScriptService.invalidate_script(script_id, db.bind)
+        return deleted
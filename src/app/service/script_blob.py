@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+from collections import Counter
+from typing import Any, Iterable
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.core import database
+from src.app.core.config import settings
+from src.app.models.script import Script
+from src.app.models.script_blob import ScriptBlob
+
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def content_hash(content: str) -> str:
+    """
+    Хеш текста для контентно-адресуемого хранилища.
+
+    Args:
+        content (str): Текст скрипта.
+
+    Returns:
+        str: SHA-256 в hex.
+    """
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ScriptBlobService:
+    @staticmethod
+    def storage_values(content: str) -> dict[str, Any]:
+        """
+        Значения колонок скрипта для хранения текста.
+
+        При SCRIPT_DEDUP_ENABLED тексты от SCRIPT_DEDUP_MIN_SIZE байт
+        хранятся в script_blobs, остальные — в самой строке скрипта.
+
+        Args:
+            content (str): Текст скрипта.
+
+        Returns:
+            dict[str, Any]: content_inline и content_hash.
+        """
+        if (
+            settings.SCRIPT_DEDUP_ENABLED
+            and len(content.encode()) >= settings.SCRIPT_DEDUP_MIN_SIZE
+        ):
+            return {"content_inline": None, "content_hash": content_hash(content)}
+        return {"content_inline": content, "content_hash": None}
+
+    @staticmethod
+    async def acquire(db: AsyncSession, contents: Iterable[str]) -> None:
+        """
+        Сохранить тексты в script_blobs и увеличить счётчики ссылок.
+
+        Один upsert на все тексты; строки упорядочены по хешу, чтобы
+        параллельные транзакции блокировали их в одном порядке.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            contents (Iterable[str]): Тексты, на которые появились ссылки.
+        """
+        counts = Counter(contents)
+        if not counts:
+            return
+        rows = sorted(
+            (
+                {
+                    "hash": content_hash(content),
+                    "content": content,
+                    "size": len(content.encode()),
+                    "ref_count": count,
+                }
+                for content, count in counts.items()
+            ),
+            key=lambda row: row["hash"],
+        )
+        stmt = UPSERT_INSERTS[db.get_bind().dialect.name](ScriptBlob).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScriptBlob.hash],
+            set_={"ref_count": ScriptBlob.ref_count + stmt.excluded.ref_count},
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def release(db: AsyncSession, hashes: Iterable[str | None]) -> None:
+        """
+        Уменьшить счётчики ссылок и удалить тексты без ссылок.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            hashes (Iterable[str | None]): Хеши текстов, ссылки на которые
+                пропали (None пропускаются).
+        """
+        counts = Counter(h for h in hashes if h is not None)
+        if not counts:
+            return
+        for blob_hash, count in sorted(counts.items()):
+            await db.execute(
+                update(ScriptBlob)
+                .where(ScriptBlob.hash == blob_hash)
+                .values(ref_count=ScriptBlob.ref_count - count)
+            )
+        await db.execute(
+            delete(ScriptBlob).where(
+                ScriptBlob.hash.in_(list(counts)), ScriptBlob.ref_count <= 0
+            )
+        )
+
+    @staticmethod
+    async def collect_garbage(db: AsyncSession) -> int:
+        """
+        Пересчитать счётчики ссылок и удалить тексты без ссылок.
+
+        Нужна после удаления скриптов в обход сервисов (например,
+        каскадом вручную из БД), которое счётчики не уменьшает.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            int: Сколько текстов удалено.
+        """
+        references = (
+            select(func.count())
+            .where(Script.content_hash == ScriptBlob.hash)
+            .correlate(ScriptBlob)
+            .scalar_subquery()
+        )
+        await db.execute(update(ScriptBlob).values(ref_count=references))
+        result = await db.execute(
+            delete(ScriptBlob)
+            .where(ScriptBlob.ref_count <= 0)
+            .returning(ScriptBlob.hash)
+        )
+        deleted = len(result.all())
+        await db.commit()
+        return deleted
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> dict[str, Any]:
+        """
+        Статистика дедупликации.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            dict[str, Any]: Число текстов и ссылок, занятые и сэкономленные
+                байты и коэффициент дедупликации (логический объём
+                к физическому).
+        """
+        result = await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(ScriptBlob.ref_count), 0),
+                func.coalesce(func.sum(ScriptBlob.size), 0),
+                func.coalesce(func.sum(ScriptBlob.size * ScriptBlob.ref_count), 0),
+            )
+        )
+        blobs, references, stored, logical = result.one()
+        return {
+            "blobs": blobs,
+            "references": references,
+            "stored_bytes": stored,
+            "logical_bytes": logical,
+            "saved_bytes": logical - stored,
+            "dedup_ratio": round(logical / stored, 3) if stored else 1.0,
+        }
+
+
+async def _collect_garbage() -> int:
+    session_factory = database.init_db()
+    try:
+        async with session_factory() as db:
+            return await ScriptBlobService.collect_garbage(db)
+    finally:
+        await database.dispose_db()
+
+
+if __name__ == "__main__":
+    # Периодическая очистка: python -m src.app.service.script_blob
+    print(f"Удалено текстов без ссылок: {asyncio.run(_collect_garbage())}")
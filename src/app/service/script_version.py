@@ -0,0 +1,207 @@
+import difflib
+import json
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.models.script import Script
+from src.app.models.script_version import ScriptVersion
+from src.app.utils.delta import apply_delta, make_delta
+
+
+class ScriptVersionService:
+    @staticmethod
+    def build_versions(
+        script_id: UUID,
+        old_content: str,
+        old_changed_at: datetime,
+        new_content: str,
+        last_version: int | None,
+        snapshot_interval: int,
+    ) -> list[dict[str, Any]]:
+        """
+        Подготовить строки script_versions для смены текста скрипта.
+
+        У скрипта, который ещё не редактировался, истории нет: его текущий
+        текст считается версией 1 и сохраняется снимком при первой правке.
+        Новая версия хранится дельтой, кроме каждой snapshot_interval-й
+        и случаев, когда дельта не короче самого текста.
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            old_content (str): Текст до изменения.
+            old_changed_at (datetime): Когда old_content стал актуальным.
+            new_content (str): Новый текст.
+            last_version (int | None): Номер последней версии в истории.
+            snapshot_interval (int): Период полных снимков.
+
+        Returns:
+            list[dict[str, Any]]: Строки для вставки в script_versions.
+        """
+        rows = []
+        if last_version is None:
+            rows.append(
+                {
+                    "script_id": script_id,
+                    "version": 1,
+                    "content": old_content,
+                    "delta": None,
+                    "content_length": len(old_content),
+                    "created_at": old_changed_at,
+                }
+            )
+            last_version = 1
+        version = last_version + 1
+        delta = make_delta(old_content, new_content)
+        is_snapshot = (version - 1) % snapshot_interval == 0 or len(
+            json.dumps(delta, ensure_ascii=False)
+        ) >= len(new_content)
+        rows.append(
+            {
+                "script_id": script_id,
+                "version": version,
+                "content": new_content if is_snapshot else None,
+                "delta": None if is_snapshot else delta,
+                "content_length": len(new_content),
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        return rows
+
+    @staticmethod
+    async def list_versions(
+        script_id: UUID, db: AsyncSession
+    ) -> list[dict[str, Any]] | None:
+        """
+        Получить список версий скрипта (без текстов).
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            list[dict[str, Any]] | None: Версии по возрастанию номера
+                или None, если скрипт не найден.
+        """
+        result = await db.execute(
+            select(
+                ScriptVersion.version,
+                ScriptVersion.content.is_not(None).label("is_snapshot"),
+                ScriptVersion.content_length,
+                ScriptVersion.created_at,
+            )
+            .where(ScriptVersion.script_id == script_id)
+            .order_by(ScriptVersion.version)
+        )
+        if versions := [row._asdict() for row in result.all()]:
+            return versions
+        result = await db.execute(
+            select(
+                func.length(Script.content),
+                func.coalesce(Script.updated_at, Script.created_at),
+            ).where(Script.id == script_id)
+        )
+        if (row := result.one_or_none()) is None:
+            return None
+        return [
+            {
+                "version": 1,
+                "is_snapshot": True,
+                "content_length": row[0],
+                "created_at": row[1],
+            }
+        ]
+
+    @staticmethod
+    async def get_version(
+        script_id: UUID, version: int, db: AsyncSession
+    ) -> dict[str, Any] | None:
+        """
+        Восстановить текст версии скрипта.
+
+        Читается ближайший снимок не новее версии и дельты после него
+        (не больше SCRIPT_VERSION_SNAPSHOT_INTERVAL строк) одним запросом.
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            version (int): Номер версии.
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            dict[str, Any] | None: version, content и created_at
+                или None, если скрипт или версия не найдены.
+        """
+        snapshot_version = (
+            select(func.max(ScriptVersion.version))
+            .where(
+                ScriptVersion.script_id == script_id,
+                ScriptVersion.version <= version,
+                ScriptVersion.content.is_not(None),
+            )
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(ScriptVersion)
+            .where(
+                ScriptVersion.script_id == script_id,
+                ScriptVersion.version.between(snapshot_version, version),
+            )
+            .order_by(ScriptVersion.version)
+        )
+        chain = result.scalars().all()
+        if not chain:
+            if version != 1:
+                return None
+            has_history = exists().where(ScriptVersion.script_id == script_id)
+            result = await db.execute(
+                select(
+                    Script.content,
+                    func.coalesce(Script.updated_at, Script.created_at),
+                    has_history,
+                ).where(Script.id == script_id)
+            )
+            row = result.one_or_none()
+            if row is None or row[2]:
+                return None
+            return {"version": 1, "content": row[0], "created_at": row[1]}
+        if chain[-1].version != version:
+            return None
+        content = chain[0].content
+        for step in chain[1:]:
+            content = apply_delta(content, step.delta)
+        return {
+            "version": version,
+            "content": content,
+            "created_at": chain[-1].created_at,
+        }
+
+    @staticmethod
+    async def diff_versions(
+        script_id: UUID, from_version: int, to_version: int, db: AsyncSession
+    ) -> str | None:
+        """
+        Построить unified diff между двумя версиями скрипта.
+
+        Args:
+            script_id (UUID): Идентификатор скрипта.
+            from_version (int): Исходная версия.
+            to_version (int): Целевая версия.
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            str | None: Текст diff или None, если версия не найдена.
+        """
+        old = await ScriptVersionService.get_version(script_id, from_version, db)
+        new = await ScriptVersionService.get_version(script_id, to_version, db)
+        if old is None or new is None:
+            return None
+        return "".join(
+            difflib.unified_diff(
+                old["content"].splitlines(keepends=True),
+                new["content"].splitlines(keepends=True),
+                fromfile=f"v{from_version}",
+                tofile=f"v{to_version}",
+            )
+        )
@@ -1,10 +1,45 @@
-from passlib.context import CryptContext
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from src.app.core.security import PasswordHasherBusy, password_hasher
+from src.app.core.singleflight import SingleFlight
+from src.app.models.script import Script
 from src.app.models.user import User
-from src.app.schemas.user import UserCreate, UserLogin
+from src.app.schemas.user import UserCreate, UserLogin, UserRead
+from src.app.service import script as script_service
+from src.app.service.script_blob import ScriptBlobService
+from src.app.utils.fields import columns_for
+from src.app.utils.pagination import DEFAULT_PAGE_LIMIT, estimate_count, paginate
+
+logger = logging.getLogger(__name__)
+
+# Ссылки на фоновые задачи, чтобы их не собрал GC до завершения.
+_background_tasks: set[asyncio.Task] = set()
+
+# Ключ загрузки: id и движок, из которого читается пользователь.
+user_loads: SingleFlight[tuple[UUID, AsyncEngine], UserRead | None] = SingleFlight()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+UNIQUE_VIOLATION_MESSAGES = {
+    "username": "Пользователь с таким именем существует.",
+    "email": "Пользователь с таким email существует.",
+}
+
+
+def _unique_violation_message(error: IntegrityError) -> str:
+    # asyncpg отдаёт имя ограничения (ix_users_username), SQLite —
+    # колонку в первой строке сообщения (users.username).
+    cause = getattr(error.orig, "__cause__", None)
+    detail = getattr(cause, "constraint_name", None) or str(error.orig)
+    detail = detail.splitlines()[0] if detail else ""
+    for field, message in UNIQUE_VIOLATION_MESSAGES.items():
+        if f"users_{field}" in detail or f"users.{field}" in detail:
+            return message
+    return "Не удалось создать пользователя."
 
 
 class UserService:
@@ -15,6 +50,9 @@ class UserService:
         """
         Создать нового пользователя.
 
+        Уникальность username и email проверяют ограничения БД:
+        один INSERT ... RETURNING вместо предварительных SELECT.
+
         Args:
             user_data (UserCreate): Данные для создания пользователя.
             db (AsyncSession): Асинхронная сессия БД.
@@ -24,28 +62,23 @@ class UserService:
                 Если пользователь успешно создан — (User, None).
                 Если возникла ошибка — (None, сообщение об ошибке).
         """
-        result_username = await db.execute(
-            select(User).where(User.username == user_data.username)
-        )
-        if result_username.scalar_one_or_none():
-            return None, "Пользователь с таким именем существует."
-
-        result_email = await db.execute(
-            select(User).where(User.email == user_data.email)
-        )
-        if result_email.scalar_one_or_none():
-            return None, "Пользователь с таким email существует."
-
-        hashed_password = pwd_context.hash(user_data.password)
-        user = User(
-            username=user_data.username,
-            email=user_data.email,
-            full_name=user_data.full_name,
-            hashed_password=hashed_password,
-        )
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        hashed_password = await password_hasher.hash(user_data.password)
+        try:
+            result = await db.execute(
+                insert(User)
+                .values(
+                    username=user_data.username,
+                    email=user_data.email,
+                    full_name=user_data.full_name,
+                    hashed_password=hashed_password,
+                )
+                .returning(User)
+            )
+            user = result.scalar_one()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            return None, _unique_violation_message(e)
         return user, None
 
     @staticmethod
@@ -68,8 +101,174 @@ class UserService:
             select(User).where(User.email == login_data.email),
         )
         user = result.scalar_one_or_none()
-        if not user or not pwd_context.verify(
+        if not user or not await password_hasher.verify(
             login_data.password, getattr(user, "hashed_password", None)
         ):
             return None, "Неверный email или пароль."
+        if password_hasher.needs_rehash(user.hashed_password):
+            task = asyncio.create_task(
+                UserService.rehash_password(
+                    db.bind, user.id, login_data.password, user.hashed_password
+                )
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
         return user, None
+
+    @staticmethod
+    async def rehash_password(
+        bind: AsyncEngine | AsyncConnection,
+        user_id: UUID,
+        password: str,
+        verified_hash: str,
+    ) -> None:
+        """
+        Пересчитать хеш пароля с текущей стоимостью bcrypt.
+
+        Вызывается в фоне после успешного входа, если хеш в БД создан
+        с другой стоимостью. Ошибки не пробрасываются: хеш будет
+        пересчитан при следующем входе.
+
+        Хеш заменяется, только если в БД всё ещё verified_hash: если пароль
+        успели сменить, пока шло хеширование, устаревший пересчёт ничего
+        не меняет и не возвращает старый пароль.
+
+        Args:
+            bind (AsyncEngine | AsyncConnection): Подключение к БД.
+            user_id (UUID): Идентификатор пользователя.
+            password (str): Проверенный пароль в открытом виде.
+            verified_hash (str): Хеш, с которым пароль был проверен.
+        """
+        try:
+            hashed_password = await password_hasher.hash(password)
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                await session.execute(
+                    update(User).where(
+                        User.id == user_id,
+                        User.hashed_password == verified_hash,
+                    )
+                    # Явно сохраняем updated_at: смена стоимости хеша
+                    # не является изменением профиля.
+                    .values(
+                        hashed_password=hashed_password,
+                        updated_at=User.updated_at,
+                    )
+                )
+                await session.commit()
+        except PasswordHasherBusy:
+            logger.debug("Перехеширование пароля %s отложено: пул занят", user_id)
+        except Exception:
+            logger.exception("Не удалось перехешировать пароль %s", user_id)
+
+    @staticmethod
+    async def delete_user(user_id: UUID, db: AsyncSession) -> bool:
+        """
+        Удалить пользователя вместе с его скриптами.
+
+        Скрипты удаляются явно, а не каскадом: DELETE … RETURNING отдаёт
+        их id и хеши текстов. Счётчики ссылок script_blobs уменьшаются
+        в той же транзакции (каскадное удаление их не трогает), а после
+        commit скрипты вытесняются из script_cache.
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            db (AsyncSession): Асинхронная сессия БД.
+
+        Returns:
+            bool: True, если пользователь был удалён, False — если не найден.
+        """
+        result = await db.execute(
+            delete(Script)
+            .where(Script.user_id == user_id)
+            .returning(Script.id, Script.content_hash)
+        )
+        scripts = result.all()
+        await ScriptBlobService.release(db, [script.content_hash for script in scripts])
+        result = await db.execute(
+            delete(User).where(User.id == user_id).returning(User.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
+        await db.commit()
+        UserService.invalidate_user(user_id, db.bind)
+        for script in scripts:
+            await script_service.ScriptService.invalidate_script(script.id, db.bind)
+        return deleted
+
+    @staticmethod
+    def invalidate_user(user_id: UUID, bind: AsyncEngine) -> None:
+        """
+        Не отдавать после commit изменения пользователя результат
+        загрузки, начатой до него (см. user_loads).
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            bind (AsyncEngine): Движок primary, через который шла запись.
+        """
+        user_loads.forget((user_id, bind))
+
+    @staticmethod
+    async def get_user(user_id: UUID, db: AsyncSession) -> UserRead | None:
+        """
+        Получить пользователя по id.
+
+        Одновременные запросы одного пользователя объединяются в один
+        SELECT (user_loads), который выполняется своей сессией. Запросы
+        к реплике и к primary загружаются отдельно, а после изменения
+        пользователя начинается новая загрузка (см. invalidate_user).
+
+        Args:
+            user_id (UUID): Идентификатор пользователя.
+            db (AsyncSession): Асинхронная сессия БД (источник подключения).
+
+        Returns:
+            UserRead | None: Пользователь или None, если не найден.
+        """
+        return await user_loads.do(
+            (user_id, db.bind), lambda: UserService._load_user(user_id, db.bind)
+        )
+
+    @staticmethod
+    async def _load_user(user_id: UUID, bind: AsyncEngine) -> UserRead | None:
+        async with AsyncSession(bind) as session:
+            result = await session.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+            return UserRead.model_validate(user) if user is not None else None
+
+    @staticmethod
+    async def list_users(
+        db: AsyncSession,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        cursor: str | None = None,
+        include_total: bool = False,
+        fields: list[str] | None = None,
+    ) -> tuple[list[Any], str | None, int | None]:
+        """
+        Получить страницу пользователей (keyset по created_at, id).
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            limit (int): Размер страницы.
+            cursor (str | None): Курсор предыдущей страницы.
+            include_total (bool): Добавить оценку общего числа пользователей.
+            fields (list[str] | None): Выбрать только эти колонки
+                (плюс created_at и id для курсора).
+
+        Returns:
+            tuple[list[Any], str | None, int | None]: Пользователи (или строки
+                с запрошенными колонками) страницы, курсор следующей страницы
+                и оценка общего числа пользователей.
+
+        Raises:
+            InvalidCursorError: Если курсор некорректен.
+        """
+        if fields:
+            stmt = select(*columns_for(User, fields, ("created_at", "id")))
+        else:
+            stmt = select(User)
+        items, next_cursor = await paginate(
+            db, stmt, User.created_at, User.id, limit, cursor
+        )
+        estimated_total = None
+        if include_total:
+            estimated_total = await estimate_count(db, select(User.id))
+        return items, next_cursor, estimated_total
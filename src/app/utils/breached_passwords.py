@@ -0,0 +1,148 @@
+"""
+Индекс утёкших паролей для быстрой проверки при регистрации.
+
+Формат файла: заголовок (магическая строка и количество записей),
+затем отсортированный массив 8-байтовых префиксов SHA-1 паролей
+в big-endian. Файл отображается в память через mmap, поэтому все
+воркеры разделяют одни и те же страницы page cache, а поиск —
+бинарный, O(log n) сравнений без загрузки списка в память процесса.
+
+Сборка индекса:
+    python -m src.app.utils.breached_passwords build passwords.idx list1.txt ...
+"""
+
+import argparse
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+from src.app.core.config import settings
+
+MAGIC = b"BRPWIDX1"
+HEADER = struct.Struct(">8sQ")
+DIGEST_SIZE = 8
+
+
+def password_digest(password: bytes) -> bytes:
+    """
+    Получить 8-байтовый префикс SHA-1 пароля.
+
+    Args:
+        password (bytes): Пароль в UTF-8.
+
+    Returns:
+        bytes: Префикс дайджеста, по которому ведётся поиск.
+    """
+    return hashlib.sha1(password).digest()[:DIGEST_SIZE]
+
+
+class BreachedPasswordIndex:
+    """
+    Отображённый в память отсортированный индекс утёкших паролей.
+
+    Атрибуты:
+        path (Path): Путь к файлу индекса.
+        count (int): Количество паролей в индексе.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._mmap, 0)
+        expected_size = HEADER.size + self.count * DIGEST_SIZE
+        if magic != MAGIC or len(self._mmap) != expected_size:
+            self._mmap.close()
+            raise ValueError(f"Некорректный файл индекса паролей: {self.path}")
+
+    def _contains_digest(self, digest: bytes) -> bool:
+        mm = self._mmap
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * DIGEST_SIZE
+            current = mm[offset : offset + DIGEST_SIZE]
+            if current < digest:
+                lo = mid + 1
+            elif current > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password: str) -> bool:
+        candidates = {password, password.lower()}
+        return any(
+            self._contains_digest(password_digest(candidate.encode()))
+            for candidate in candidates
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def build_index(sources: Iterable[str | Path], output: str | Path) -> int:
+    """
+    Собрать файл индекса из текстовых списков паролей (по одному в строке).
+
+    Args:
+        sources (Iterable[str | Path]): Файлы со списками паролей.
+        output (str | Path): Путь к создаваемому индексу.
+
+    Returns:
+        int: Количество уникальных паролей в индексе.
+    """
+    digests = array("Q")
+    for source in sources:
+        with open(source, "rb") as f:
+            for line in f:
+                password = line.rstrip(b"\r\n")
+                if password:
+                    digests.append(int.from_bytes(password_digest(password), "big"))
+    unique = array("Q", sorted(set(digests)))
+    del digests
+    if sys.byteorder == "little":
+        unique.byteswap()
+    output = Path(output)
+    tmp_output = output.with_suffix(output.suffix + ".tmp")
+    with open(tmp_output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(unique)))
+        unique.tofile(f)
+    tmp_output.replace(output)
+    return len(unique)
+
+
+_index: BreachedPasswordIndex | None = None
+
+
+def get_breached_index() -> BreachedPasswordIndex | None:
+    """
+    Получить индекс утёкших паролей из BREACHED_PASSWORDS_INDEX.
+
+    Returns:
+        BreachedPasswordIndex | None: Индекс или None, если он не настроен.
+    """
+    global _index
+    if _index is None and settings.BREACHED_PASSWORDS_INDEX:
+        _index = BreachedPasswordIndex(settings.BREACHED_PASSWORDS_INDEX)
+    return _index
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Индекс утёкших паролей")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Собрать индекс из списков")
+    build.add_argument("output", help="Путь к файлу индекса")
+    build.add_argument("sources", nargs="+", help="Списки паролей")
+    args = parser.parse_args(argv)
+
+    count = build_index(args.sources, args.output)
+    print(f"Записано паролей: {count} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import difflib
+
+# Дельта — список операций над строками предыдущей версии:
+# [start, end] — скопировать строки start..end, str — вставить текст.
+Delta = list[list[int] | str]
+
+
+def make_delta(old: str, new: str) -> Delta:
+    """
+    Построчная дельта, превращающая old в new.
+
+    Args:
+        old (str): Предыдущий текст.
+        new (str): Новый текст.
+
+    Returns:
+        Delta: Операции копирования и вставки.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    delta: Delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old: str, delta: Delta) -> str:
+    """
+    Применить дельту к предыдущему тексту.
+
+    Args:
+        old (str): Предыдущий текст.
+        delta (Delta): Дельта из make_delta.
+
+    Returns:
+        str: Новый текст.
+    """
+    old_lines = old.splitlines(keepends=True)
+    parts: list[str] = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts)
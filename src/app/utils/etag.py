@@ -0,0 +1,47 @@
+import calendar
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable
+from uuid import UUID
+
+
+def make_etag(
+    item_id: UUID | str, updated_at: datetime, variant: Iterable[str] | None = None
+) -> str:
+    """
+    Слабый ETag ресурса по id и времени последнего изменения.
+
+    Args:
+        item_id (UUID | str): Идентификатор ресурса.
+        updated_at (datetime): Время последнего изменения.
+        variant (Iterable[str] | None): Вариант представления
+            (например, поля из fields).
+
+    Returns:
+        str: ETag вида W/"...".
+    """
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    # Целые микросекунды: не зависит от формата таймзоны и округления float.
+    stamp = calendar.timegm(updated_at.utctimetuple()) * 10**6 + updated_at.microsecond
+    key = f"{item_id}:{stamp}:{','.join(variant or ())}"
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Проверить If-None-Match (слабое сравнение, RFC 9110).
+
+    Args:
+        if_none_match (str): Значение заголовка If-None-Match.
+        etag (str): Текущий ETag ресурса.
+
+    Returns:
+        bool: True, если у клиента актуальная версия.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
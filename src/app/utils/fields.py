@@ -0,0 +1,71 @@
+from typing import Any, Iterable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidFieldsError(ValueError):
+    """
+    В параметре fields запрошены неизвестные поля.
+    """
+
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> list[str] | None:
+    """
+    Разобрать параметр fields (список полей через запятую).
+
+    Args:
+        fields (str | None): Значение параметра fields.
+        schema (type[BaseModel]): Схема ответа с допустимыми полями.
+
+    Returns:
+        list[str] | None: Запрошенные поля без повторов или None,
+            если параметр не передан.
+
+    Raises:
+        InvalidFieldsError: Если поле неизвестно или список пуст.
+    """
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",")))
+    names = [name for name in names if name]
+    if not names:
+        raise InvalidFieldsError("Параметр fields не содержит полей")
+    if unknown := [name for name in names if name not in schema.model_fields]:
+        raise InvalidFieldsError(f"Неизвестные поля: {', '.join(unknown)}")
+    return names
+
+
+def columns_for(
+    model: type, names: Iterable[str], required: Iterable[str] = ()
+) -> list[InstrumentedAttribute]:
+    """
+    Колонки модели для запрошенных полей.
+
+    Args:
+        model (type): ORM-модель.
+        names (Iterable[str]): Запрошенные поля.
+        required (Iterable[str]): Поля, нужные независимо от запроса
+            (например, для курсора пагинации).
+
+    Returns:
+        list[InstrumentedAttribute]: Колонки для SELECT без повторов.
+    """
+    return [getattr(model, name) for name in dict.fromkeys((*names, *required))]
+
+
+def pick_fields(rows: Iterable[Any], names: list[str]) -> list[dict[str, Any]]:
+    """
+    Оставить в записях только запрошенные поля в JSON-совместимом виде.
+
+    Args:
+        rows (Iterable[Any]): Строки результата или ORM-объекты.
+        names (list[str]): Запрошенные поля.
+
+    Returns:
+        list[dict[str, Any]]: Записи для JSON-ответа.
+    """
+    return jsonable_encoder(
+        [{name: getattr(row, name) for name in names} for row in rows]
+    )
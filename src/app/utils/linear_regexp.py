@@ -0,0 +1,577 @@
+import unicodedata
+from typing import Callable, Iterable, Sequence
+
+# Поддерживаемое подмножество синтаксиса re (строковые шаблоны, без флагов):
+# литералы и экранирование, ., классы [...], \d \D \s \S \w \W, группы
+# (...), (?:...), (?P<name>...), комментарии (?#...), альтернатива |,
+# квантификаторы * + ? {m} {m,} {,n} {m,n} (в том числе ленивые) и якоря
+# ^ \A в начале и $ \Z в конце выражения. Обратные ссылки, просмотр
+# вперёд/назад, \b \B, атомарные группы, притяжательные квантификаторы,
+# условия и флаги не поддерживаются: для них нет автомата линейного времени.
+
+# Предел вложенности групп (разбор рекурсивный)
+MAX_GROUP_DEPTH = 100
+# Бюджет кэша ленивого ДКА: переходы + состояния НКА в его состояниях.
+# При превышении кэш сбрасывается и строится заново.
+DFA_CACHE_BUDGET = 20_000
+
+Predicate = Callable[[str], bool]
+
+_SIMPLE_ESCAPES = {
+    "a": "\a",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+_OCTAL = "01234567"
+_DIGITS = "0123456789"
+_HEX = "0123456789abcdefABCDEF"
+
+
+class UnsupportedPattern(ValueError):
+    """
+    Выражение выходит за подмножество, поддерживаемое линейным движком.
+    """
+
+
+def _is_octal(ch: str) -> bool:
+    return ch != "" and ch in _OCTAL
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _not_decimal(ch: str) -> bool:
+    return not ch.isdecimal()
+
+
+def _not_space(ch: str) -> bool:
+    return not ch.isspace()
+
+
+def _not_word(ch: str) -> bool:
+    return not _is_word(ch)
+
+
+# Классы символов как в re для строковых шаблонов (Unicode)
+_CATEGORIES: dict[str, Predicate] = {
+    "d": str.isdecimal,
+    "D": _not_decimal,
+    "s": str.isspace,
+    "S": _not_space,
+    "w": _is_word,
+    "W": _not_word,
+}
+
+
+class _CharSet:
+    """Класс символов [...]: символы, диапазоны и категории."""
+
+    __slots__ = ("negated", "chars", "ranges", "categories")
+
+    def __init__(
+        self,
+        negated: bool = False,
+        chars: Iterable[str] = (),
+        ranges: Iterable[tuple[str, str]] = (),
+        categories: Iterable[Predicate] = (),
+    ) -> None:
+        self.negated = negated
+        self.chars = frozenset(chars)
+        self.ranges = tuple(ranges)
+        self.categories = tuple(categories)
+
+    def __call__(self, ch: str) -> bool:
+        hit = (
+            ch in self.chars
+            or any(lo <= ch <= hi for lo, hi in self.ranges)
+            or any(category(ch) for category in self.categories)
+        )
+        return hit != self.negated
+
+
+_ANY = _CharSet(negated=True, chars="\n")
+
+# Узлы разбора:
+# ("char", predicate), ("cat", [узлы]), ("alt", [узлы]),
+# ("repeat", узел, min, max | None)
+Node = tuple
+
+
+class _Parser:
+    """Рекурсивный разбор выражения в дерево узлов."""
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.pos = 0
+        self.depth = 0
+
+    def parse(self) -> Node:
+        node = self._alternation(top=True)
+        if self.pos < len(self.pattern):
+            raise UnsupportedPattern(f"Неожиданный символ в позиции {self.pos}")
+        return node
+
+    def _peek(self, offset: int = 0) -> str:
+        index = self.pos + offset
+        return self.pattern[index] if index < len(self.pattern) else ""
+
+    def _next(self) -> str:
+        ch = self._peek()
+        if not ch:
+            raise UnsupportedPattern("Неожиданный конец выражения")
+        self.pos += 1
+        return ch
+
+    def _alternation(self, top: bool) -> Node:
+        branches = [self._concat(top)]
+        while self._peek() == "|":
+            self.pos += 1
+            branches.append(self._concat(top))
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _concat(self, top: bool) -> Node:
+        items: list[Node] = []
+        while self._peek() not in ("", "|", ")"):
+            start = self.pos
+            atom = self._atom(top, first=not items)
+            if atom is None:
+                continue
+            items.append(self._quantifier(atom, start))
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def _anchor(self, top: bool, first: bool, at_start: bool, start: int) -> None:
+        # В fullmatch якорь на краю выражения ничего не меняет;
+        # в других местах он зависит от позиции и автомату не подходит.
+        at_end = self._peek() in ("", "|")
+        if top and (first if at_start else at_end):
+            return None
+        raise UnsupportedPattern(
+            f"Якорь в позиции {start} поддерживается только на краю выражения"
+        )
+
+    def _atom(self, top: bool, first: bool) -> Node | None:
+        start = self.pos
+        ch = self._next()
+        if ch == "(":
+            return self._group(start)
+        if ch == "[":
+            return ("char", self._class())
+        if ch == ".":
+            return ("char", _ANY)
+        if ch in "^$":
+            return self._anchor(top, first, ch == "^", start)
+        if ch == "\\":
+            escape = self._next()
+            if escape in "AZ":
+                return self._anchor(top, first, escape == "A", start)
+            if escape in _CATEGORIES:
+                return ("char", _CATEGORIES[escape])
+            return ("char", self._literal_escape(escape, in_class=False).__eq__)
+        if ch in "*+?":
+            raise UnsupportedPattern(f"Нечего повторять в позиции {start}")
+        return ("char", ch.__eq__)
+
+    def _group(self, start: int) -> Node | None:
+        if self._peek() == "?":
+            self.pos += 1
+            kind = self._next()
+            if kind == "#":
+                while self._next() != ")":
+                    pass
+                return None
+            if kind == "P" and self._peek() == "<":
+                while self._next() != ">":
+                    pass
+            elif kind == "P" and self._peek() == "=":
+                raise UnsupportedPattern("Обратные ссылки не поддерживаются")
+            elif kind in "=!" or (kind == "<" and self._peek() in ("=", "!")):
+                raise UnsupportedPattern("Просмотр вперёд и назад не поддерживается")
+            elif kind == ">":
+                raise UnsupportedPattern("Атомарные группы не поддерживаются")
+            elif kind == "(":
+                raise UnsupportedPattern("Условные группы не поддерживаются")
+            elif kind != ":":
+                raise UnsupportedPattern("Флаги в выражении не поддерживаются")
+        self.depth += 1
+        if self.depth > MAX_GROUP_DEPTH:
+            raise UnsupportedPattern("Слишком глубокая вложенность групп")
+        node = self._alternation(top=False)
+        self.depth -= 1
+        if self._next() != ")":
+            raise UnsupportedPattern(f"Незакрытая группа в позиции {start}")
+        return node
+
+    def _class(self) -> _CharSet:
+        negated = self._peek() == "^"
+        if negated:
+            self.pos += 1
+        chars: list[str] = []
+        ranges: list[tuple[str, str]] = []
+        categories: list[Predicate] = []
+        start = self.pos
+        while True:
+            ch = self._next()
+            if ch == "]" and self.pos - 1 != start:
+                break
+            if ch == "\\":
+                escape = self._next()
+                if escape in _CATEGORIES:
+                    categories.append(_CATEGORIES[escape])
+                    continue
+                lo = self._literal_escape(escape, in_class=True)
+            else:
+                lo = ch
+            if self._peek() == "-" and self._peek(1) not in ("]", ""):
+                self.pos += 1
+                ch = self._next()
+                hi = (
+                    self._literal_escape(self._next(), in_class=True)
+                    if ch == "\\"
+                    else ch
+                )
+                ranges.append((lo, hi))
+            else:
+                chars.append(lo)
+        return _CharSet(negated, chars, ranges, categories)
+
+    def _literal_escape(self, escape: str, in_class: bool) -> str:
+        if escape in _SIMPLE_ESCAPES:
+            return _SIMPLE_ESCAPES[escape]
+        if escape == "b" and in_class:
+            return "\b"
+        if escape in "xuU":
+            width = {"x": 2, "u": 4, "U": 8}[escape]
+            digits = self.pattern[self.pos : self.pos + width]
+            if len(digits) != width or any(d not in _HEX for d in digits):
+                raise UnsupportedPattern(f"Некорректное экранирование \\{escape}")
+            self.pos += width
+            return chr(int(digits, 16))
+        if escape == "N" and self._peek() == "{":
+            end = self.pattern.find("}", self.pos)
+            name = self.pattern[self.pos + 1 : end]
+            self.pos = end + 1
+            try:
+                return unicodedata.lookup(name)
+            except KeyError:
+                raise UnsupportedPattern(f"Неизвестное имя символа: {name}") from None
+        if escape in _DIGITS:
+            return self._numeric_escape(escape, in_class)
+        if escape in "bB":
+            raise UnsupportedPattern("Границы слов \\b и \\B не поддерживаются")
+        if escape.isascii() and escape.isalpha():
+            raise UnsupportedPattern(f"Неизвестное экранирование \\{escape}")
+        return escape
+
+    def _numeric_escape(self, first: str, in_class: bool) -> str:
+        # Как в re: \0, \0o, \0oo и \ooo — восьмеричные коды,
+        # остальное вне класса — обратная ссылка на группу.
+        digits = first
+        if first == "0" or in_class:
+            if first not in _OCTAL:
+                raise UnsupportedPattern(f"Некорректное экранирование \\{first}")
+            while len(digits) < 3 and _is_octal(self._peek()):
+                digits += self._next()
+            return chr(int(digits, 8))
+        if first in _OCTAL and _is_octal(self._peek()) and _is_octal(self._peek(1)):
+            digits += self._next() + self._next()
+            return chr(int(digits, 8))
+        raise UnsupportedPattern("Обратные ссылки не поддерживаются")
+
+    def _quantifier(self, atom: Node, start: int) -> Node:
+        ch = self._peek()
+        if ch == "*":
+            bounds: tuple[int, int | None] = (0, None)
+        elif ch == "+":
+            bounds = (1, None)
+        elif ch == "?":
+            bounds = (0, 1)
+        elif ch == "{":
+            parsed = self._braces()
+            if parsed is None:
+                return atom
+            bounds = parsed
+        else:
+            return atom
+        if ch != "{":
+            self.pos += 1
+        # Ленивый квантификатор задаёт тот же язык — для fullmatch
+        # разницы нет; притяжательный меняет язык.
+        if self._peek() == "?":
+            self.pos += 1
+        elif self._peek() == "+":
+            raise UnsupportedPattern(
+                f"Притяжательный квантификатор в позиции {start} не поддерживается"
+            )
+        if self._peek() in ("*", "+", "?"):
+            raise UnsupportedPattern(f"Повтор повтора в позиции {self.pos}")
+        low, high = bounds
+        return ("repeat", atom, low, high)
+
+    def _braces(self) -> tuple[int, int | None] | None:
+        # {m}, {m,}, {,n}, {m,n}; иначе { — обычный символ, как в re
+        end = self.pattern.find("}", self.pos)
+        if end < 0:
+            return None
+        body = self.pattern[self.pos + 1 : end]
+        low, comma, high = body.partition(",")
+        if not body or any(ch not in _DIGITS for ch in low + high):
+            return None
+        self.pos = end + 1
+        lo = int(low) if low else 0
+        if not comma:
+            return lo, lo
+        hi = int(high) if high else None
+        if hi is not None and hi < lo:
+            raise UnsupportedPattern("Минимум повторов больше максимума")
+        return lo, hi
+
+
+# Виды состояний НКА
+_CHAR, _SPLIT, _MATCH = range(3)
+
+
+class _Program:
+    """
+    НКА Томпсона в массивах: для _CHAR — предикат и следующее состояние,
+    для _SPLIT — две ε-ветви, для _MATCH — номер выражения в out.
+    """
+
+    def __init__(self, max_states: int) -> None:
+        self.max_states = max_states
+        self.kind: list[int] = []
+        self.pred: list[Predicate | None] = []
+        self.out: list[int] = []
+        self.out2: list[int] = []
+
+    def add(
+        self, kind: int, pred: Predicate | None = None, out: int = -1, out2: int = -1
+    ) -> int:
+        if len(self.kind) >= self.max_states:
+            raise UnsupportedPattern(
+                f"Автомат выражения больше {self.max_states} состояний"
+            )
+        self.kind.append(kind)
+        self.pred.append(pred)
+        self.out.append(out)
+        self.out2.append(out2)
+        return len(self.kind) - 1
+
+    def build(self, node: Node, nxt: int) -> int:
+        # Строим с конца: каждое поддерево получает готовое продолжение
+        kind = node[0]
+        if kind == "char":
+            return self.add(_CHAR, node[1], nxt)
+        if kind == "cat":
+            for child in reversed(node[1]):
+                nxt = self.build(child, nxt)
+            return nxt
+        if kind == "alt":
+            starts = [self.build(child, nxt) for child in node[1]]
+            start = starts[-1]
+            for branch in reversed(starts[:-1]):
+                start = self.add(_SPLIT, out=branch, out2=start)
+            return start
+        _, child, low, high = node
+        if high is None:
+            loop = self.add(_SPLIT, out2=nxt)
+            self.out[loop] = self.build(child, loop)
+            tail = loop
+        else:
+            # x{0,n}: вложенные необязательные копии (x(x(x)?)?)?
+            tail = nxt
+            for _ in range(high - low):
+                tail = self.add(_SPLIT, out=self.build(child, tail), out2=nxt)
+        for _ in range(low):
+            tail = self.build(child, tail)
+        return tail
+
+    def closure(self, states: Iterable[int]) -> frozenset[int]:
+        # ε-замыкание; в состояние ДКА входят только _CHAR и _MATCH
+        seen: set[int] = set()
+        result: list[int] = []
+        stack = list(states)
+        while stack:
+            state = stack.pop()
+            if state in seen:
+                continue
+            seen.add(state)
+            if self.kind[state] == _SPLIT:
+                stack.append(self.out2[state])
+                stack.append(self.out[state])
+            else:
+                result.append(state)
+        return frozenset(result)
+
+
+class _DState:
+    """Состояние ленивого ДКА: множество состояний НКА и кэш переходов."""
+
+    __slots__ = ("states", "next", "accepts")
+
+    def __init__(self, states: frozenset[int], accepts: frozenset[int]) -> None:
+        self.states = states
+        self.next: dict[str, _DState] = {}
+        self.accepts = accepts
+
+
+class _LazyDFA:
+    """
+    Ленивый ДКА поверх НКА: состояния и переходы строятся по мере
+    надобности и кэшируются. Каждый символ текста обрабатывается за
+    O(размер НКА) без кэша и за O(1) с ним, поэтому время сопоставления
+    линейно по длине текста для любого выражения.
+
+    Не потокобезопасен: кэш общий для всех вызовов.
+    """
+
+    def __init__(self, program: _Program, start: int) -> None:
+        self._program = program
+        self._start_states = program.closure([start])
+        self._flush()
+
+    def _flush(self) -> None:
+        self._cache: dict[frozenset[int], _DState] = {}
+        self._cost = 0
+        self._start = self._intern(self._start_states)
+
+    def _intern(self, states: frozenset[int]) -> _DState:
+        dstate = self._cache.get(states)
+        if dstate is None:
+            program = self._program
+            accepts = frozenset(
+                program.out[state] for state in states if program.kind[state] == _MATCH
+            )
+            dstate = self._cache[states] = _DState(states, accepts)
+            self._cost += len(states) + 1
+        return dstate
+
+    def _step(self, dstate: _DState, ch: str) -> _DState:
+        if self._cost >= DFA_CACHE_BUDGET:
+            self._flush()
+            dstate = self._intern(dstate.states)
+        program = self._program
+        targets = [
+            program.out[state]
+            for state in dstate.states
+            if program.kind[state] == _CHAR and program.pred[state](ch)
+        ]
+        nxt = dstate.next[ch] = self._intern(program.closure(targets))
+        self._cost += 1
+        return nxt
+
+    def run(self, text: str) -> frozenset[int]:
+        """
+        Номера выражений, которым текст соответствует целиком.
+        """
+        dstate = self._start
+        for ch in text:
+            nxt = dstate.next.get(ch)
+            if nxt is None:
+                nxt = self._step(dstate, ch)
+            dstate = nxt
+            if not dstate.states:
+                # Тупик: ни одно выражение уже не совпадёт
+                return frozenset()
+        return dstate.accepts
+
+
+def parse(pattern: str) -> Node:
+    """
+    Разобрать выражение, проверив, что оно входит в поддерживаемое
+    подмножество.
+
+    Синтаксис заранее проверяется re.compile: здесь отсекаются
+    конструкции, которым нужен бэктрекинг.
+
+    Args:
+        pattern (str): Регулярное выражение.
+
+    Returns:
+        Node: Дерево разбора.
+
+    Raises:
+        UnsupportedPattern: Если выражение вне подмножества.
+    """
+    return _Parser(pattern).parse()
+
+
+class LinearPattern:
+    """
+    Регулярное выражение на автомате с линейным временем сопоставления.
+
+    Выражение переводится в НКА Томпсона, а сопоставление идёт по
+    лениво строящемуся ДКА с ограниченным кэшем (DFA_CACHE_BUDGET).
+    Катастрофического бэктрекинга нет по построению: время — O(длина
+    текста × размер автомата) в худшем случае.
+
+    Атрибуты:
+        pattern (str): Исходное выражение.
+        states (int): Размер НКА.
+    """
+
+    def __init__(self, pattern: str, max_states: int) -> None:
+        program = _Program(max_states)
+        start = program.build(parse(pattern), program.add(_MATCH, out=0))
+        self.pattern = pattern
+        self.states = len(program.kind)
+        self._dfa = _LazyDFA(program, start)
+
+    def fullmatch(self, text: str) -> bool:
+        """
+        Проверить, что текст целиком соответствует выражению
+        (как re.fullmatch).
+
+        Args:
+            text (str): Текст.
+
+        Returns:
+            bool: True, если соответствует.
+        """
+        return bool(self._dfa.run(text))
+
+
+class LinearPatternSet:
+    """
+    Несколько выражений в одном автомате линейного времени.
+
+    НКА выражений объединяются альтернативой, но у каждого своё
+    принимающее состояние с номером выражения, поэтому один проход по
+    тексту даёт все совпавшие выражения, а не первое, как у re с
+    альтернативой именованных групп. Когда ни одно выражение уже не может
+    совпасть, проход прерывается.
+
+    Атрибуты:
+        patterns (tuple[str, ...]): Исходные выражения.
+        states (int): Размер общего НКА.
+    """
+
+    def __init__(self, patterns: Sequence[str], max_states: int) -> None:
+        if not patterns:
+            raise ValueError("Нужно хотя бы одно выражение")
+        program = _Program(max_states)
+        starts = [
+            program.build(parse(pattern), program.add(_MATCH, out=index))
+            for index, pattern in enumerate(patterns)
+        ]
+        start = starts[-1]
+        for branch in reversed(starts[:-1]):
+            start = program.add(_SPLIT, out=branch, out2=start)
+        self.patterns = tuple(patterns)
+        self.states = len(program.kind)
+        self._dfa = _LazyDFA(program, start)
+
+    def matches(self, text: str) -> frozenset[int]:
+        """
+        Номера выражений, которым текст соответствует целиком.
+
+        Args:
+            text (str): Текст.
+
+        Returns:
+            frozenset[int]: Индексы в patterns.
+        """
+        return self._dfa.run(text)
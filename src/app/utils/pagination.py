@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+
+class InvalidCursorError(ValueError):
+    """
+    Курсор пагинации повреждён или подделан.
+    """
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """
+    Закодировать позицию (created_at, id) в непрозрачный курсор.
+
+    Args:
+        created_at (datetime): Дата создания последней записи страницы.
+        item_id (UUID): Идентификатор последней записи страницы.
+
+    Returns:
+        str: Курсор в base64url без выравнивания.
+    """
+    raw = json.dumps([created_at.isoformat(), str(item_id)]).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Раскодировать курсор в позицию (created_at, id).
+
+    Args:
+        cursor (str): Курсор из ответа предыдущей страницы.
+
+    Returns:
+        tuple[datetime, UUID]: Позиция последней выданной записи.
+
+    Raises:
+        InvalidCursorError: Если курсор некорректен.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    created_at: InstrumentedAttribute,
+    id_: InstrumentedAttribute,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[Any], str | None]:
+    """
+    Выбрать страницу по ключу (created_at, id).
+
+    Стоимость любой страницы одинакова: вместо OFFSET используется
+    условие (created_at, id) > курсор по индексу.
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД.
+        stmt (Select): Запрос без сортировки и лимита: по ORM-модели
+            или по набору колонок, включающему created_at и id.
+        created_at (InstrumentedAttribute): Колонка даты создания.
+        id_ (InstrumentedAttribute): Колонка идентификатора.
+        limit (int): Размер страницы.
+        cursor (str | None): Курсор предыдущей страницы.
+
+    Returns:
+        tuple[list[Any], str | None]: Записи страницы (ORM-объекты или
+            строки Row) и курсор следующей.
+
+    Raises:
+        InvalidCursorError: Если курсор некорректен.
+    """
+    if cursor:
+        stmt = stmt.where(tuple_(created_at, id_) > tuple_(*decode_cursor(cursor)))
+    result = await db.execute(stmt.order_by(created_at, id_).limit(limit + 1))
+    entities = stmt.column_descriptions
+    if len(entities) == 1 and entities[0]["expr"] is entities[0]["entity"]:
+        items = list(result.scalars().all())
+    else:
+        items = list(result.all())
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor(getattr(last, created_at.key), getattr(last, id_.key))
+
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> int | None:
+    """
+    Оценить число строк запроса по статистике планировщика Postgres
+    (EXPLAIN) вместо COUNT(*).
+
+    Args:
+        db (AsyncSession): Асинхронная сессия БД.
+        stmt (Select): Запрос без сортировки и лимита.
+
+    Returns:
+        int | None: Оценка числа строк или None для других СУБД.
+    """
+    conn = await db.connection()
+    if conn.dialect.name != "postgresql":
+        return None
+    sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,59 @@
+from typing import Any, Mapping, TypeVar
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from src.app.core.config import settings
+
+T = TypeVar("T")
+
+JSON_RESPONSE_CLASSES: dict[str, type[JSONResponse]] = {
+    "json": JSONResponse,
+    "orjson": ORJSONResponse,
+}
+
+
+def json_response_class(name: str) -> type[JSONResponse]:
+    """
+    Класс JSON-ответа по имени из настроек.
+
+    Args:
+        name (str): json (stdlib) или orjson.
+
+    Returns:
+        type[JSONResponse]: Класс ответа.
+
+    Raises:
+        ValueError: Если имя неизвестно.
+    """
+    try:
+        return JSON_RESPONSE_CLASSES[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный класс JSON-ответа: {name}") from None
+
+
+DefaultJSONResponse = json_response_class(settings.JSON_RESPONSE_CLASS)
+
+
+def dump_response(
+    adapter: TypeAdapter[T],
+    value: Any,
+    headers: Mapping[str, str] | None = None,
+) -> JSONResponse:
+    """
+    Ответ из ORM-объектов с одной валидацией pydantic-core.
+
+    Объекты проверяются схемой один раз (в Rust) и переводятся в
+    JSON-совместимые значения, минуя response_model и jsonable_encoder;
+    кодирует их DefaultJSONResponse. Роут при этом сохраняет
+    response_model для OpenAPI.
+
+    Args:
+        adapter (TypeAdapter[T]): Адаптер схемы ответа.
+        value (Any): ORM-объекты, словари или готовые модели.
+        headers (Mapping[str, str] | None): Дополнительные заголовки.
+
+    Returns:
+        JSONResponse: JSON-ответ.
+    """
+    data = adapter.validate_python(value, from_attributes=True)
+    return DefaultJSONResponse(adapter.dump_python(data, mode="json"), headers=headers)
@@ -0,0 +1,174 @@
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Iterable
+
+# (номер строки, данные записи, ошибка разбора)
+Record = tuple[int, dict[str, Any] | None, str | None]
+
+
+class LineTooLongError(ValueError):
+    """
+    Строка (или запись CSV) входного потока превышает допустимый размер.
+
+    Атрибуты:
+        line (int): Номер строки, с которой начинается слишком длинная
+            строка или запись.
+    """
+
+    def __init__(self, message: str, line: int) -> None:
+        super().__init__(message)
+        self.line = line
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_length: int
+) -> AsyncIterator[str]:
+    """
+    Разбить поток байтов на строки UTF-8, не буферизуя весь поток.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Поток тела запроса.
+        max_line_length (int): Максимальная длина строки в символах.
+
+    Yields:
+        str: Строки без завершающего перевода строки.
+
+    Raises:
+        LineTooLongError: Если строка длиннее max_line_length.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    lineno = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            lineno += 1
+            if len(line) > max_line_length:
+                raise LineTooLongError(
+                    f"Строка длиннее {max_line_length} символов", lineno
+                )
+            yield line.removesuffix("\r")
+        if len(buffer) > max_line_length:
+            raise LineTooLongError(
+                f"Строка длиннее {max_line_length} символов", lineno + 1
+            )
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.removesuffix("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Разобрать NDJSON: по одному JSON-объекту в строке.
+
+    Args:
+        lines (AsyncIterator[str]): Строки входного потока.
+
+    Yields:
+        Record: (номер строки, объект, None) или (номер строки, None, ошибка).
+    """
+    lineno = 0
+    async for line in lines:
+        lineno += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield lineno, None, f"Некорректный JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield lineno, None, "Ожидается JSON-объект"
+            continue
+        yield lineno, data, None
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[str],
+    max_record_length: int,
+    required: tuple[str, ...] = (),
+) -> AsyncIterator[Record]:
+    """
+    Разобрать CSV с заголовком. Поля в кавычках могут содержать
+    переводы строк: запись считается полной, когда число кавычек чётно.
+
+    Args:
+        lines (AsyncIterator[str]): Строки входного потока.
+        max_record_length (int): Максимальная длина записи в символах
+            (вместе с переводами строк внутри кавычек).
+        required (tuple[str, ...]): Обязательные колонки заголовка.
+
+    Yields:
+        Record: (номер первой строки записи, словарь колонок, None)
+            или (номер строки, None, ошибка).
+
+    Raises:
+        LineTooLongError: Если запись длиннее max_record_length — например,
+            из-за незакрытой кавычки, которая склеивает весь остаток файла.
+    """
+    header: list[str] | None = None
+    parts: list[str] = []
+    quotes = 0
+    length = 0
+    start = lineno = 0
+    async for line in lines:
+        lineno += 1
+        if not parts:
+            start = lineno
+            if not line.strip():
+                continue
+        parts.append(line)
+        length += len(line) + 1
+        if length - 1 > max_record_length:
+            raise LineTooLongError(
+                f"Запись длиннее {max_record_length} символов", start
+            )
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(parts)
+        parts, quotes, length = [], 0, 0
+        row = next(csv.reader([text]), [])
+        if header is None:
+            header = [column.strip() for column in row]
+            if missing := [column for column in required if column not in header]:
+                yield start, None, f"В заголовке нет колонок: {', '.join(missing)}"
+                return
+            continue
+        if len(row) != len(header):
+            yield start, None, f"Ожидается {len(header)} колонок, получено {len(row)}"
+            continue
+        yield start, dict(zip(header, row)), None
+    if parts:
+        yield start, None, "Незакрытая кавычка в конце файла"
+
+
+def to_ndjson(rows: Iterable[dict[str, Any]]) -> str:
+    """
+    Сериализовать записи в NDJSON (по объекту в строке).
+
+    Args:
+        rows (Iterable[dict[str, Any]]): JSON-совместимые записи.
+
+    Returns:
+        str: Строки NDJSON, каждая с завершающим переводом строки.
+    """
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def to_csv(rows: Iterable[Iterable[Any]]) -> str:
+    """
+    Сериализовать строки таблицы в CSV.
+
+    Args:
+        rows (Iterable[Iterable[Any]]): Строки со значениями колонок.
+
+    Returns:
+        str: Фрагмент CSV.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
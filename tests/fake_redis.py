@@ -0,0 +1,90 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+async def read_command(reader: asyncio.StreamReader) -> list[bytes]:
+    """Прочитать команду клиента: массив RESP из bulk-строк."""
+    header = await reader.readuntil(b"\r\n")
+    if header[:1] != b"*":
+        raise ConnectionError(f"Ожидался массив RESP: {header!r}")
+    command = []
+    for _ in range(int(header[1:-2])):
+        length = int((await reader.readuntil(b"\r\n"))[1:-2])
+        command.append((await reader.readexactly(length + 2))[:-2])
+    return command
+
+
+class FakeRedis:
+    """
+    Минимальный сервер RESP2 для тестов: GET, SET (PX, NX), DEL, INFO, PING.
+
+    Атрибуты:
+        data (dict): Ключи и (значение, время истечения).
+        commands (list): Полученные команды.
+        port (int): Порт, на котором слушает сервер.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.commands: list[list[bytes]] = []
+        self.port = 0
+
+    def _get(self, key: bytes) -> bytes | None:
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _reply(self, value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _execute(self, command: list[bytes]) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        if name == b"PING":
+            return self._reply("PONG")
+        if name == b"GET":
+            return self._reply(self._get(args[0]))
+        if name == b"DEL":
+            return self._reply(
+                sum(self.data.pop(key, None) is not None for key in args)
+            )
+        if name == b"INFO":
+            return self._reply(b"# Stats\r\nevicted_keys:0\r\n")
+        if name == b"SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if b"NX" in options and self._get(key) is not None:
+                return self._reply(None)
+            expires_at = None
+            if b"PX" in options:
+                ttl = int(args[2 + options.index(b"PX") + 1])
+                expires_at = time.monotonic() + ttl / 1000
+            self.data[key] = (value, expires_at)
+            return self._reply("OK")
+        return f"-ERR unknown command '{name.decode()}'\r\n".encode()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                command = await read_command(reader)
+                self.commands.append(command)
+                writer.write(self._execute(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+    @asynccontextmanager
+    async def serve(self) -> AsyncIterator["FakeRedis"]:
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        async with server:
+            yield self
+            server.close()
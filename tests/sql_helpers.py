@@ -0,0 +1,72 @@
+import json
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+HOT_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+
+
+@contextmanager
+def capture_statements(engine: AsyncEngine) -> Iterator[list[tuple[str, Any]]]:
+    """
+    Перехватить SQL-запросы, отправленные драйверу через engine.
+
+    Yields:
+        list[tuple[str, Any]]: Пары (SQL, параметры) в порядке выполнения.
+    """
+    statements: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not many:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _pg_seq_scans(plan: dict) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _pg_seq_scans(child)
+
+
+async def assert_no_seq_scan(
+    engine: AsyncEngine, statements: list[tuple[str, Any]], tables: set[str]
+) -> None:
+    """
+    Выполнить EXPLAIN для перехваченных запросов и упасть, если
+    какой-то из них читает таблицу из tables полным сканированием.
+
+    В Postgres seq scan отключается (enable_seqscan = off): если план всё
+    равно его содержит, подходящего индекса нет. В SQLite полным
+    сканированием считается строка плана "SCAN <table>" без индекса.
+    """
+    async with engine.connect() as conn:
+        is_postgres = conn.dialect.name == "postgresql"
+        if is_postgres:
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(HOT_STATEMENTS):
+                continue
+            if is_postgres:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scanned = set(_pg_seq_scans(plan[0]["Plan"])) & tables
+            else:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+                details = [row[-1] for row in result]
+                scanned = {t for t in tables if f"SCAN {t}" in details}
+            assert not scanned, f"Seq scan по {scanned}: {statement}"
+        await conn.rollback()
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from redis.exceptions import RedisError
+from src.app.core.cache import (
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    VersionedCache,
+    create_cache_backend,
+)
+
+from tests.fake_redis import FakeRedis
+
+
+@pytest.mark.asyncio
+async def test_versioned_cache_rejects_stale_repopulation():
+    cache = VersionedCache(MemoryCacheBackend(100), "script", ttl=60)
+
+    value, stamp = await cache.lookup("a")
+    assert value is None
+    # Читатель загрузил старые данные, но до store запись успели изменить
+    await cache.invalidate("a")
+    await cache.store("a", stamp, b"stale")
+    value, fresh_stamp = await cache.lookup("a")
+    assert value is None
+    assert fresh_stamp != stamp
+
+    await cache.store("a", fresh_stamp, b"fresh")
+    value, _ = await cache.lookup("a")
+    assert value == b"fresh"
+
+    stats = await cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
+    assert stats["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lost_stamp_does_not_revive_old_entries():
+    backend = MemoryCacheBackend(100)
+    cache = VersionedCache(backend, "script", ttl=60)
+    _, stamp = await cache.lookup("a")
+    await cache.store("a", stamp, b"old")
+    await cache.invalidate("a")
+    # Штамп вытеснен: новый не совпадает ни с одним прежним поколением
+    backend.cache.pop("script:a:stamp")
+    value, new_stamp = await cache.lookup("a")
+    assert value is None
+    assert new_stamp != stamp
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_ttl_and_evictions():
+    backend = MemoryCacheBackend(2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    await backend.set("c", b"3", ttl=60)
+    assert await backend.get("a") is None
+    assert (await backend.stats())["evictions"] == 1
+
+    backend.cache.set("d", b"4", time.time() - 1)
+    assert await backend.get("d") is None
+    assert await backend.add("e", b"5", ttl=60)
+    assert not await backend.add("e", b"6", ttl=60)
+    assert await backend.get("e") == b"5"
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_against_fake_server():
+    async with FakeRedis().serve() as server:
+        backend = create_cache_backend(
+            "redis", 10, f"redis://127.0.0.1:{server.port}/0"
+        )
+        client = backend.client
+        cache = VersionedCache(backend, "script", ttl=60)
+
+        value, stamp = await cache.lookup("a")
+        assert value is None
+        await cache.store("a", stamp, b"payload\r\nwith binary \x00")
+        value, _ = await cache.lookup("a")
+        assert value == b"payload\r\nwith binary \x00"
+
+        await cache.invalidate("a")
+        assert (await cache.lookup("a"))[0] is None
+
+        names = [command[0] for command in server.commands]
+        assert b"SET" in names and b"GET" in names
+        set_nx = [c for c in server.commands if c[0] == b"SET" and b"NX" in c]
+        assert set_nx
+        assert set_nx[0][set_nx[0].index(b"PX") + 1] == b"120000"
+        assert (await cache.stats())["evictions"] == 0
+
+        with pytest.raises(RedisError):
+            await client.execute_command("UNKNOWN")
+        assert await client.ping()
+        await cache.close()
+
+    # Redis недоступен: кэш деградирует до промахов, а не до ошибок
+    value, _ = await cache.lookup("a")
+    assert value is None
+    assert (await cache.stats())["errors"] >= 1
+
+
+def test_create_cache_backend():
+    assert create_cache_backend("none", 10, "") is None
+    assert isinstance(create_cache_backend("memory", 10, ""), MemoryCacheBackend)
+    assert isinstance(
+        create_cache_backend("redis", 10, "redis://localhost:6379/1"),
+        RedisCacheBackend,
+    )
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached", 10, "")
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from src.app.core.compression import CompressionMiddleware, select_encoding
+
+LARGE = "".join(f"строка {i}: {'данные ' * 10}\n" for i in range(200))
+CHUNK_COUNT = 5
+
+
+def make_app(sent: list[dict]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, encodings=["gzip"])
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE)
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(
+            gzip.compress(LARGE.encode()), headers={"Content-Encoding": "gzip"}
+        )
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(CHUNK_COUNT):
+                # Сколько кусков тела уже ушло клиенту к этому моменту
+                sent.append(
+                    {"bodies": sum(m.get("type") == "http.response.body" for m in sent)}
+                )
+                yield LARGE
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+async def call(app: FastAPI, path: str, accept_encoding: str, sent: list[dict]):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    finished = asyncio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    finished.set()
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, *", "gzip"),
+        ("identity", None),
+        ("*;q=0", None),
+        ("", None),
+    ],
+)
+def test_select_encoding(accept_encoding, expected):
+    assert select_encoding(accept_encoding, ["br", "gzip"]) == expected
+
+
+@pytest.mark.asyncio
+async def test_compression_threshold_and_passthrough():
+    app = make_app([])
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"status": "ok"}
+
+        response = await ac.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(LARGE.encode()) / 4
+        assert response.text == LARGE
+
+        response = await ac.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE
+
+        # Уже сжатый ответ не сжимается повторно
+        response = await ac.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.text == LARGE
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_compressed_incrementally():
+    sent: list[dict] = []
+    await call(make_app(sent), "/stream", "gzip", sent)
+
+    start = next(m for m in sent if m.get("type") == "http.response.start")
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    # Каждый следующий кусок генерируется уже после отправки сжатого предыдущего
+    progress = [m["bodies"] for m in sent if "bodies" in m]
+    assert progress == list(range(CHUNK_COUNT))
+
+    bodies = [m for m in sent if m.get("type") == "http.response.body"]
+    assert bodies[-1]["more_body"] is False
+    data = b"".join(m["body"] for m in bodies)
+    assert zlib.decompress(data, 31) == (LARGE * CHUNK_COUNT).encode()
+    assert len(data) < len(LARGE.encode())
@@ -0,0 +1,135 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.app.api.user import router as user_router
+from src.app.core import database
+from src.app.core.config import settings
+from src.app.core.database import (
+    InstrumentedQueuePool,
+    ReplicaRouter,
+    create_engine_from_settings,
+    get_db,
+    get_pool_stats,
+)
+from src.app.main import create_app
+from src.app.models.user import Base as UserBase
+from src.app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_engine_factory_tracks_pool_metrics(tmp_path):
+    engine = create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+    try:
+        assert isinstance(engine.sync_engine.pool, InstrumentedQueuePool)
+        assert engine.echo is False
+
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+            stats = get_pool_stats(engine)
+            assert stats["checked_out"] == 1
+            assert 0 < stats["saturation"] <= 1
+
+        stats = get_pool_stats(engine)
+        assert stats["checkouts"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["wait_max_ms"] >= 0
+        assert stats["timeouts"] == 0
+    finally:
+        await engine.dispose()
+
+
+def test_engine_factory_requires_url(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    with pytest.raises(ValueError):
+        create_engine_from_settings()
+
+
+@pytest.mark.asyncio
+async def test_read_routes_use_replicas_and_fall_back_to_primary(tmp_path, monkeypatch):
+    primary_url = f"sqlite+aiosqlite:///{tmp_path}/primary.db"
+    replica_urls = [
+        f"sqlite+aiosqlite:///{tmp_path}/replica1.db",
+        f"sqlite+aiosqlite:///{tmp_path}/replica2.db",
+    ]
+    for name, url in zip(
+        ["primary", "replica1", "replica2"], [primary_url, *replica_urls]
+    ):
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(UserBase.metadata.create_all)
+            await conn.execute(
+                insert(User).values(
+                    username=name,
+                    email=f"{name}@ex.com",
+                    hashed_password="x",
+                    full_name=name,
+                )
+            )
+        await engine.dispose()
+
+    primary_engine = create_async_engine(primary_url)
+    PrimarySession = async_sessionmaker(primary_engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with PrimarySession() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(user_router)
+    app.dependency_overrides[get_db] = override_get_db
+
+    router = ReplicaRouter(replica_urls, max_lag=5)
+    monkeypatch.setattr(database, "replica_router", router)
+    try:
+        await router.check()
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            served = set()
+            for _ in range(4):
+                response = await ac.get("/users/")
+                assert response.status_code == status.HTTP_200_OK
+                served.add(response.json()["items"][0]["username"])
+            assert served == {"replica1", "replica2"}
+
+            # Реплика недоступна — чтение уходит на оставшуюся
+            router.replicas[0].engine = create_async_engine(
+                "sqlite+aiosqlite:////nonexistent/dir/replica.db"
+            )
+            await router.check()
+            assert [r.healthy for r in router.replicas] == [False, True]
+            response = await ac.get("/users/")
+            assert response.json()["items"][0]["username"] == "replica2"
+
+            # Нет здоровых реплик — fallback на primary
+            router.replicas[1].healthy = False
+            response = await ac.get("/users/")
+            assert response.json()["items"][0]["username"] == "primary"
+    finally:
+        await router.dispose()
+        await primary_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_requires_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    async with AsyncClient(
+        transport=ASGITransport(app=create_app()), base_url="http://test"
+    ) as ac:
+        assert (await ac.get("/metrics")).status_code == status.HTTP_404_NOT_FOUND
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+    async with AsyncClient(
+        transport=ASGITransport(app=create_app()), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/metrics")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = await ac.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = await ac.get(
+            "/metrics", headers={"Authorization": "Bearer metrics-secret"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "db_pool" in response.json()
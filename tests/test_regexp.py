@@ -1,9 +1,15 @@
 import asyncio
+import json
+import re
 
 import pytest
 from fastapi import FastAPI, status
 from httpx import ASGITransport, AsyncClient
 from src.app.api.regexp import router as regexp_router
+from src.app.core.config import settings
+from src.app.core.sandbox import ProcessSandbox
+from src.app.service import regexp as regexp_service
+from src.app.utils.linear_regexp import LinearPattern, UnsupportedPattern
 
 
 @pytest.fixture(scope="session")
@@ -13,6 +19,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def sandbox(monkeypatch):
+    sandbox = ProcessSandbox(workers=1, timeout=1.0, max_in_flight=4)
+    monkeypatch.setattr(regexp_service, "regexp_sandbox", sandbox)
+    yield sandbox
+    sandbox.shutdown()
+
+
 @pytest.fixture
 async def test_app():
     app = FastAPI()
@@ -59,3 +73,122 @@ async def test_validate_pattern(test_app):
         assert response.status_code == status.HTTP_200_OK
         result = response.json().get("is_valid")
         assert result is True
+
+
+@pytest.mark.asyncio
+async def test_validate_pattern_sandbox(test_app, sandbox, monkeypatch):
+    monkeypatch.setattr(settings, "REGEXP_ENGINE", "re")
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        data = {"pattern": "(unclosed", "text": "x"}
+        response = await ac.post("/regexp/validate_pattern", json=data)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # Катастрофический бэктрекинг: без срока занял бы воркер надолго
+        data = {"pattern": r"(a+)+$", "text": "a" * 40 + "b"}
+        response = await ac.post("/regexp/validate_pattern", json=data)
+        assert response.status_code == status.HTTP_408_REQUEST_TIMEOUT
+
+        # Зависший воркер заменён, пул продолжает работать
+        data = {"pattern": r"a+b", "text": "a" * 40 + "b"}
+        response = await ac.post("/regexp/validate_pattern", json=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"is_valid": True}
+
+    stats = sandbox.stats()
+    assert stats["timeouts"] == 1
+    assert stats["restarts"] == 1
+    assert stats["calls"] == 2
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"\d{3}-\d{2}-\d{4}",
+        r"^(a|ab)*c?$",
+        r"(?:[^\W\d]+\s?){1,3}",
+        r"\A(?P<key>[a-z_]+)=[^=\n]*\Z",
+        r"[]a-c-]+.{,2}",
+        r"(a*)*b|\x41\101{2,}",
+        r"(?#комментарий)x{}y",
+    ],
+)
+def test_linear_engine_matches_re(pattern):
+    texts = ["", "a", "ab", "abc", "ababc", "123-45-6789", "12-345-6789", "AAA"]
+    texts += ["ключ=знач", "key=value", "key=a=b", "]-c\n", "Тест слов", "x{}y"]
+    compiled, linear = re.compile(pattern), LinearPattern(pattern, 1000)
+    for text in texts:
+        assert linear.fullmatch(text) == bool(compiled.fullmatch(text)), text
+
+
+@pytest.mark.asyncio
+async def test_validate_pattern_linear_engine(test_app, sandbox):
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        # Катастрофический для re шаблон — линейный автомат отвечает сразу
+        data = {"pattern": r"(a+)+$", "text": "a" * 100_000 + "b"}
+        response = await ac.post("/regexp/validate_pattern", json=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"is_valid": False}
+
+        for pattern in (r"(a)\1", r"a(?=b)", r"(?i)a", r"a\b", r"a^b", r"a*+"):
+            data = {"pattern": pattern, "text": "aa"}
+            response = await ac.post("/regexp/validate_pattern", json=data)
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    assert sandbox.stats()["calls"] == 0
+
+    with pytest.raises(UnsupportedPattern):
+        LinearPattern(r"(a{100}){100}", 1000)
+
+
+@pytest.mark.asyncio
+async def test_match_batch(test_app, sandbox, monkeypatch):
+    monkeypatch.setattr(settings, "REGEXP_BATCH_CHUNK_SIZE", 2)
+    app = await test_app
+    patterns = [r"\d+", r"[a-z]+\d*", r"(a|b)*c", r".*"]
+    texts = ["123", "abc12", "ababc", "", "Тест"]
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        data = {"texts": texts, "patterns": patterns}
+        response = await ac.post("/regexp/batch", json=data)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [
+            {
+                "index": index,
+                "matches": [re.fullmatch(p, text) is not None for p in patterns],
+            }
+            for index, text in enumerate(texts)
+        ]
+
+        data = {"texts": ["a"], "patterns": ["a", r"(a)\1"]}
+        response = await ac.post("/regexp/batch", json=data)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"].startswith("Выражение 1:")
+
+    # Пять текстов пачками по два — три вызова воркеров
+    assert sandbox.stats()["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_match_batch_chunk_timeout(test_app, sandbox, monkeypatch):
+    monkeypatch.setattr(settings, "REGEXP_ENGINE", "re")
+    monkeypatch.setattr(settings, "REGEXP_BATCH_CHUNK_SIZE", 1)
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        data = {"texts": ["a" * 40 + "b", "aa"], "patterns": [r"(a+)+$"]}
+        response = await ac.post("/regexp/batch", json=data)
+        assert response.status_code == status.HTTP_200_OK
+        first, second = [json.loads(line) for line in response.text.splitlines()]
+        # Зависшая пачка отвечает ошибкой, остальные — результатом
+        assert first["index"] == 0 and "error" in first
+        assert second == {"index": 1, "matches": [True]}
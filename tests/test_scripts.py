@@ -1,15 +1,31 @@
 import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
 import pytest
 from fastapi import FastAPI, status
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from src.app.api.script import router as script_router
 from src.app.api.user import router as user_router
+from src.app.core import database
+from src.app.core.cache import MemoryCacheBackend, VersionedCache
 from src.app.core.config import settings
-from src.app.core.database import get_db
+from src.app.core.database import ReplicaRouter, get_db
+from src.app.core.singleflight import SingleFlight
 from src.app.models.script import Base as ScriptBase
+from src.app.models.script import Script
+from src.app.models.script_version import ScriptVersion
 from src.app.models.user import Base as UserBase
+from src.app.service import script as script_service
+from src.app.service.script import ScriptService
+from src.app.service.script_blob import ScriptBlobService
+
+from tests.sql_helpers import assert_no_seq_scan, capture_statements
 
 
 @pytest.fixture(scope="session")
@@ -19,7 +35,7 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 async def test_app():
     app = FastAPI()
     app.include_router(user_router)
@@ -94,3 +110,894 @@ async def test_create_update_delete_script(test_app):
         # Удаление скрипта
         response = await ac.delete(f"/scripts/{script_id}", headers=headers)
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+async def register_and_login(ac: AsyncClient, username: str) -> tuple[str, dict]:
+    user_data = {
+        "username": username,
+        "password": "Test123321@",
+        "email": f"{username}@ex.com",
+        "full_name": "Nick Kcin",
+    }
+    response = await ac.post("/users/register", json=user_data)
+    user_id = response.json()["id"]
+    login_data = {"email": f"{username}@ex.com", "password": "Test123321@"}
+    response = await ac.post("/users/login", json=login_data)
+    access_token = response.json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.mark.asyncio
+async def test_list_scripts_keyset_pagination(test_app):
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_id, headers = await register_and_login(ac, "pageuser")
+
+        # Две пары скриптов с одинаковым created_at — порядок решает id
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        async for session in app.dependency_overrides[get_db]():
+            for i in range(5):
+                session.add(
+                    Script(
+                        name=f"Script {i}",
+                        content="text",
+                        user_id=UUID(user_id),
+                        created_at=base + timedelta(minutes=i // 2),
+                        updated_at=base,
+                    )
+                )
+            await session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await ac.get("/scripts/", params=params, headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert len(page["items"]) <= 2
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+        response = await ac.get(
+            "/scripts/", params={"cursor": "not-a-cursor"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_script_queries_use_indexes(test_app):
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_id, headers = await register_and_login(ac, "planuser")
+        for i in range(3):
+            await ac.post(
+                "/scripts/", json={"name": f"S{i}", "content": "x"}, headers=headers
+            )
+
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+        with capture_statements(engine) as statements:
+            scripts, cursor, _ = await ScriptService.list_scripts(
+                UUID(user_id), session, limit=1
+            )
+            await ScriptService.list_scripts(UUID(user_id), session, 1, cursor)
+            await ScriptService.get_script(scripts[0].id, session)
+            await ScriptService.delete_script(scripts[0].id, session)
+        assert statements
+        await assert_no_seq_scan(engine, statements, {"scripts"})
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_script_single_statement(test_app):
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "rtuser")
+        response = await ac.post(
+            "/scripts/", json={"name": "S", "content": "x"}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        with capture_statements(engine) as statements:
+            response = await ac.patch(
+                f"/scripts/{script_id}", json={"name": "T"}, headers=headers
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "T"
+        assert len(statements) == 1
+        assert statements[0][0].lstrip().upper().startswith("UPDATE")
+
+        # Смена текста дополнительно читает старый текст для истории версий
+        with capture_statements(engine) as statements:
+            response = await ac.patch(
+                f"/scripts/{script_id}", json={"content": "y"}, headers=headers
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] == "y"
+        assert [sql.lstrip().split()[0].upper() for sql, _ in statements] == [
+            "SELECT",
+            "UPDATE",
+        ]
+
+        with capture_statements(engine) as statements:
+            response = await ac.delete(f"/scripts/{script_id}", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(statements) == 1
+
+        response = await ac.delete(f"/scripts/{script_id}", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_scripts(test_app, monkeypatch):
+    monkeypatch.setattr(settings, "SCRIPT_IMPORT_BATCH_SIZE", 2)
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "bulkuser")
+
+        async def body(data: bytes):
+            # Отдаём тело мелкими кусками, чтобы строки резались посередине
+            for i in range(0, len(data), 7):
+                yield data[i : i + 7]
+
+        ndjson = (
+            '{"name": "A", "content": "Привет"}\n'
+            "not json\n"
+            "\n"
+            '{"name": "", "content": "x"}\n'
+            '{"name": "B", "content": "b"}\r\n'
+            '{"name": "C", "content": "c"}'
+        ).encode()
+        response = await ac.post(
+            "/scripts/bulk",
+            content=body(ndjson),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["inserted"] == 3
+        assert result["failed"] == 2
+        assert [error["line"] for error in result["errors"]] == [2, 4]
+        assert result["errors"][1]["error"].startswith("name:")
+
+        csv_body = (
+            "name,content\n"
+            'D,"first line\nsecond line"\n'
+            "E\n"
+            'F,"with ""quotes"""\n'
+        ).encode()
+        response = await ac.post(
+            "/scripts/bulk",
+            params={"format": "csv"},
+            content=csv_body,
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["inserted"] == 2
+        assert result["errors"] == [
+            {"line": 4, "error": "Ожидается 2 колонок, получено 1"}
+        ]
+
+        response = await ac.get("/scripts/", headers=headers)
+        contents = {item["name"]: item["content"] for item in response.json()["items"]}
+        assert contents["A"] == "Привет"
+        assert contents["D"] == "first line\nsecond line"
+        assert contents["F"] == 'with "quotes"'
+        assert len(contents) == 5
+
+        response = await ac.post(
+            "/scripts/bulk",
+            content=b"title\nx\n",
+            headers={**headers, "Content-Type": "text/csv"},
+        )
+        assert response.json()["errors"][0]["line"] == 1
+        assert response.json()["inserted"] == 0
+
+        # Слишком длинная строка прерывает импорт, но записи до неё
+        # сохраняются, а ошибка указывает, где импорт остановился
+        monkeypatch.setattr(settings, "SCRIPT_IMPORT_MAX_LINE_LENGTH", 40)
+        ndjson = (
+            '{"name": "G", "content": "g"}\n'
+            '{"name": "long line", "content": "' + "x" * 40 + '"}\n'
+            '{"name": "H", "content": "h"}\n'
+        ).encode()
+        response = await ac.post("/scripts/bulk", content=ndjson, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["inserted"] == 1
+        assert result["failed"] == 1
+        assert result["errors"] == [{"line": 2, "error": "Строка длиннее 40 символов"}]
+
+        # Незакрытая кавычка не склеивает остаток файла без предела
+        csv_body = ('name,content\nI,i\nJ,"unclosed\n' + "short\n" * 20).encode()
+        response = await ac.post(
+            "/scripts/bulk",
+            content=body(csv_body),
+            params={"format": "csv"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["inserted"] == 1
+        assert result["errors"] == [{"line": 3, "error": "Запись длиннее 40 символов"}]
+
+
+@pytest.mark.asyncio
+async def test_export_scripts_streams_all_rows(test_app, monkeypatch):
+    monkeypatch.setattr(settings, "SCRIPT_EXPORT_BATCH_SIZE", 2)
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "exportuser")
+        _, other_headers = await register_and_login(ac, "otheruser")
+        for i in range(5):
+            await ac.post(
+                "/scripts/",
+                json={"name": f"S{i}", "content": f'line "{i}"\nnext'},
+                headers=headers,
+            )
+        await ac.post(
+            "/scripts/", json={"name": "foreign", "content": "x"}, headers=other_headers
+        )
+
+        async with ac.stream("GET", "/scripts/export", headers=headers) as response:
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["content-type"] == "application/x-ndjson"
+            chunks = [chunk async for chunk in response.aiter_text()]
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+        assert sorted(row["name"] for row in rows) == [f"S{i}" for i in range(5)]
+        assert {row["content"] for row in rows} == {
+            f'line "{i}"\nnext' for i in range(5)
+        }
+
+        response = await ac.get(
+            "/scripts/export", params={"format": "csv"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        reader = csv.DictReader(io.StringIO(response.text))
+        rows = list(reader)
+        assert reader.fieldnames[:3] == ["id", "name", "content"]
+        assert {row["content"] for row in rows} == {
+            f'line "{i}"\nnext' for i in range(5)
+        }
+
+
+@pytest.mark.asyncio
+async def test_script_summaries_and_sparse_fields(test_app):
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "summaryuser")
+        response = await ac.post(
+            "/scripts/", json={"name": "Big", "content": "x" * 5000}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        with capture_statements(engine) as statements:
+            response = await ac.get("/scripts/summary", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        (item,) = response.json()["items"]
+        assert item["content_length"] == 5000
+        assert set(item) == {"id", "name", "updated_at", "content_length"}
+        select_sql = statements[-1][0]
+        assert "length(coalesce(scripts.content" in select_sql
+        assert "content" not in select_sql.split("length(")[0]
+
+        with capture_statements(engine) as statements:
+            response = await ac.get(
+                "/scripts/", params={"fields": "id,name"}, headers=headers
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"] == [{"id": script_id, "name": "Big"}]
+        assert "scripts.content" not in statements[-1][0]
+
+        response = await ac.get(
+            f"/scripts/{script_id}", params={"fields": "name"}, headers=headers
+        )
+        assert response.json() == {"name": "Big"}
+
+        response = await ac.get(
+            "/scripts/", params={"fields": "id,secret"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "secret" in response.json()["detail"]
+
+        user_id, _ = await register_and_login(ac, "fieldsuser")
+        response = await ac.get(
+            f"/users/{user_id}", params={"fields": "username,email"}
+        )
+        assert response.json() == {
+            "username": "fieldsuser",
+            "email": "fieldsuser@ex.com",
+        }
+        response = await ac.get("/users/", params={"fields": "username", "limit": 1})
+        (item,) = response.json()["items"]
+        assert set(item) == {"username"}
+        assert response.json()["next_cursor"] is not None
+        response = await ac.get(
+            f"/users/{user_id}", params={"fields": "hashed_password"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_search_scripts_ranked_with_snippets(test_app, monkeypatch):
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "searchuser")
+        _, other_headers = await register_and_login(ac, "searchother")
+        scripts = [
+            ("Приветствие", "Здравствуйте! Меня зовут робот, чем помочь?"),
+            ("Доставка", "Расскажите о доставке: робот уточнит адрес"),
+            ("Оплата", "Оплата картой или наличными"),
+        ]
+        for name, content in scripts:
+            await ac.post(
+                "/scripts/", json={"name": name, "content": content}, headers=headers
+            )
+        await ac.post(
+            "/scripts/",
+            json={"name": "Чужой", "content": "робот"},
+            headers=other_headers,
+        )
+
+        response = await ac.get(
+            "/scripts/search", params={"q": "робот"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        items = response.json()["items"]
+        assert {item["name"] for item in items} == {"Приветствие", "Доставка"}
+        assert all("<mark>робот</mark>" in item["snippet"] for item in items)
+
+        # Совпадение в названии весомее совпадения в тексте
+        await ac.post(
+            "/scripts/",
+            json={"name": "Оплата заказа", "content": "текст"},
+            headers=headers,
+        )
+        response = await ac.get(
+            "/scripts/search", params={"q": "оплата", "limit": 1}, headers=headers
+        )
+        page = response.json()
+        assert page["items"][0]["name"] == "Оплата заказа"
+        response = await ac.get(
+            "/scripts/search",
+            params={"q": "оплата", "limit": 1, "cursor": page["next_cursor"]},
+            headers=headers,
+        )
+        assert response.json()["items"][0]["name"] == "Оплата"
+        assert response.json()["next_cursor"] is None
+
+        # Синтаксис FTS в запросе не ломает поиск, обновления индексируются
+        response = await ac.get(
+            "/scripts/search", params={"q": 'адрес" OR *'}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        script_id = (await ac.get("/scripts/", headers=headers)).json()["items"][2][
+            "id"
+        ]
+        await ac.patch(
+            f"/scripts/{script_id}", json={"content": "новый текст"}, headers=headers
+        )
+        response = await ac.get(
+            "/scripts/search", params={"q": "новый"}, headers=headers
+        )
+        assert [item["id"] for item in response.json()["items"]] == [script_id]
+
+        # СУБД без поиска — 501, а не 500
+        monkeypatch.delitem(script_service.SEARCH_BUILDERS, "sqlite")
+        response = await ac.get(
+            "/scripts/search", params={"q": "новый"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+
+@pytest.mark.asyncio
+async def test_script_versions_deltas_and_snapshots(test_app, monkeypatch):
+    monkeypatch.setattr(settings, "SCRIPT_VERSION_SNAPSHOT_INTERVAL", 3)
+    app = await test_app
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "versionuser")
+        lines = [f"Строка {i}\n" for i in range(50)]
+        contents = ["".join(lines)]
+        response = await ac.post(
+            "/scripts/", json={"name": "V", "content": contents[0]}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        # До первой правки текущий текст — версия 1
+        response = await ac.get(f"/scripts/{script_id}/versions")
+        assert [v["version"] for v in response.json()] == [1]
+        response = await ac.get(f"/scripts/{script_id}/versions/1")
+        assert response.json()["content"] == contents[0]
+
+        for i in range(6):
+            lines[i * 5] = f"Правка {i}\n"
+            contents.append("".join(lines))
+            await ac.patch(
+                f"/scripts/{script_id}",
+                json={"content": contents[-1]},
+                headers=headers,
+            )
+        # Правка имени без смены текста версию не создаёт
+        await ac.patch(f"/scripts/{script_id}", json={"name": "V2"}, headers=headers)
+
+        response = await ac.get(f"/scripts/{script_id}/versions")
+        versions = response.json()
+        assert [v["version"] for v in versions] == list(range(1, 8))
+        assert [v["is_snapshot"] for v in versions] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+        ]
+        for version, content in enumerate(contents, start=1):
+            response = await ac.get(f"/scripts/{script_id}/versions/{version}")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["content"] == content
+
+        async for session in app.dependency_overrides[get_db]():
+            result = await session.execute(
+                select(ScriptVersion.delta).where(ScriptVersion.version == 2)
+            )
+            # Дельта хранит только изменённую строку
+            assert result.scalar_one() == ["Правка 0\n", [1, 50]]
+
+        response = await ac.get(
+            f"/scripts/{script_id}/versions/diff",
+            params={"from": 1, "to": 3},
+        )
+        diff = response.json()["diff"]
+        assert "-Строка 0\n" in diff and "+Правка 0\n" in diff
+        assert "+Правка 1\n" in diff
+
+        response = await ac.get(f"/scripts/{script_id}/versions/8")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = await ac.get(
+            f"/scripts/{script_id}/versions/diff", params={"from": 1, "to": 9}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_script_content_dedup_ref_counts(test_app, monkeypatch):
+    monkeypatch.setattr(settings, "SCRIPT_DEDUP_ENABLED", True)
+    monkeypatch.setattr(settings, "SCRIPT_DEDUP_MIN_SIZE", 100)
+    app = await test_app
+    template = "Здравствуйте, {{name}}! " * 20
+    other = "Другой шаблон. " * 20
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "dedupuser")
+        ids = []
+        for i in range(3):
+            response = await ac.post(
+                "/scripts/",
+                json={"name": f"Copy {i}", "content": template},
+                headers=headers,
+            )
+            assert response.json()["content"] == template
+            ids.append(response.json()["id"])
+        ndjson = "\n".join(
+            json.dumps({"name": name, "content": content})
+            for name, content in (("Bulk", template), ("Small", "short"))
+        )
+        response = await ac.post("/scripts/bulk", content=ndjson, headers=headers)
+        assert response.json()["inserted"] == 2
+
+        response = await ac.get("/scripts/dedup/stats")
+        stats = response.json()
+        assert stats["blobs"] == 1
+        assert stats["references"] == 4
+        assert stats["dedup_ratio"] == 4.0
+        assert stats["saved_bytes"] == 3 * len(template.encode())
+
+        # Тексты из script_blobs тоже индексируются для поиска
+        response = await ac.get(
+            "/scripts/search", params={"q": "Здравствуйте"}, headers=headers
+        )
+        hits = response.json()["items"]
+        assert {hit["name"] for hit in hits} == {"Copy 0", "Copy 1", "Copy 2", "Bulk"}
+        assert all("<mark>Здравствуйте</mark>" in hit["snippet"] for hit in hits)
+
+        # Чтение прозрачно: и полная схема, и сводка, и версии
+        response = await ac.get(f"/scripts/{ids[0]}")
+        assert response.json()["content"] == template
+        response = await ac.get("/scripts/", headers=headers)
+        contents = {item["name"]: item["content"] for item in response.json()["items"]}
+        assert contents == {
+            "Copy 0": template,
+            "Copy 1": template,
+            "Copy 2": template,
+            "Bulk": template,
+            "Small": "short",
+        }
+
+        response = await ac.patch(
+            f"/scripts/{ids[0]}", json={"content": other}, headers=headers
+        )
+        assert response.json()["content"] == other
+        response = await ac.get(f"/scripts/{ids[0]}/versions/1")
+        assert response.json()["content"] == template
+        response = await ac.get(
+            "/scripts/search", params={"q": "Другой"}, headers=headers
+        )
+        assert [hit["id"] for hit in response.json()["items"]] == [ids[0]]
+        await ac.delete(f"/scripts/{ids[1]}", headers=headers)
+        stats = (await ac.get("/scripts/dedup/stats")).json()
+        assert stats["blobs"] == 2
+        assert stats["references"] == 3
+
+        await ac.patch(f"/scripts/{ids[0]}", json={"content": "tiny"}, headers=headers)
+        stats = (await ac.get("/scripts/dedup/stats")).json()
+        assert stats["blobs"] == 1
+
+        # Каскадное удаление счётчики не трогает — их чинит сборка мусора
+        async for session in app.dependency_overrides[get_db]():
+            await session.execute(delete(Script).where(Script.id == UUID(ids[2])))
+            await session.commit()
+            assert (await ScriptBlobService.stats(session))["references"] == 2
+            assert await ScriptBlobService.collect_garbage(session) == 0
+            assert (await ScriptBlobService.stats(session))["references"] == 1
+            await session.execute(delete(Script))
+            await session.commit()
+            assert await ScriptBlobService.collect_garbage(session) == 1
+
+        # Удаление пользователя освобождает тексты его скриптов
+        owner_id, headers = await register_and_login(ac, "dedupowner")
+        _, other_headers = await register_and_login(ac, "dedupother")
+        for owner_headers in (headers, headers, other_headers):
+            await ac.post(
+                "/scripts/",
+                json={"name": "Shared", "content": template},
+                headers=owner_headers,
+            )
+        assert (await ac.get("/scripts/dedup/stats")).json()["references"] == 3
+        response = await ac.delete(f"/users/{owner_id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        stats = (await ac.get("/scripts/dedup/stats")).json()
+        assert stats["blobs"] == 1
+        assert stats["references"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_script_read_through_cache(test_app, monkeypatch):
+    cache = VersionedCache(MemoryCacheBackend(100), "script", ttl=60)
+    monkeypatch.setattr(script_service, "script_cache", cache)
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "cacheuser")
+        response = await ac.post(
+            "/scripts/", json={"name": "C", "content": "v1"}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        first = (await ac.get(f"/scripts/{script_id}")).json()
+        with capture_statements(engine) as statements:
+            response = await ac.get(f"/scripts/{script_id}")
+        assert statements == []
+        assert response.json() == first
+
+        await ac.patch(f"/scripts/{script_id}", json={"content": "v2"}, headers=headers)
+        response = await ac.get(f"/scripts/{script_id}")
+        assert response.json()["content"] == "v2"
+
+        await ac.delete(f"/scripts/{script_id}", headers=headers)
+        response = await ac.get(f"/scripts/{script_id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        # Удаление владельца вытесняет из кэша все его скрипты
+        owner_id, owner_headers = await register_and_login(ac, "cacheowner")
+        response = await ac.post(
+            "/scripts/", json={"name": "O", "content": "v1"}, headers=owner_headers
+        )
+        owned_id = response.json()["id"]
+        assert (await ac.get(f"/scripts/{owned_id}")).status_code == 200
+        await ac.delete(f"/users/{owner_id}")
+        response = await ac.get(f"/scripts/{owned_id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    stats = await cache.stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 3
+
+
+@pytest.mark.asyncio
+async def test_script_cache_is_filled_from_primary(test_app, monkeypatch, tmp_path):
+    cache = VersionedCache(MemoryCacheBackend(100), "script", ttl=60)
+    monkeypatch.setattr(script_service, "script_cache", cache)
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "replicacache")
+        response = await ac.post(
+            "/scripts/", json={"name": "R", "content": "fresh"}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        # Реплика отстаёт: у неё ещё старая версия скрипта
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(Script.__table__))).one()._asdict()
+        router = ReplicaRouter([f"sqlite+aiosqlite:///{tmp_path}/replica.db"], 5)
+        async with router.replicas[0].engine.begin() as conn:
+            await conn.run_sync(UserBase.metadata.create_all)
+            await conn.run_sync(ScriptBase.metadata.create_all)
+            await conn.execute(insert(Script), [{**row, "content": "stale"}])
+        monkeypatch.setattr(database, "replica_router", router)
+        try:
+            response = await ac.get(
+                f"/scripts/{script_id}", params={"fields": "content"}
+            )
+            assert response.json()["content"] == "stale"
+            for _ in range(2):
+                response = await ac.get(f"/scripts/{script_id}")
+                assert response.json()["content"] == "fresh"
+        finally:
+            await router.dispose()
+
+    assert (await cache.stats())["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_with_etag(test_app):
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_id, headers = await register_and_login(ac, "etaguser")
+        response = await ac.post(
+            "/scripts/", json={"name": "E", "content": "x" * 4096}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        response = await ac.get(f"/scripts/{script_id}")
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        with capture_statements(engine) as statements:
+            response = await ac.get(
+                f"/scripts/{script_id}", headers={"If-None-Match": etag}
+            )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        # Проверка читает только updated_at, без текста скрипта
+        assert len(statements) == 1
+        assert "content" not in statements[0][0]
+
+        response = await ac.get(
+            f"/scripts/{script_id}", headers={"If-None-Match": f'"other", {etag}'}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Другое представление (fields) — другой ETag
+        response = await ac.get(
+            f"/scripts/{script_id}",
+            params={"fields": "name"},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"name": "E"}
+        assert response.headers["etag"] != etag
+
+        await ac.patch(f"/scripts/{script_id}", json={"name": "E2"}, headers=headers)
+        async for session in app.dependency_overrides[get_db]():
+            # SQLite хранит время с точностью до секунды — сдвигаем явно
+            await session.execute(
+                update(Script)
+                .where(Script.id == UUID(script_id))
+                .values(updated_at=datetime(2030, 1, 1, tzinfo=timezone.utc))
+            )
+            await session.commit()
+        response = await ac.get(
+            f"/scripts/{script_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "E2"
+        assert response.headers["etag"] != etag
+
+        # Строка без updated_at: ETag по created_at в обоих путях
+        async for session in app.dependency_overrides[get_db]():
+            await session.execute(
+                update(Script)
+                .where(Script.id == UUID(script_id))
+                .values(updated_at=None)
+            )
+            await session.commit()
+        if script_service.script_cache is not None:
+            await script_service.script_cache.invalidate(script_id)
+        for params in ({}, {"fields": "name"}):
+            response = await ac.get(f"/scripts/{script_id}", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            response = await ac.get(
+                f"/scripts/{script_id}",
+                params=params,
+                headers={"If-None-Match": response.headers["etag"]},
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = await ac.get(f"/users/{user_id}")
+        user_etag = response.headers["etag"]
+        response = await ac.get(
+            f"/users/{user_id}", headers={"If-None-Match": user_etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = await ac.get(
+            f"/users/{user_id}",
+            params={"fields": "username"},
+            headers={"If-None-Match": user_etag},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != user_etag
+        response = await ac.get(
+            f"/scripts/{UUID(int=0)}", headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_get_scripts_by_ids_single_query(test_app):
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "batchuser")
+        _, other_headers = await register_and_login(ac, "batchother")
+        ids = []
+        for i in range(3):
+            response = await ac.post(
+                "/scripts/", json={"name": f"B{i}", "content": "x"}, headers=headers
+            )
+            ids.append(response.json()["id"])
+        response = await ac.post(
+            "/scripts/", json={"name": "Чужой", "content": "x"}, headers=other_headers
+        )
+        foreign_id = response.json()["id"]
+        unknown_id = str(UUID(int=1))
+        requested = [ids[2], ids[0], unknown_id, ids[0], foreign_id]
+
+        with capture_statements(engine) as statements:
+            response = await ac.get(
+                "/scripts/", params={"ids": ",".join(requested)}, headers=headers
+            )
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [item["id"] for item in body["items"]] == [ids[2], ids[0]]
+        assert body["items"][0]["name"] == "B2"
+        assert body["missing"] == [unknown_id, foreign_id]
+        assert len(statements) == 1
+
+        response = await ac.post(
+            "/scripts/batch",
+            params={"fields": "name"},
+            json={"ids": [ids[1], unknown_id]},
+            headers=headers,
+        )
+        assert response.json() == {"items": [{"name": "B1"}], "missing": [unknown_id]}
+
+        response = await ac.get("/scripts/", params={"ids": "x,y"}, headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        too_many = [str(UUID(int=i)) for i in range(settings.SCRIPT_BATCH_MAX_IDS + 1)]
+        response = await ac.post(
+            "/scripts/batch", json={"ids": too_many}, headers=headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_script_is_coalesced(test_app, monkeypatch):
+    app = await test_app
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+    monkeypatch.setattr(script_service, "script_cache", None)
+    monkeypatch.setattr(script_service, "script_loads", SingleFlight())
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, "flightuser")
+        response = await ac.post(
+            "/scripts/", json={"name": "Hot", "content": "x"}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        with capture_statements(engine) as statements:
+            responses = await asyncio.gather(
+                *(ac.get(f"/scripts/{script_id}") for _ in range(20))
+            )
+        assert {r.json()["name"] for r in responses} == {"Hot"}
+        assert len(statements) < 20
+        stats = script_service.script_loads.stats()
+        assert stats["calls"] == 20
+        assert stats["loads"] == len(statements)
+        assert stats["coalesced"] == 20 - len(statements)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cached", [False, True])
+async def test_get_script_after_update_does_not_join_stale_load(
+    test_app, monkeypatch, cached
+):
+    cache = VersionedCache(MemoryCacheBackend(100), "script", ttl=60)
+    monkeypatch.setattr(script_service, "script_cache", cache if cached else None)
+    monkeypatch.setattr(script_service, "script_loads", SingleFlight())
+    app = await test_app
+    loaded, release = asyncio.Event(), asyncio.Event()
+    load_script = ScriptService._load_script
+
+    async def slow_first_load(*args):
+        result = await load_script(*args)
+        if not loaded.is_set():
+            # Первая загрузка прочитала строку до commit изменения
+            loaded.set()
+            await release.wait()
+        return result
+
+    monkeypatch.setattr(ScriptService, "_load_script", staticmethod(slow_first_load))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        _, headers = await register_and_login(ac, f"staleflight{int(cached)}")
+        response = await ac.post(
+            "/scripts/", json={"name": "S", "content": "old"}, headers=headers
+        )
+        script_id = response.json()["id"]
+
+        slow = asyncio.create_task(ac.get(f"/scripts/{script_id}"))
+        await loaded.wait()
+        await ac.patch(
+            f"/scripts/{script_id}", json={"content": "new"}, headers=headers
+        )
+        response = await asyncio.wait_for(ac.get(f"/scripts/{script_id}"), 5)
+        assert response.json()["content"] == "new"
+        release.set()
+        assert (await slow).json()["content"] == "old"
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from src.app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_load():
+    flight: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return 42
+
+    callers = [asyncio.create_task(flight.do("a", load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*callers) == [42] * 10
+    assert loads == 1
+    assert flight.stats() == {"calls": 10, "coalesced": 9, "loads": 1, "in_flight": 0}
+
+    # Завершённая загрузка не переиспользуется
+    assert await flight.do("a", load) == 42
+    assert loads == 2
+
+
+@pytest.mark.asyncio
+async def test_error_is_shared_and_not_cached():
+    flight: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    callers = [asyncio.create_task(flight.do("a", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def ok():
+        return 1
+
+    assert await flight.do("a", ok) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_load():
+    flight: SingleFlight[str, int] = SingleFlight()
+    release = asyncio.Event()
+    cancelled = False
+
+    async def load():
+        nonlocal cancelled
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 7
+
+    first = asyncio.create_task(flight.do("a", load))
+    second = asyncio.create_task(flight.do("a", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == 7
+    assert first.cancelled()
+    assert not cancelled
+
+    # Когда отменены все ожидающие, загрузка отменяется и забывается
+    release.clear()
+    only = asyncio.create_task(flight.do("b", load))
+    await asyncio.sleep(0)
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+    assert cancelled
+    assert flight.stats()["in_flight"] == 0
@@ -1,13 +1,39 @@
 import asyncio
+from datetime import datetime, timezone
+from uuid import UUID
 
 import pytest
 from fastapi import FastAPI, status
+from fastapi.responses import ORJSONResponse
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from src.app.api.user import router as user_router
 from src.app.core.config import settings
 from src.app.core.database import get_db
+from src.app.core.jwt import (
+    access_token_cache,
+    create_access_token,
+    decode_access_token,
+)
+from src.app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    calibrate_bcrypt_rounds,
+    password_hasher,
+)
+from src.app.core.singleflight import SingleFlight
 from src.app.models.user import Base as UserBase
+from src.app.models.user import User
+from src.app.schemas.pagination import Page
+from src.app.schemas.user import UserRead, validate_password_strength
+from src.app.service import user as user_service
+from src.app.service.user import UserService
+from src.app.utils import breached_passwords
+from src.app.utils.breached_passwords import BreachedPasswordIndex, build_index
+from src.app.utils.responses import json_response_class
+
+from tests.sql_helpers import capture_statements
 
 
 @pytest.fixture(scope="session")
@@ -17,7 +43,7 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture
 async def test_app():
     app = FastAPI()
     app.include_router(user_router)
@@ -88,3 +114,299 @@ async def test_register_login_update_delete_user(test_app):
         # Удаление пользователя
         response = await ac.delete(f"/users/{user_id}", headers=headers)
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_access_token_cache_hit_and_miss():
+    access_token_cache.clear()
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000001"})
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first == second
+    assert first["sub"] == "00000000-0000-0000-0000-000000000001"
+    assert access_token_cache.misses == 1
+    assert access_token_cache.hits == 1
+
+    # Невалидный токен не кэшируется
+    assert decode_access_token(token + "x") == {}
+    assert len(access_token_cache) == 1
+
+
+def test_access_token_cache_expired_entry():
+    access_token_cache.clear()
+    token = create_access_token(
+        {"sub": "00000000-0000-0000-0000-000000000002"}, expires_delta=-1
+    )
+
+    # Просроченный токен не проходит проверку и не попадает в кэш
+    assert decode_access_token(token) == {}
+    assert len(access_token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(executor_type="thread", workers=1, max_in_flight=1)
+    try:
+        results = await asyncio.gather(
+            hasher.hash("Test123321@"),
+            hasher.hash("Test123321@"),
+            return_exceptions=True,
+        )
+        hashed = [r for r in results if isinstance(r, str)]
+        busy = [r for r in results if isinstance(r, PasswordHasherBusy)]
+        assert len(hashed) == 1
+        assert len(busy) == 1
+        assert busy[0].status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert hasher.stats()["rejected"] == 1
+        assert await hasher.verify("Test123321@", hashed[0]) is True
+    finally:
+        hasher.shutdown()
+
+
+def test_calibrate_bcrypt_rounds_is_clamped():
+    assert calibrate_bcrypt_rounds(0.001, min_rounds=4, max_rounds=6, samples=1) == 4
+    assert calibrate_bcrypt_rounds(10**9, min_rounds=4, max_rounds=6, samples=1) == 6
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_with_new_cost(test_app):
+    app, recreate_tables = await test_app
+    await recreate_tables()
+    default_rounds = password_hasher.rounds
+    password_hasher.rounds = 4
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            user_data = {
+                "username": "rehashuser",
+                "password": "Test123321@",
+                "email": "rehashuser@ex.com",
+                "full_name": "Rehash User",
+            }
+            response = await ac.post("/users/register", json=user_data)
+            assert response.status_code == status.HTTP_201_CREATED
+
+            password_hasher.rounds = 5
+            login_data = {"email": "rehashuser@ex.com", "password": "Test123321@"}
+            response = await ac.post("/users/login", json=login_data)
+            assert response.status_code == status.HTTP_200_OK
+            await asyncio.gather(*user_service._background_tasks)
+
+        async for session in app.dependency_overrides[get_db]():
+            user = await session.scalar(
+                select(User).where(User.email == "rehashuser@ex.com")
+            )
+            assert user.hashed_password.startswith("$2b$05$")
+            assert not password_hasher.needs_rehash(user.hashed_password)
+            current_hash = user.hashed_password
+
+            # Пересчёт по устаревшему хешу (пароль сменили во время
+            # хеширования) не перезаписывает текущий хеш
+            password_hasher.rounds = 6
+            await user_service.UserService.rehash_password(
+                session.bind, user.id, "Test123321@", "$2b$04$stale"
+            )
+            await session.refresh(user)
+            assert user.hashed_password == current_hash
+    finally:
+        password_hasher.rounds = default_rounds
+
+
+def test_breached_password_index(tmp_path, monkeypatch):
+    source = tmp_path / "breached.txt"
+    source.write_text("Summer2024!\nHunter2#x\nHunter2#x\nP@ssw0rd1\n")
+    index_path = tmp_path / "breached.idx"
+
+    assert build_index([source], index_path) == 3
+
+    index = BreachedPasswordIndex(index_path)
+    try:
+        assert index.count == 3
+        assert "Summer2024!" in index
+        assert "P@ssw0rd1" in index
+        assert "Hunter2#y" not in index
+    finally:
+        index.close()
+
+    monkeypatch.setattr(breached_passwords, "_index", None)
+    monkeypatch.setattr(
+        breached_passwords.settings, "BREACHED_PASSWORDS_INDEX", str(index_path)
+    )
+    try:
+        with pytest.raises(ValueError, match="утечках"):
+            validate_password_strength("Summer2024!")
+        assert validate_password_strength("Winter2024!") == "Winter2024!"
+    finally:
+        breached_passwords.get_breached_index().close()
+
+
+@pytest.mark.parametrize(
+    ("password", "error"),
+    [
+        ("NoDigits!", "цифру"),
+        ("123456789!", "букву"),
+        ("NoSpecial1", "спецсимвол"),
+        ("MyQwerty1!", "простой"),
+    ],
+)
+def test_validate_password_strength_errors(password, error):
+    with pytest.raises(ValueError, match=error):
+        validate_password_strength(password)
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_user_single_statement(test_app):
+    app, recreate_tables = await test_app
+    await recreate_tables()
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_data = {
+            "username": "rtuser",
+            "password": "Test123321@",
+            "email": "rtuser@ex.com",
+            "full_name": "Round Trip",
+        }
+        response = await ac.post("/users/register", json=user_data)
+        user_id = response.json()["id"]
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(User)
+                .where(User.id == UUID(user_id))
+                .values(created_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+            )
+
+        with capture_statements(engine) as statements:
+            response = await ac.patch(
+                f"/users/{user_id}", json={"full_name": "One Trip"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["full_name"] == "One Trip"
+        # created_at — ключ keyset-пагинации и при обновлении не меняется
+        assert response.json()["created_at"].startswith("2020-01-01")
+        assert len(statements) == 1
+
+        # Скрипты пользователя удаляются отдельным DELETE … RETURNING,
+        # чтобы освободить их тексты в script_blobs
+        with capture_statements(engine) as statements:
+            response = await ac.delete(f"/users/{user_id}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(statements) == 2
+
+        response = await ac.patch(f"/users/{user_id}", json={"full_name": "Ghost"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_get_user_after_write_does_not_join_stale_load(test_app, monkeypatch):
+    app, recreate_tables = await test_app
+    await recreate_tables()
+    monkeypatch.setattr(user_service, "user_loads", SingleFlight())
+    load_user = UserService._load_user
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_data = {
+            "username": "staleflight",
+            "password": "Test123321@",
+            "email": "staleflight@ex.com",
+            "full_name": "Old Name",
+        }
+        user_id = (await ac.post("/users/register", json=user_data)).json()["id"]
+        writes = (
+            (
+                lambda: ac.patch(f"/users/{user_id}", json={"full_name": "New Name"}),
+                lambda response: response.json()["full_name"] == "New Name",
+            ),
+            (
+                lambda: ac.delete(f"/users/{user_id}"),
+                lambda response: response.status_code == status.HTTP_404_NOT_FOUND,
+            ),
+        )
+        for write, is_fresh in writes:
+            loaded, release = asyncio.Event(), asyncio.Event()
+
+            async def slow_load(*args):
+                result = await load_user(*args)
+                # Загрузка прочитала строку до commit изменения
+                loaded.set()
+                await release.wait()
+                return result
+
+            monkeypatch.setattr(UserService, "_load_user", staticmethod(slow_load))
+            slow = asyncio.create_task(ac.get(f"/users/{user_id}"))
+            await loaded.wait()
+            await write()
+            monkeypatch.setattr(UserService, "_load_user", load_user)
+            response = await asyncio.wait_for(ac.get(f"/users/{user_id}"), 5)
+            assert is_fresh(response)
+            release.set()
+            assert (await slow).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_register_is_single_insert_and_reports_duplicates(test_app):
+    app, recreate_tables = await test_app
+    await recreate_tables()
+    async for session in app.dependency_overrides[get_db]():
+        engine = session.bind
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        user_data = {
+            "username": "dupuser",
+            "password": "Test123321@",
+            "email": "dupuser@ex.com",
+            "full_name": "Dup User",
+        }
+        with capture_statements(engine) as statements:
+            response = await ac.post("/users/register", json=user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(statements) == 1
+        assert statements[0][0].lstrip().upper().startswith("INSERT")
+
+        response = await ac.post(
+            "/users/register", json={**user_data, "email": "other@ex.com"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Пользователь с таким именем существует."
+
+        response = await ac.post(
+            "/users/register", json={**user_data, "username": "otheruser"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Пользователь с таким email существует."
+
+
+@pytest.mark.asyncio
+async def test_user_list_fast_path_matches_schema(test_app):
+    app, recreate_tables = await test_app
+    await recreate_tables()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        await ac.post(
+            "/users/register",
+            json={
+                "username": "fastpath",
+                "password": "Test123321@",
+                "email": "fastpath@ex.com",
+                "full_name": "Fast Path",
+            },
+        )
+        response = await ac.get("/users/")
+    assert response.headers["content-type"] == "application/json"
+    page = Page[UserRead].model_validate_json(response.content)
+    assert [user.email for user in page.items] == ["fastpath@ex.com"]
+    assert page.next_cursor is None
+
+    assert json_response_class("orjson") is ORJSONResponse
+    with pytest.raises(ValueError):
+        json_response_class("ujson")